@@ -1,11 +1,29 @@
-from playwright.sync_api import sync_playwright
 from util.spider_util import SpiderUtil
-import requests
-from bs4 import BeautifulSoup
+import time
+from util.html_cleaner import HtmlCleaner
 import os
 
 # 获取当前文件名，用于日志标识
 util = SpiderUtil()
+# 详情页清理规则
+CLEAN_RULES = {
+    "container": ".news-content",
+    "remove": "script,style,visualization",
+}
+cleaner = HtmlCleaner(CLEAN_RULES)
+# 列表页条目的字段
+LIST_FIELDS = {
+    "href": ("", "href"),
+    "title": ("h3", "text"),
+}
+# 列表页及条目选择器
+LIST_URL = "https://www.ainvest.com/news/articles/"
+LIST_ITEM_SELECTOR = "#news-articles .grid a"
+# 列表深度：固定模式取前 LIST_DEPTH 条；自适应模式遇到第一个已抓取的链接即停止，
+# 最多 MAX_DEPTH 条，详情抓取最多用时 DEPTH_BUDGET 秒
+LIST_DEPTH = 5
+MAX_DEPTH = 10
+DEPTH_BUDGET = 60
 filename = "./news/data/ainvest/list.json"
 
 # 添加请求头
@@ -21,17 +39,9 @@ headers = {
 def get_detail(link):
     util.info(f"link: {link}")
     try:
-        response = requests.get(link, headers=headers)
+        response = util.http_get(link, headers=headers)
         if response.status_code == 200:
-            lxml = BeautifulSoup(response.text, "lxml")
-            soup = lxml.select_one(".news-content")
-
-            ad_elements = soup.select("script,style,visualization")
-            # 移除这些元素
-            for element in ad_elements:
-                element.decompose()
-
-            return str(soup).strip()
+            return util.clean_html(cleaner, response.text)
         else:
             util.error(f"request: {link} error: {response.status_code}")
             return ""
@@ -45,48 +55,57 @@ def run():
     _articles = data["articles"]
     _links = data["links"]
     insert = False
-    with sync_playwright() as p:
-        # 启动浏览器
-        browser = p.firefox.launch(
-            headless=util.get_crawler_headless(),
-            slow_mo=300,
-        )
-        context = browser.new_context()
+    depth = util.listing_depth(LIST_DEPTH, MAX_DEPTH)
+    # 列表页没有变化时无需启动浏览器
+    if util.listing_unchanged(LIST_URL, LIST_ITEM_SELECTOR, LIST_FIELDS, limit=depth):
+        return
+    with util.launch_browser() as browser:
+        context = util.new_context(browser)
         page = util.get_page(context)
         # 访问目标网页
-        page.goto(
-            "https://www.ainvest.com/news/articles/",
+        util.goto(
+            page,
+            LIST_URL,
             wait_until="domcontentloaded",
             timeout=10000,
         )
         util.info("开始访问网页...")
 
         # 等待第一个带有实际内容的文章标题出现
-        page.wait_for_selector("#news-articles h3:not(:empty)", timeout=10000)
+        util.wait_for_selector(page, "#news-articles h3:not(:empty)", timeout=10000)
         util.info("文章内容已加载")
 
         # 获取前3个实际加载的新闻项（确保有内容）
-        news_items = page.query_selector_all("#news-articles .grid a")[:5]
+        news_items = util.extract_list(
+            page, LIST_ITEM_SELECTOR, LIST_FIELDS, limit=depth
+        )
+        # 前几条链接与上次成功运行时相同，无需再检查详情
+        if util.fingerprint_unchanged([item["href"] for item in news_items]):
+            util.close_context(context)
+            return
+        news_items = util.select_new_items(
+            news_items,
+            _links,
+            lambda item: "https://www.ainvest.com" + item["href"] if item["href"] else None,
+        )
+
         util.info(f"找到 {len(news_items)} 篇文章")
 
         results = []
+        start_time = time.time()
         for idx, item in enumerate(news_items, 1):
-            # 添加调试信息
-            util.info(f"\n正在处理第 {idx} 篇文章")
-            util.info("HTML 结构：")
-            util.info(item.evaluate("el => el.outerHTML"))
+            if util.budget_exceeded(start_time, DEPTH_BUDGET):
+                break
+            util.info(f"正在处理第 {idx} 篇文章")
 
             try:
-                # 等待每个文章的具体元素
-                title = item.query_selector("h3").inner_text().strip()
+                title = item["title"]
                 if not title:  # 如果标题为空，跳过这篇文章
                     util.info("跳过空标题文章")
                     continue
 
-                link = "https://www.ainvest.com{}".format(
-                    item.get_attribute("href").strip()
-                )
-                if link in ",".join(_links):
+                link = "https://www.ainvest.com{}".format(item["href"] or "")
+                if not item["href"] or link in _links:
                     util.info(f"exists link: {link}")
                     continue
                 image = ""
@@ -106,15 +125,19 @@ def run():
                             "language": "en",
                         },
                     )
+                    _links.add(link)
+                else:
+                    util.mark_incomplete(f"没有得到详情: {link}")
             except Exception as e:
                 util.error(f"处理文章时出错: {e}")
+                util.mark_incomplete("处理文章时出错")
                 continue
 
         if len(_articles) > 0 and insert:
             if len(_articles) > 20:
                 _articles = _articles[:20]
             util.write_json_to_file(_articles, filename)
-        browser.close()
+        util.close_context(context)
         return results
 
 
@@ -1,11 +1,32 @@
 from datetime import timedelta, timezone
-from playwright.sync_api import sync_playwright
 from util.spider_util import SpiderUtil
-from bs4 import BeautifulSoup
-import re
+import time
+from util.html_cleaner import HtmlCleaner
 
 # 获取当前文件名，用于日志标识
 util = SpiderUtil()
+# 详情页清理规则
+CLEAN_RULES = {
+    # 同时移除页脚的文章导航
+    "remove": "script, style, iframe, .adsbygoogle, div.posts-nav-link, div.mvp-org-wrap",
+    # 移除隐藏的段落元素
+    "strip_hidden": "p",
+    # 移除 "Read Also" 段落及其后的内容
+    "truncate_after": ["Read Also"],
+}
+cleaner = HtmlCleaner(CLEAN_RULES)
+# 正文受 Cloudflare 保护，只能通过浏览器获取
+HTTP_FIRST = False
+# 列表页条目的字段
+LIST_FIELDS = {
+    "link": ("", "href"),
+    "title": ("", "text"),
+}
+# 列表深度：固定模式取前 LIST_DEPTH 条；自适应模式遇到第一个已抓取的链接即停止，
+# 最多 MAX_DEPTH 条，详情抓取最多用时 DEPTH_BUDGET 秒
+LIST_DEPTH = 1
+MAX_DEPTH = 5
+DEPTH_BUDGET = 60
 filename = "./news/data/dollarsandsense/list.json"
 storage_state_path = "./news/auth/dollarsandsense.json"
 
@@ -13,50 +34,12 @@ storage_state_path = "./news/auth/dollarsandsense.json"
 def get_detail(page):
     # 获取文章详情内容
     try:
-        detail_element = page.query_selector("#mvp-content-main")
-        print(detail_element)
-        if detail_element:
-            html_content = detail_element.inner_html()
-            # 使用BeautifulSoup处理HTML
-            soup = BeautifulSoup(html_content, "html.parser")
-            # 移除脚本和样式元素
-            for element in soup.select("script, style, iframe, .adsbygoogle"):
-                element.decompose()
-
-            # 移除隐藏的段落元素
-            for element in soup.find_all("p", style=re.compile(r"display:\s*none")):
-                element.decompose()
-
-            # 查找并移除包含 "Read Also" 的段落及其链接
-            read_also_elements = soup.find_all("p", string=lambda text: text and "Read Also" in text)
-            if not read_also_elements:
-                # 查找更复杂的结构，如包含strong、em和a标签的"Read Also"段落
-                read_also_elements = soup.find_all("p", 
-                    lambda tag: tag.find("strong") and tag.find("em") and 
-                                tag.find("a") and "Read Also" in tag.text if hasattr(tag, 'text') else False)
-            
-            for read_also_p in read_also_elements:
-                util.info(f"移除 Read Also 段落: {read_also_p.get_text()[:30]}...")
-                # 移除该段落
-                read_also_p.decompose()
-                
-                # 移除该段落后面的所有内容
-                next_element = read_also_p.next_sibling
-                while next_element:
-                    next_sibling = next_element.next_sibling
-                    next_element.decompose()
-                    next_element = next_sibling
-
-            # 移除页脚内容
-            footer_divs = soup.find_all("div", class_=["posts-nav-link", "mvp-org-wrap"])
-            for div in footer_divs:
-                util.info(f"移除页脚内容: {div}")
-                div.decompose()
-
-            return str(soup).strip()
-        else:
+        # 在页面内选取正文并移除无用元素，只取回清理后的 HTML
+        html_content = util.extract_html(page, "#mvp-content-main", cleaner)
+        description = util.clean_html(cleaner, html_content, extracted=True)
+        if not description:
             util.error("未找到文章详情内容")
-            return ""
+        return description
     except Exception as e:
         util.error(f"获取文章详情时出错: {str(e)}")
         return ""
@@ -67,35 +50,21 @@ def run():
     _articles = data["articles"]
     _links = data["links"]
     insert = False
-    with sync_playwright() as p:
+    depth = util.listing_depth(LIST_DEPTH, MAX_DEPTH)
+    with util.launch_browser() as browser:
         try:
-            # 启动浏览器，添加更多安全选项
-            browser = p.firefox.launch(
-                headless=util.get_crawler_headless(),
-                slow_mo=300,
-            )
-
             # 创建新的浏览器上下文
             try:
-                context = browser.new_context(
-                    storage_state=util.get_storage_state("dollarsandsense")
-                )
+                context = util.new_context(browser, "dollarsandsense")
             except Exception as e:
                 util.error(f"创建浏览器上下文失败: {e}")
                 # 创建一个没有存储状态的上下文作为备选
-                browser = p.firefox.launch(
-                    headless=False,
-                    slow_mo=300,
-                )
-                context = browser.new_context()
+                context = util.new_context(browser)
                 util.info("已创建无状态的浏览器上下文")
-            page = context.new_page()
-
-            js = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-            page.add_init_script(js)
+            page = util.get_page(context)
 
             # 访问目标网页
-            page.goto("https://dollarsandsense.sg/", timeout=10000)
+            util.goto(page, "https://dollarsandsense.sg/", timeout=10000)
             util.info("开始访问网页...")
 
             # 检查是否存在 cloudflare 验证
@@ -107,7 +76,9 @@ def run():
                 util.info("检测到需要 cloudflare 验证, 请手动完成验证操作...")
                 util.log_action_error("检测到 dollarsandsense 需要 cloudflare 验证")
                 # 等待内容出现
-                page.wait_for_selector(".mvp-side-tab-story h2 > a", timeout=10000)
+                util.wait_for_selector(
+                    page, ".mvp-side-tab-story h2 > a", timeout=10000
+                )
                 util.info("cloudflare 验证已完成")
                 storage = context.storage_state(path=storage_state_path)
             else:
@@ -115,30 +86,38 @@ def run():
 
             # 获取前3个实际加载的新闻项（确保有内容）
             # 等待标签有内容
-            page.wait_for_selector(".mvp-side-tab-story h2 > a", timeout=10000)
+            util.wait_for_selector(page, ".mvp-side-tab-story h2 > a", timeout=10000)
             util.info("文章链接已加载")
 
-            news_items = page.query_selector_all(".mvp-side-tab-story h2 > a")[:5]
+            news_items = util.extract_list(
+                page, ".mvp-side-tab-story h2 > a", LIST_FIELDS, limit=depth
+            )
+            news_items = util.select_new_items(
+                news_items, _links, lambda item: item["link"]
+            )
 
             util.info(f"找到 {len(news_items)} 篇文章")
 
             # 处理获取到的数据
-            for item in news_items[:1]:
-                link = item.get_attribute("href").strip()
-                if link in ",".join(_links):
+            start_time = time.time()
+            for item in news_items:
+                if util.budget_exceeded(start_time, DEPTH_BUDGET):
+                    break
+                link = item["link"]
+                if not link or link in _links:
                     util.info(f"exists link: {link}")
                     continue
 
-                title = item.inner_text().strip()
+                title = item["title"]
                 if not title:  # 如果标题为空，跳过这篇文章
                     util.info("跳过空标题文章")
                     continue
 
                 util.info(f"开始访问网页: {link}")
-                page.goto(link)
+                util.goto(page, link)
 
                 # 等待文章详情内容加载
-                page.wait_for_selector("#mvp-content-main", timeout=10000)
+                util.wait_for_selector(page, "#mvp-content-main", timeout=10000)
                 description = get_detail(page)
                 if description != "":
                     # 添加到文章列表
@@ -155,19 +134,21 @@ def run():
                             "language": "en",
                         },
                     )
+                    _links.add(link)
+                else:
+                    util.mark_incomplete(f"没有得到详情: {link}")
             # 保存数据
             if len(_articles) > 0 and insert:
                 if len(_articles) > 20:
                     _articles = _articles[:20]
                 util.write_json_to_file(_articles, filename)
 
-            # 完成后关闭浏览器
-            context.close()
-            browser.close()
+            # 完成后关闭上下文
+            util.close_context(context)
         except Exception as e:
-            context.close()
-            browser.close()
+            util.close_context(context)
             util.error(f"执行脚本时出错: {str(e)}")
+            util.mark_incomplete("执行脚本时出错")
 
 
 # 使用 SpiderUtil 的 execute_with_timeout 方法执行 run 函数
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+常驻进程：只启动一次 Firefox 并一直保持，已登录的上下文（xueqiu、seekingalpha、dollarsandsense）
+跨轮次复用，不用每次重新加载 cookie。按内部定时器重复执行各来源，结果同样通过 write_json_to_file 写入。
+每个来源距离上次执行至少间隔 --interval 秒，连续没有新文章时沿用调度器的退避间隔。
+浏览器断开后自动重新启动；收到 SIGINT / SIGTERM 后等当前来源执行完再退出。
+来源在同一个进程内执行，按 sources.py 中的超时时间限制执行时间；超时后丢弃已登录的上下文并重新启动浏览器。
+
+用法（在仓库根目录执行）:
+python3 ./news/scripts/runner/daemon.py [--interval 300] [--once] [来源名称 ...]
+
+未指定来源时执行所有启用的来源；停用的来源（如 xueqiu）需要按名称指定
+"""
+import argparse
+import importlib
+import os
+import signal
+import threading
+import time
+import traceback
+
+from sources import select_sources
+from scheduler import (
+    backoff_interval,
+    load_stats,
+    order_sources,
+    record_outcome,
+    save_stats,
+)
+from util.spider_util import SpiderUtil
+from util.supervisor import GRACE_PERIOD, DeadlineExceeded, deadline
+
+util = SpiderUtil()
+
+# 每个来源两次执行之间的最短间隔（秒）
+DEFAULT_INTERVAL = 300
+# 收到退出信号后设置，等待下一轮时也会被唤醒
+stop_event = threading.Event()
+
+
+def next_run_at(source, stats, interval):
+    """
+    计算来源下一次可以执行的时间
+
+    参数:
+    source (dict): 来源配置
+    stats (dict): 调度历史
+    interval (float): 最短执行间隔（秒）
+
+    返回:
+    float: 时间戳，从未执行过时为 0
+    """
+    last_run = stats.get(source["name"], {}).get("last_run")
+    if last_run is None:
+        return 0
+    return last_run + max(interval, backoff_interval(source, stats))
+
+
+def run_source(browser, source):
+    """
+    在常驻浏览器中执行单个来源的 run，超过来源的超时时间后中断，
+    执行结束后关闭该来源遗留的上下文，缓存的已登录上下文除外
+
+    参数:
+    browser (Browser): 常驻的 Playwright 浏览器实例
+    source (dict): 来源配置
+
+    返回:
+    dict: status、elapsed 和 inserted，格式与 execute_with_timeout 的返回值一致；
+    restart 为 True 时浏览器需要重新启动
+    """
+    name = source["name"]
+    outcome = {"status": "ok", "inserted": 0}
+    start_time = time.time()
+    try:
+        module = importlib.import_module(name)
+        module.util.reset_run_state()
+        # 超时时不保存运行状态，与子进程超时的处理一致
+        with deadline(source["timeout"]):
+            module.util.profiled(module.run)()
+        outcome["inserted"] = module.util.save_run_state()["inserted"]
+    except DeadlineExceeded:
+        outcome["status"] = "timeout"
+        util.log_action_error(f"{name}.py timeout after {source['timeout']} seconds\n")
+    except Exception as e:
+        traceback.print_exc()
+        outcome["status"] = "error"
+        util.log_action_error(f"{name}.py error: {repr(e)}\n")
+    closed = True
+    try:
+        with deadline(GRACE_PERIOD):
+            warm = list(SpiderUtil.warm_contexts.values())
+            for context in list(browser.contexts):
+                if context not in warm:
+                    context.close()
+    except (Exception, DeadlineExceeded) as e:
+        util.error(f"关闭上下文失败: {repr(e)}")
+        closed = False
+    outcome["elapsed"] = time.time() - start_time
+    # 超时中断的来源可能让浏览器和已登录的上下文停留在未知状态，重新启动后再执行后面的来源
+    outcome["restart"] = (
+        outcome["status"] == "timeout" or not closed or not browser.is_connected()
+    )
+    return outcome
+
+
+def close_warm_contexts():
+    for context in SpiderUtil.warm_contexts.values():
+        try:
+            context.close()
+        except Exception:
+            # 浏览器已经断开时上下文无法关闭
+            pass
+    SpiderUtil.warm_contexts = {}
+
+
+def run_round(browser, sources, stats, interval):
+    """
+    执行一轮：按调度器的顺序执行所有到期的来源，每个来源执行完立即保存调度历史
+
+    参数:
+    browser (Browser): 常驻的 Playwright 浏览器实例
+    sources (list): 来源配置列表
+    stats (dict): 调度历史
+    interval (float): 最短执行间隔（秒）
+
+    返回:
+    bool: 是否需要重新启动浏览器，为 True 时本轮剩余的来源在重新启动后执行
+    """
+    now = time.time()
+    for source in order_sources(sources, stats):
+        if stop_event.is_set() or not browser.is_connected():
+            return False
+        if next_run_at(source, stats, interval) > now:
+            continue
+        util.info(f"开始执行 {source['name']}")
+        outcome = run_source(browser, source)
+        restart = outcome.pop("restart")
+        record_outcome(stats, source["name"], outcome)
+        save_stats(stats)
+        util.info(
+            f"{source['name']} {outcome['status']}，耗时 {outcome['elapsed']:.3f} 秒，"
+            f"新增 {outcome['inserted']} 篇"
+        )
+        if restart:
+            return True
+    return False
+
+
+def run_daemon(sources, interval, once=False):
+    """
+    保持浏览器运行并按定时器重复执行各来源，直到收到退出信号
+
+    参数:
+    sources (list): 来源配置列表
+    interval (float): 最短执行间隔（秒）
+    once (bool): 只执行一轮就退出
+    """
+    stats = load_stats()
+    SpiderUtil.warm_contexts = {}
+    # 浏览器重新启动后继续执行本轮剩余的来源
+    restart = False
+    while not stop_event.is_set():
+        start_time = time.time()
+        with util.launch_browser() as browser:
+            util.info(f"Firefox 启动耗时 {time.time() - start_time:.3f} 秒")
+            SpiderUtil.shared_browser = browser
+            try:
+                while not stop_event.is_set() and browser.is_connected():
+                    restart = run_round(browser, sources, stats, interval)
+                    if restart:
+                        # 退出后关闭浏览器并丢弃已登录的上下文
+                        break
+                    if once:
+                        return
+                    wait = min(next_run_at(s, stats, interval) for s in sources)
+                    wait = max(1, wait - time.time())
+                    util.info(f"{wait:.0f} 秒后执行下一轮")
+                    stop_event.wait(wait)
+            finally:
+                SpiderUtil.shared_browser = None
+                close_warm_contexts()
+        if not stop_event.is_set():
+            util.error("来源超时，重新启动浏览器" if restart else "浏览器已断开，重新启动")
+
+
+def stop(signum, frame):
+    util.info(f"收到信号 {signum}，当前来源执行完后退出")
+    stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="常驻浏览器的定时爬虫")
+    parser.add_argument("sources", nargs="*", help="只执行指定的来源")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=float(os.getenv("CRAWLER_INTERVAL", DEFAULT_INTERVAL)),
+        help="每个来源两次执行之间的最短间隔（秒）",
+    )
+    parser.add_argument("--once", action="store_true", help="只执行一轮就退出")
+    args = parser.parse_args()
+
+    sources = select_sources(args.sources)
+    if not sources:
+        util.error(f"没有匹配的来源: {args.sources}")
+        return
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    run_daemon(sources, args.interval, once=args.once)
+    util.info("常驻进程已退出")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+汇总 news/cache/runtime/metrics.jsonl 中的耗时记录：按来源和阶段统计次数、总耗时、中位数和 P95，
+找出各来源的时间主要花在哪个阶段。
+
+用法（在仓库根目录执行）:
+python3 ./news/scripts/runner/metrics_report.py [--path news/cache/runtime/metrics.jsonl] [--last N] [来源名称 ...]
+
+--last 只统计每个来源最近 N 次运行的记录
+"""
+import argparse
+import json
+import os
+
+import sources  # noqa: F401 设置 sys.path，使脚本可以导入 util
+from util.metrics import DEFAULT_METRICS_PATH
+
+
+def load_spans(path, names=None):
+    spans = []
+    with open(path) as f:
+        for line in f:
+            try:
+                span = json.loads(line)
+            except ValueError:
+                # 进程被结束时可能留下不完整的行
+                continue
+            if not names or span.get("source") in names:
+                spans.append(span)
+    return spans
+
+
+def last_runs(spans, count):
+    """
+    只保留每个来源最近 count 次运行的记录
+
+    参数:
+    spans (list): 耗时记录
+    count (int): 运行次数
+
+    返回:
+    list: 过滤后的耗时记录
+    """
+    runs = {}
+    for span in spans:
+        source_runs = runs.setdefault(span["source"], [])
+        if span["run"] not in source_runs:
+            source_runs.append(span["run"])
+    keep = {run for source_runs in runs.values() for run in source_runs[-count:]}
+    return [span for span in spans if span["run"] in keep]
+
+
+def percentile(values, ratio):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def summarize(spans):
+    """
+    按来源和阶段汇总耗时
+
+    参数:
+    spans (list): 耗时记录
+
+    返回:
+    dict: {来源: {阶段: {"count", "total", "p50", "p95", "errors"}}}
+    """
+    grouped = {}
+    for span in spans:
+        grouped.setdefault(span["source"], {}).setdefault(span["span"], []).append(span)
+    summary = {}
+    for source, stages in grouped.items():
+        summary[source] = {}
+        for name, items in stages.items():
+            durations = [item["duration"] for item in items]
+            summary[source][name] = {
+                "count": len(items),
+                "total": sum(durations),
+                "p50": percentile(durations, 0.5),
+                "p95": percentile(durations, 0.95),
+                "errors": sum(1 for item in items if item["status"] != "ok"),
+            }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="汇总爬虫各阶段的耗时")
+    parser.add_argument("sources", nargs="*", help="只统计指定的来源")
+    parser.add_argument(
+        "--path",
+        default=os.getenv("CRAWLER_METRICS", DEFAULT_METRICS_PATH),
+        help="耗时记录文件",
+    )
+    parser.add_argument("--last", type=int, help="只统计每个来源最近 N 次运行")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"没有耗时记录: {args.path}")
+        return
+    spans = load_spans(args.path, args.sources)
+    if args.last:
+        spans = last_runs(spans, args.last)
+    for source, stages in sorted(summarize(spans).items()):
+        runs = len({span["run"] for span in spans if span["source"] == source})
+        print(f"{source}（{runs} 次运行）")
+        # 总耗时最多的阶段排在最前
+        for name, stat in sorted(stages.items(), key=lambda item: -item[1]["total"]):
+            print(
+                f"  {name:<14} {stat['count']:>5} 次  总计 {stat['total']:>8.2f} 秒"
+                f"  中位数 {stat['p50']:.3f}  P95 {stat['p95']:.3f}"
+                + (f"  失败 {stat['errors']} 次" if stat["errors"] else "")
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+单进程爬虫编排器：只启动一次 Firefox，在同一个进程内依次执行各来源的 run，
+每个来源在共享浏览器中使用自己独立的 BrowserContext。
+每个来源按 sources.py 中的超时时间限制执行时间，超时后关闭它的上下文并重新启动浏览器，再执行后面的来源。
+
+用法（在仓库根目录执行）:
+python3 ./news/scripts/runner/orchestrator.py [--compare] [来源名称 ...]
+
+--compare 会先按现有方式逐个启动脚本执行一遍，再用编排器执行一遍，并对比总耗时。
+第一遍执行前备份 news/cache 和 news/data，第二遍执行前恢复，两遍从相同的状态开始
+"""
+import argparse
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+from sources import script_path, select_sources
+from util.spider_util import SpiderUtil
+from util.supervisor import GRACE_PERIOD, DeadlineExceeded, deadline
+
+util = SpiderUtil()
+
+# --compare 时两遍执行之间需要恢复的状态目录：校验缓存、列表指纹、list.json、已抓取链接索引和文章数据库
+STATE_DIRS = ["./news/cache", "./news/data"]
+
+
+def snapshot_state(directory):
+    """
+    备份状态目录
+
+    参数:
+    directory (str): 备份保存的目录
+    """
+    for index, path in enumerate(STATE_DIRS):
+        if os.path.isdir(path):
+            shutil.copytree(path, os.path.join(directory, str(index)))
+
+
+def restore_state(directory, sources):
+    """
+    用备份覆盖状态目录，备份中没有的目录直接删除。同时移除已导入的来源模块，
+    之后执行时重新导入（包括 fork 出的工作进程），不会沿用内存中已经更新的缓存和指纹
+
+    参数:
+    directory (str): snapshot_state 保存备份的目录
+    sources (list): 已经执行过的来源配置列表
+    """
+    for index, path in enumerate(STATE_DIRS):
+        backup = os.path.join(directory, str(index))
+        shutil.rmtree(path, ignore_errors=True)
+        if os.path.isdir(backup):
+            shutil.copytree(backup, path)
+    for source in sources:
+        sys.modules.pop(source["name"], None)
+
+
+def close_contexts(browser):
+    """
+    关闭来源遗留的上下文，关闭过程同样限制时间
+
+    参数:
+    browser (Browser): 共享的 Playwright 浏览器实例
+
+    返回:
+    bool: 是否全部关闭，失败时浏览器需要重新启动
+    """
+    try:
+        with deadline(GRACE_PERIOD):
+            for context in list(browser.contexts):
+                context.close()
+        return True
+    except (Exception, DeadlineExceeded) as e:
+        util.error(f"关闭上下文失败: {repr(e)}")
+        return False
+
+
+def run_source(browser, source):
+    """
+    在共享浏览器中执行单个来源的 run，超过来源的超时时间后中断，执行结束后关闭该来源遗留的上下文
+
+    参数:
+    browser (Browser): 共享的 Playwright 浏览器实例
+    source (dict): 来源配置
+
+    返回:
+    dict: 来源名称、执行状态和耗时，状态为 "ok"、"error" 或 "timeout"；
+    restart 为 True 时浏览器需要重新启动
+    """
+    name = source["name"]
+    status = "ok"
+    start_time = time.time()
+    try:
+        module = importlib.import_module(name)
+        # 超时时不保存运行状态，与子进程超时的处理一致
+        with deadline(source["timeout"]):
+            module.util.profiled(module.run)()
+        module.util.save_run_state()
+    except DeadlineExceeded:
+        status = "timeout"
+        util.log_action_error(f"{name}.py timeout after {source['timeout']} seconds\n")
+    except Exception as e:
+        traceback.print_exc()
+        status = "error"
+        util.log_action_error(f"{name}.py error: {repr(e)}\n")
+    # 脚本异常退出时可能没有关闭上下文，这里统一清理，保证来源之间互不影响
+    closed = close_contexts(browser)
+    return {
+        "name": name,
+        "status": status,
+        "elapsed": time.time() - start_time,
+        # 超时中断的来源可能让浏览器停留在未知状态，重新启动后再执行后面的来源
+        "restart": status == "timeout" or not closed or not browser.is_connected(),
+    }
+
+
+def run_orchestrated(sources):
+    """
+    启动一次 Firefox 并依次执行所有来源，来源超时或浏览器异常时重新启动浏览器
+
+    参数:
+    sources (list): 来源配置列表
+
+    返回:
+    tuple: (每个来源的执行结果列表, 总耗时)
+    """
+    start_time = time.time()
+    results = []
+    pending = list(sources)
+    while pending:
+        launch_time = time.time()
+        with util.launch_browser() as browser:
+            util.info(f"Firefox 启动耗时 {time.time() - launch_time:.3f} 秒")
+            SpiderUtil.shared_browser = browser
+            try:
+                while pending:
+                    source = pending.pop(0)
+                    util.info(f"开始执行 {source['name']}")
+                    result = run_source(browser, source)
+                    results.append(result)
+                    if result.pop("restart") and pending:
+                        util.error(f"{source['name']} 执行后重新启动浏览器")
+                        break
+            finally:
+                SpiderUtil.shared_browser = None
+    return results, time.time() - start_time
+
+
+def run_per_script(sources):
+    """
+    按工作流现有方式为每个来源单独启动一个 Python 进程执行脚本
+
+    参数:
+    sources (list): 来源配置列表
+
+    返回:
+    tuple: (每个来源的执行结果列表, 总耗时)
+    """
+    start_time = time.time()
+    results = []
+    for source in sources:
+        script_start = time.time()
+        code = subprocess.call([sys.executable, script_path(source["name"])])
+        results.append(
+            {
+                "name": source["name"],
+                "status": "ok" if code == 0 else "error",
+                "elapsed": time.time() - script_start,
+            }
+        )
+    return results, time.time() - start_time
+
+
+def print_report(title, results, total):
+    util.info(f"{title}: 总耗时 {total:.3f} 秒")
+    for result in results:
+        util.info(
+            f"  {result['name']:<20} {result['status']:<7} {result['elapsed']:.3f} 秒"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单浏览器爬虫编排器")
+    parser.add_argument("sources", nargs="*", help="只执行指定的来源")
+    parser.add_argument(
+        "--compare", action="store_true", help="同时按逐个脚本的方式执行并对比总耗时"
+    )
+    args = parser.parse_args()
+
+    sources = select_sources(args.sources)
+    if not sources:
+        util.error(f"没有匹配的来源: {args.sources}")
+        return
+
+    if args.compare:
+        with tempfile.TemporaryDirectory() as snapshot:
+            snapshot_state(snapshot)
+            legacy_results, legacy_total = run_per_script(sources)
+            print_report("逐个脚本执行", legacy_results, legacy_total)
+            restore_state(snapshot, sources)
+
+    results, total = run_orchestrated(sources)
+    print_report("单浏览器编排执行", results, total)
+
+    if args.compare:
+        saved = legacy_total - total
+        util.info(
+            f"对比: 逐个脚本 {legacy_total:.3f} 秒, 编排器 {total:.3f} 秒, 节省 {saved:.3f} 秒"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+多进程并行执行各来源：按机器的 CPU 数量创建进程池，每个工作进程第一次执行来源时启动自己的 Firefox，
+之后该进程内的来源共用这个浏览器，不同进程之间互不影响。来源超时后中断，该进程的浏览器关闭后重新启动。
+各来源写入自己的 list.json 和缓存文件；共用的文章数据库使用 WAL 模式并等待写锁，
+tmp/action_errors.log 加锁追加写入，多个进程同时写入也不会损坏。
+
+用法（在仓库根目录执行）:
+python3 ./news/scripts/runner/pool.py [--workers N] [--compare] [来源名称 ...]
+
+--compare 会先用单浏览器编排器串行执行一遍，再并行执行一遍，并对比总耗时。
+串行执行前备份 news/cache 和 news/data，并行执行前恢复，两遍从相同的状态开始
+"""
+import argparse
+import importlib
+import multiprocessing
+import os
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+
+from playwright.sync_api import sync_playwright
+
+from orchestrator import (
+    close_contexts,
+    print_report,
+    restore_state,
+    run_orchestrated,
+    snapshot_state,
+)
+from sources import select_sources
+from util.spider_util import SpiderUtil
+from util.supervisor import DeadlineExceeded, deadline
+
+util = SpiderUtil()
+
+# 工作进程自己的 Playwright 和浏览器，第一次执行来源时启动
+_playwright = None
+
+
+def default_workers(sources):
+    """
+    进程数量默认等于 CPU 数量，不超过来源数量
+
+    参数:
+    sources (list): 来源配置列表
+
+    返回:
+    int: 进程数量
+    """
+    return max(1, min(os.cpu_count() or 1, len(sources)))
+
+
+def close_worker_browser():
+    global _playwright
+    if SpiderUtil.shared_browser is not None:
+        try:
+            SpiderUtil.shared_browser.close()
+        except Exception:
+            pass
+        SpiderUtil.shared_browser = None
+    if _playwright is not None:
+        _playwright.stop()
+        _playwright = None
+
+
+def worker_browser():
+    """
+    获取当前工作进程的浏览器，还没有启动或已经断开时重新启动
+
+    返回:
+    Browser: Playwright 浏览器实例
+    """
+    global _playwright
+    browser = SpiderUtil.shared_browser
+    if browser is not None and browser.is_connected():
+        return browser
+    if _playwright is None:
+        _playwright = sync_playwright().start()
+        # 工作进程退出时不会执行 atexit，通过 Finalize 关闭浏览器
+        Finalize(None, close_worker_browser, exitpriority=10)
+    start_time = time.time()
+    browser = _playwright.firefox.launch(headless=util.get_crawler_headless())
+    util.info(f"进程 {os.getpid()} 的 Firefox 启动耗时 {time.time() - start_time:.3f} 秒")
+    SpiderUtil.shared_browser = browser
+    return browser
+
+
+def run_source(name, timeout):
+    """
+    在工作进程中执行单个来源的 run，超过超时时间后中断，执行结束后关闭该来源遗留的上下文。
+    超时或上下文无法关闭时关闭工作进程的浏览器，下一个来源重新启动
+
+    参数:
+    name (str): 来源名称
+    timeout (float): 超时时间（秒）
+
+    返回:
+    dict: 来源名称、执行状态、耗时、新增文章数量和进程 ID
+    """
+    result = {"name": name, "status": "ok", "inserted": 0, "pid": os.getpid()}
+    start_time = time.time()
+    browser = None
+    try:
+        browser = worker_browser()
+        module = importlib.import_module(name)
+        with deadline(timeout):
+            module.util.profiled(module.run)()
+        result["inserted"] = module.util.save_run_state()["inserted"]
+    except DeadlineExceeded:
+        result["status"] = "timeout"
+        util.log_action_error(f"{name}.py timeout after {timeout} seconds\n")
+    except Exception as e:
+        traceback.print_exc()
+        result["status"] = "error"
+        util.log_action_error(f"{name}.py error: {repr(e)}\n")
+    if browser is not None and browser.is_connected():
+        closed = close_contexts(browser)
+        if result["status"] == "timeout" or not closed:
+            close_worker_browser()
+    result["elapsed"] = time.time() - start_time
+    return result
+
+
+def run_parallel(sources, workers):
+    """
+    在进程池中并行执行所有来源
+
+    参数:
+    sources (list): 来源配置列表
+    workers (int): 进程数量
+
+    返回:
+    tuple: (每个来源的执行结果列表, 总耗时)
+    """
+    start_time = time.time()
+    results = []
+    # 使用 fork，工作进程直接继承已经设置好的 sys.path
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        # 超时时间长的来源先提交，避免它们最后才开始拖长总耗时
+        ordered = sorted(sources, key=lambda source: -source["timeout"])
+        futures = {}
+        for source in ordered:
+            future = executor.submit(run_source, source["name"], source["timeout"])
+            futures[future] = source["name"]
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # 工作进程异常退出
+                util.log_action_error(f"{futures[future]}.py error: {repr(e)}\n")
+                results.append(
+                    {"name": futures[future], "status": "error", "elapsed": 0}
+                )
+    # 按来源配置的顺序输出
+    names = [source["name"] for source in sources]
+    results.sort(key=lambda result: names.index(result["name"]))
+    return results, time.time() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多进程并行执行爬虫")
+    parser.add_argument("sources", nargs="*", help="只执行指定的来源")
+    parser.add_argument("--workers", type=int, help="进程数量，默认等于 CPU 数量")
+    parser.add_argument(
+        "--compare", action="store_true", help="同时串行执行一遍并对比总耗时"
+    )
+    args = parser.parse_args()
+
+    sources = select_sources(args.sources)
+    if not sources:
+        util.error(f"没有匹配的来源: {args.sources}")
+        return
+    workers = args.workers or default_workers(sources)
+
+    if args.compare:
+        with tempfile.TemporaryDirectory() as snapshot:
+            snapshot_state(snapshot)
+            serial_results, serial_total = run_orchestrated(sources)
+            print_report("串行执行", serial_results, serial_total)
+            # 串行执行已经更新了缓存、指纹和历史文章，恢复后并行执行才会重新抓取
+            restore_state(snapshot, sources)
+
+    results, total = run_parallel(sources, workers)
+    print_report(f"并行执行（{workers} 个进程）", results, total)
+
+    if args.compare:
+        speedup = serial_total / total if total > 0 else 0
+        util.info(
+            f"对比: 串行 {serial_total:.3f} 秒, 并行 {total:.3f} 秒, 加速 {speedup:.2f} 倍"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+按截止时间调度各来源：根据历史耗时为每个来源分配时间预算，优先级高的来源先执行，
+剩余时间不足时缩减或跳过低优先级的来源。每个来源在独立的子进程中执行，超时会连同浏览器一起结束。
+连续没有新文章的来源按指数退避，降低抓取频率，有新文章后恢复每次都抓取。
+
+用法（在仓库根目录执行）:
+python3 ./news/scripts/runner/scheduler.py [--deadline 360] [--all] [来源名称 ...]
+
+--all 忽略退避，执行所有来源；指定来源名称时同样忽略退避
+"""
+import argparse
+import importlib
+import json
+import os
+import time
+
+from sources import select_sources
+from util.file_util import RUNTIME_DIR, write_atomic
+from util.spider_util import SpiderUtil
+
+util = SpiderUtil()
+
+# 所有来源总共可用的时间（秒），工作流整体限制为 9 分钟，需要留出安装依赖和提交的时间
+DEFAULT_DEADLINE = 360
+# 每个来源至少需要的时间，剩余时间少于这个值时不再启动新的来源
+MIN_BUDGET = 20
+# 预算 = 最近几次耗时的最大值 * BUDGET_FACTOR + BUDGET_MARGIN，不超过来源的超时时间
+BUDGET_FACTOR = 1.5
+BUDGET_MARGIN = 10
+# 每个来源保留的历史记录数量
+HISTORY_SIZE = 10
+# 第 n 次连续空跑后至少间隔 BACKOFF_BASE * 2^(n-1) 秒再执行，不超过来源的 max_interval
+BACKOFF_BASE = 600
+DEFAULT_MAX_INTERVAL = 3 * 3600
+# 调度历史，每次运行都会变化，保存在运行时目录，不随工作流提交
+STATS_PATH = os.path.join(RUNTIME_DIR, "scheduler.json")
+# 旧版本随工作流提交的调度历史，读取一次后删除
+LEGACY_STATS_PATH = "./news/cache/scheduler.json"
+
+
+def load_stats(path=STATS_PATH):
+    for candidate in (path, LEGACY_STATS_PATH):
+        try:
+            with open(candidate) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+    return {}
+
+
+def save_stats(stats, path=STATS_PATH):
+    write_atomic(path, json.dumps(stats, ensure_ascii=False, indent=2))
+    if os.path.exists(LEGACY_STATS_PATH):
+        os.remove(LEGACY_STATS_PATH)
+
+
+def expected_duration(source, stats):
+    """
+    根据历史记录估计来源的耗时，没有记录时使用超时时间
+
+    参数:
+    source (dict): 来源配置
+    stats (dict): 调度历史
+
+    返回:
+    float: 预计耗时（秒）
+    """
+    durations = stats.get(source["name"], {}).get("durations", [])
+    if not durations:
+        return source["timeout"]
+    return max(durations)
+
+
+def budget_for(source, stats):
+    """
+    计算来源的时间预算
+
+    参数:
+    source (dict): 来源配置
+    stats (dict): 调度历史
+
+    返回:
+    float: 时间预算（秒）
+    """
+    durations = stats.get(source["name"], {}).get("durations", [])
+    if not durations:
+        return source["timeout"]
+    budget = max(durations) * BUDGET_FACTOR + BUDGET_MARGIN
+    return max(MIN_BUDGET, min(source["timeout"], budget))
+
+
+def average_yield(source, stats):
+    """
+    最近几次运行平均每次新增的文章数量
+
+    参数:
+    source (dict): 来源配置
+    stats (dict): 调度历史
+
+    返回:
+    float: 平均新增数量，没有记录时为 0
+    """
+    yields = stats.get(source["name"], {}).get("yields", [])
+    return sum(yields) / len(yields) if yields else 0
+
+
+def backoff_interval(source, stats):
+    """
+    根据连续空跑的次数计算退避间隔
+
+    参数:
+    source (dict): 来源配置
+    stats (dict): 调度历史
+
+    返回:
+    float: 距离上次执行至少需要间隔的秒数，没有空跑时为 0
+    """
+    streak = stats.get(source["name"], {}).get("empty_streak", 0)
+    if streak == 0:
+        return 0
+    max_interval = source.get("max_interval", DEFAULT_MAX_INTERVAL)
+    return min(max_interval, BACKOFF_BASE * 2 ** (streak - 1))
+
+
+def is_due(source, stats, now):
+    """
+    判断来源本次是否需要执行
+
+    参数:
+    source (dict): 来源配置
+    stats (dict): 调度历史
+    now (float): 当前时间戳
+
+    返回:
+    bool: 距离上次执行已超过退避间隔时返回 True
+    """
+    last_run = stats.get(source["name"], {}).get("last_run")
+    if last_run is None:
+        return True
+    return now - last_run >= backoff_interval(source, stats)
+
+
+def order_sources(sources, stats):
+    """
+    按优先级从高到低排序，优先级相同时最近新增文章多的先执行，再按预计耗时从短到长
+
+    参数:
+    sources (list): 来源配置列表
+    stats (dict): 调度历史
+
+    返回:
+    list: 排序后的来源配置列表
+    """
+    return sorted(
+        sources,
+        key=lambda source: (
+            -source.get("priority", 1),
+            -average_yield(source, stats),
+            expected_duration(source, stats),
+        ),
+    )
+
+
+def plan_source(source, stats, remaining):
+    """
+    根据剩余时间决定来源的执行方式
+
+    参数:
+    source (dict): 来源配置
+    stats (dict): 调度历史
+    remaining (float): 剩余时间（秒）
+
+    返回:
+    tuple: (动作, 预算)，动作为 "run"、"trim" 或 "skip"
+    """
+    if remaining < MIN_BUDGET:
+        return "skip", 0
+    budget = budget_for(source, stats)
+    if budget <= remaining:
+        return "run", budget
+    # 剩余时间不够完整预算，但足够平时的耗时，按固定深度缩减后执行
+    if expected_duration(source, stats) <= remaining:
+        return "trim", remaining
+    return "skip", 0
+
+
+def record_outcome(stats, name, outcome):
+    """
+    记录来源的执行结果，超时的耗时同样计入，避免低估耗时。
+    只有正常完成的运行会更新新增数量和连续空跑次数，出错或超时不触发退避
+
+    参数:
+    stats (dict): 调度历史
+    name (str): 来源名称
+    outcome (dict): execute_with_timeout 的返回值
+    """
+    entry = stats.setdefault(name, {"durations": []})
+    durations = entry["durations"] + [round(outcome["elapsed"], 3)]
+    entry["durations"] = durations[-HISTORY_SIZE:]
+    entry["last_status"] = outcome["status"]
+    entry["last_run"] = time.time()
+    if outcome["status"] == "ok":
+        inserted = outcome.get("inserted", 0)
+        entry["yields"] = (entry.get("yields", []) + [inserted])[-HISTORY_SIZE:]
+        entry["empty_streak"] = 0 if inserted else entry.get("empty_streak", 0) + 1
+
+
+def run_source(source, budget, trim=False):
+    """
+    在子进程中执行来源，超过预算后结束子进程
+
+    参数:
+    source (dict): 来源配置
+    budget (float): 时间预算（秒）
+    trim (bool): 是否缩减，缩减时关闭自适应深度，只抓取固定深度；
+        固定深度使用单独的列表指纹，不会覆盖自适应深度的指纹
+
+    返回:
+    dict: execute_with_timeout 的返回值
+    """
+    module = importlib.import_module(source["name"])
+    func = module.run
+    if util.get_crawler_async() and hasattr(module, "run_async"):
+        func = module.run_async
+    previous = os.environ.get("CRAWLER_ADAPTIVE_DEPTH")
+    if trim:
+        os.environ["CRAWLER_ADAPTIVE_DEPTH"] = "0"
+    try:
+        return module.util.execute_with_timeout(func, timeout=budget)
+    finally:
+        if trim:
+            if previous is None:
+                os.environ.pop("CRAWLER_ADAPTIVE_DEPTH", None)
+            else:
+                os.environ["CRAWLER_ADAPTIVE_DEPTH"] = previous
+
+
+def run_scheduled(sources, deadline, ignore_backoff=False):
+    """
+    在截止时间内依次执行各来源
+
+    参数:
+    sources (list): 来源配置列表
+    deadline (float): 总共可用的时间（秒）
+    ignore_backoff (bool): 是否忽略退避，执行所有来源
+
+    返回:
+    list: 每个来源的名称、动作、预算、执行状态和耗时
+    """
+    start_time = time.time()
+    stats = load_stats()
+    results = []
+    for source in order_sources(sources, stats):
+        if not ignore_backoff and not is_due(source, stats, time.time()):
+            entry = stats[source["name"]]
+            wait = entry["last_run"] + backoff_interval(source, stats) - time.time()
+            util.info(
+                f"{source['name']} 连续 {entry['empty_streak']} 次没有新文章，"
+                f"{wait / 60:.0f} 分钟后再执行"
+            )
+            results.append(
+                {
+                    "name": source["name"],
+                    "action": "wait",
+                    "budget": 0,
+                    "status": "skipped",
+                    "elapsed": 0,
+                }
+            )
+            continue
+        remaining = deadline - (time.time() - start_time)
+        action, budget = plan_source(source, stats, remaining)
+        result = {"name": source["name"], "action": action, "budget": budget}
+        if action == "skip":
+            util.info(f"剩余 {remaining:.0f} 秒，跳过 {source['name']}")
+            result.update(status="skipped", elapsed=0)
+        else:
+            util.info(
+                f"开始执行 {source['name']}，预算 {budget:.0f} 秒"
+                + ("（时间不足，按固定深度执行）" if action == "trim" else "")
+            )
+            outcome = run_source(source, budget, trim=action == "trim")
+            record_outcome(stats, source["name"], outcome)
+            # 每个来源执行完立即保存，调度器本身被中断时也不会丢失记录
+            save_stats(stats)
+            result.update(
+                status=outcome["status"],
+                elapsed=outcome["elapsed"],
+                inserted=outcome["inserted"],
+            )
+        results.append(result)
+    return results
+
+
+def print_report(results):
+    for result in results:
+        util.info(
+            f"  {result['name']:<20} {result['action']:<5} {result['status']:<8}"
+            f" 预算 {result['budget']:>5.0f} 秒  耗时 {result['elapsed']:.3f} 秒"
+            + (f"  新增 {result['inserted']} 篇" if "inserted" in result else "")
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按截止时间调度爬虫")
+    parser.add_argument("sources", nargs="*", help="只执行指定的来源")
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=float(os.getenv("CRAWLER_DEADLINE", DEFAULT_DEADLINE)),
+        help="所有来源总共可用的时间（秒）",
+    )
+    parser.add_argument("--all", action="store_true", help="忽略退避，执行所有来源")
+    args = parser.parse_args()
+
+    sources = select_sources(args.sources)
+    if not sources:
+        util.error(f"没有匹配的来源: {args.sources}")
+        return
+
+    start_time = time.time()
+    results = run_scheduled(
+        sources, args.deadline, ignore_backoff=args.all or bool(args.sources)
+    )
+    util.info(f"调度完成: 总耗时 {time.time() - start_time:.3f} 秒")
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
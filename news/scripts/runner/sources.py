@@ -0,0 +1,51 @@
+import os
+import sys
+
+# 让 runner 下的脚本可以像 news/scripts/*.py 一样导入 util 和各个爬虫模块
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+# 工作流中实际执行抓取的来源、超时时间（秒）和优先级，超时与各脚本 __main__ 中的设置保持一致
+# 优先级越高越先执行，时间不够时优先跳过或缩减低优先级的来源；更新频繁的快讯优先级最高
+# max_interval: 连续没有新文章时退避的最长间隔（秒），更新越少的来源越长
+# enabled: 为 False 的来源目前在脚本中停用，只有按名称指定时才会执行（例如常驻进程中保持登录状态的来源）
+SOURCES = [
+    {"name": "stcn_live", "timeout": 50, "priority": 3, "max_interval": 600},
+    {"name": "ainvest", "timeout": 50, "priority": 2, "max_interval": 3600},
+    {"name": "idc", "timeout": 120, "priority": 1, "max_interval": 6 * 3600},
+    {"name": "theedgemalaysia", "timeout": 120, "priority": 2, "max_interval": 3600},
+    {"name": "theindependent", "timeout": 120, "priority": 1, "max_interval": 3 * 3600},
+    {"name": "thesmartinvestor", "timeout": 120, "priority": 1, "max_interval": 3 * 3600},
+    {"name": "xueqiu", "timeout": 120, "priority": 2, "enabled": False},
+    {"name": "seekingalpha_transcript", "timeout": 120, "priority": 1, "enabled": False},
+    {"name": "dollarsandsense", "timeout": 120, "priority": 1, "enabled": False},
+]
+
+
+def select_sources(names=None):
+    """
+    按名称筛选来源，未传入名称时返回全部启用的来源
+
+    参数:
+    names (list): 来源名称列表
+
+    返回:
+    list: 来源配置列表
+    """
+    if not names:
+        return [source for source in SOURCES if source.get("enabled", True)]
+    return [source for source in SOURCES if source["name"] in names]
+
+
+def script_path(name):
+    """
+    获取来源对应的脚本路径
+
+    参数:
+    name (str): 来源名称
+
+    返回:
+    str: 脚本路径
+    """
+    return os.path.join(SCRIPTS_DIR, f"{name}.py")
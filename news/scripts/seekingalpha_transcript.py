@@ -1,113 +1,161 @@
 from datetime import timedelta, timezone
-from playwright.sync_api import sync_playwright
+import time
 from util.spider_util import SpiderUtil
-from bs4 import BeautifulSoup
-import re
+from util.api_client import ApiClient, AuthError
+from util.html_cleaner import HtmlCleaner
 
 # 获取当前文件名，用于日志标识
 util = SpiderUtil()
+# 详情页清理规则
+CLEAN_RULES = {
+    "remove": "script, style",
+}
+cleaner = HtmlCleaner(CLEAN_RULES)
 filename = "./news/data/seekingalpha/list.json"
 storage_state_path = "./news/auth/seekingalpha_cookie.json"
+# 列表深度：固定模式取前 LIST_DEPTH 条；自适应模式遇到第一个已抓取的链接即停止，
+# 最多 MAX_DEPTH 条，详情抓取最多用时 DEPTH_BUDGET 秒
+LIST_DEPTH = 5
+MAX_DEPTH = 10
+DEPTH_BUDGET = 60
+# sa-transcripts 作者页使用的 feed 接口
+FEED_API = "https://seekingalpha.com/api/v3/feed"
+FEED_PARAMS = {"all[]": "sa-transcripts", "page[size]": 20}
+api = ApiClient(
+    util,
+    cookie_name="seekingalpha_cookie",
+    headers={"Referer": "https://seekingalpha.com/author/sa-transcripts/analysis"},
+)
 
 def get_detail(page):
     # 获取文章详情内容
     try:
-        detail_element = page.query_selector("div[data-test-id='content-container']")
-        if detail_element:
-            html_content = detail_element.inner_html()
-            # 使用BeautifulSoup处理HTML
-            soup = BeautifulSoup(html_content, "html.parser")
-            # 移除脚本和样式元素
-            for element in soup.select("script, style"):
-                element.decompose()
-
-            # 获取清理后的HTML内容
-            return str(soup).strip()
-        else:
+        # 在页面内选取正文并移除无用元素，只取回清理后的 HTML
+        html_content = util.extract_html(page, "div[data-test-id='content-container']", cleaner)
+        description = util.clean_html(cleaner, html_content, extracted=True)
+        if not description:
             util.error("未找到文章详情内容")
-            return ""
+        return description
     except Exception as e:
         util.error(f"获取文章详情时出错: {str(e)}")
         return ""
 
 
+def fetch_feed_api():
+    # 直接请求 sa-transcripts 的 feed 接口，cookie 失效或被拦截时返回 None，由浏览器刷新
+    try:
+        json_data = api.get_json(FEED_API, params=FEED_PARAMS, conditional=True)
+        if json_data is None:
+            util.info("seekingalpha feed 没有变化")
+            return []
+        articles = json_data.get("data", [])
+        util.info(f"通过接口获取seekingalpha原创内容，共 {len(articles)} 条")
+        return articles
+    except AuthError as e:
+        util.info(f"seekingalpha 接口需要刷新登录状态: {str(e)}")
+    except Exception as e:
+        util.error(f"请求 seekingalpha 接口时出错: {str(e)}")
+    return None
+
+
+def article_link(article):
+    # 获取文章链接，使用嵌套字典访问方式
+    links = article.get("links", {})
+    link_path = links.get("self", "")
+    return f"https://seekingalpha.com{link_path}"
+
+
+def fetch_feed_browser(page, context):
+    # 通过页面获取 feed，同时检查并刷新登录状态，遇到人机验证时返回 None
+    # 访问目标网页
+    util.goto(page, "https://seekingalpha.com/", timeout=6000)
+    util.info("开始访问网页...")
+
+    page.wait_for_timeout(3000)
+    # 检查是否存在人机验证
+    if page.is_visible("text=Before we continue...", timeout=3000):
+        util.log_action_error("检测到人机验证页面")
+        return None
+    else:
+        util.info("无需人机验证")
+
+    # 检查是否存在登录按钮
+    login_button_exists = page.is_visible("span.hidden.text-medium-2-r.md\\:flex:has-text('Log in')", timeout=3000)
+    if login_button_exists:
+        util.log_action_error("检测到 seekingalpha 需要登录")
+        # 等待登录按钮消失，表示用户已登录
+        util.wait_for_selector(
+            page, "span.hidden.text-medium-2-r.md\\:flex:has-text('Log in')", state="hidden", timeout=20000
+        )
+        util.info("登录操作已完成")
+        storage = context.storage_state(path=storage_state_path)
+        print(storage)
+    else:
+        util.info("已登录状态，无需重新登录")
+    # 页面访问后 cookie 可能已更新，接口改用浏览器上下文中的 cookie
+    api.load_cookies(context.cookies())
+
+    # 使用 expect_response 等待 XHR 响应
+    with page.expect_response(
+        lambda response: "/api/v3/feed" in response.url
+        and "all[]=sa-transcripts" in response.url
+        and response.status == 200
+    ) as response_info:
+        util.goto(page, "https://seekingalpha.com/author/sa-transcripts/analysis", timeout=6000)
+
+    # 获取响应对象
+    response = response_info.value
+    json_data = response.json()
+    util.info(
+        f"成功获取seekingalpha原创内容，共 {len(json_data.get('data', []))} 条"
+    )
+    return json_data.get("data", [])
+
+
 def run():
     data = util.history_posts(filename)
     _articles = data["articles"]
     _links = data["links"]
     insert = False
-    with sync_playwright() as p:
+    # 优先直接请求接口，接口可用且没有新文章时无需启动浏览器
+    articles = fetch_feed_api() if util.get_crawler_api() else None
+    if articles is not None and util.fingerprint_unchanged(
+        [article_link(article) for article in articles[:LIST_DEPTH]]
+    ):
+        return
+    if articles is not None and all(
+        article_link(article) in _links for article in articles[:LIST_DEPTH]
+    ):
+        util.info("没有新的 seekingalpha 文章")
+        return
+    with util.launch_browser() as browser:
         try:
-            # 启动浏览器，添加更多安全选项
-            browser = p.firefox.launch(
-                headless=util.get_crawler_headless(),
-                slow_mo=300,
-            )
-
             # 创建新的浏览器上下文
             try:
-                context = browser.new_context(
-                    storage_state=util.get_storage_state("seekingalpha_cookie")
-                )
+                context = util.new_context(browser, "seekingalpha_cookie")
             except Exception as e:
                 util.error(f"创建浏览器上下文失败: {e}")
                 # 创建一个没有存储状态的上下文作为备选
-                browser = p.firefox.launch(
-                    headless=False,
-                    slow_mo=300,
-                )
-                context = browser.new_context()
+                context = util.new_context(browser)
                 util.info("已创建无状态的浏览器上下文")
             page = context.new_page()
 
-            # 访问目标网页
-            page.goto("https://seekingalpha.com/", timeout=6000)
-            util.info("开始访问网页...")
-
-            page.wait_for_timeout(3000)
-            # 检查是否存在人机验证
-            if page.is_visible("text=Before we continue...", timeout=3000):
-                util.log_action_error("检测到人机验证页面")
-                return
-            else:
-                util.info("无需人机验证")
-
-            # 检查是否存在登录按钮
-            login_button_exists = page.is_visible("span.hidden.text-medium-2-r.md\\:flex:has-text('Log in')", timeout=3000)
-            if login_button_exists:
-                util.log_action_error("检测到 seekingalpha 需要登录")
-                # 等待登录按钮消失，表示用户已登录
-                page.wait_for_selector(
-                    "span.hidden.text-medium-2-r.md\\:flex:has-text('Log in')", state="hidden", timeout=20000
-                )
-                util.info("登录操作已完成")
-                storage = context.storage_state(path=storage_state_path)
-                print(storage)
-            else:
-                util.info("已登录状态，无需重新登录")
-
-            # 使用 expect_response 等待 XHR 响应
-            with page.expect_response(
-                lambda response: "/api/v3/feed" in response.url
-                and "all[]=sa-transcripts" in response.url
-                and response.status == 200
-            ) as response_info:
-                page.goto("https://seekingalpha.com/author/sa-transcripts/analysis", timeout=6000)
-
-            # 获取响应对象
-            response = response_info.value
-            json_data = response.json()
-            util.info(
-                f"成功获取seekingalpha原创内容，共 {len(json_data.get('data', []))} 条"
-            )
+            # 接口不可用时通过页面获取，并刷新 cookie
+            if articles is None:
+                articles = fetch_feed_browser(page, context)
+                if articles is None:
+                    util.close_context(context)
+                    return
 
             # 处理获取到的数据
-            articles = json_data.get("data", [])
-            for article in articles[:5]:  # 只处理前5条
-                # 获取文章链接，使用嵌套字典访问方式
-                links = article.get('links', {})
-                link_path = links.get('self', '')
-                link = f"https://seekingalpha.com{link_path}"
+            depth = util.listing_depth(LIST_DEPTH, MAX_DEPTH)
+            start_time = time.time()
+            for article in util.select_new_items(
+                articles[:depth], _links, article_link
+            ):
+                if util.budget_exceeded(start_time, DEPTH_BUDGET):
+                    break
+                link = article_link(article)
                 # 检查链接是否已存在
                 if link in _links:
                     util.info(f"链接已存在: {link}")
@@ -119,14 +167,15 @@ def run():
                 pub_date = util.current_time_string()
 
                 util.info(f"开始访问网页: {link}")
-                page.goto(link)
+                util.goto(page, link)
 
                 # 等待文章详情内容加载
                 # 等待内容容器加载
                 try:
-                    page.wait_for_selector("text=View all", timeout=5000)
+                    util.wait_for_selector(page, "text=View all", timeout=5000)
                 except Exception as e:
                     util.info(f"等待'View all'选择器超时: {str(e)}")
+                    util.mark_incomplete(f"没有得到详情: {link}")
                     continue
                 # 滚动到页面底部以加载所有内容
                 page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
@@ -155,19 +204,21 @@ def run():
                             "language": "en",
                         },
                     )
+                    _links.add(link)
+                else:
+                    util.mark_incomplete(f"没有得到详情: {link}")
             # 保存数据
             if len(_articles) > 0 and insert:
                 if len(_articles) > 10:
                     _articles = _articles[:10]
                 util.write_json_to_file(_articles, filename)
 
-            # 完成后关闭浏览器
-            context.close()
-            browser.close()
+            # 完成后关闭上下文
+            util.close_context(context)
         except Exception as e:
-            context.close()
-            browser.close()
+            util.close_context(context)
             util.error(f"执行脚本时出错: {str(e)}")
+            util.mark_incomplete("执行脚本时出错")
 
 
 # 使用 SpiderUtil 的 execute_with_timeout 方法执行 run 函数
@@ -1,91 +1,126 @@
 from datetime import timedelta, timezone
-from playwright.sync_api import sync_playwright
 from util.spider_util import SpiderUtil
+from util.api_client import ApiClient
 
 # 获取当前文件名，用于日志标识
 util = SpiderUtil()
 filename = "./news/data/stcn_live/list.json"
+# 列表深度：固定模式取前 LIST_DEPTH 条；自适应模式遇到第一个已抓取的链接即停止，
+# 最多 MAX_DEPTH 条
+LIST_DEPTH = 10
+MAX_DEPTH = 20
+# 快讯列表页，带 X-Requested-With 请求时直接返回 JSON
+LIST_URL = "https://www.stcn.com/article/list.html?type=kx"
+api = ApiClient(util, headers={"X-Requested-With": "XMLHttpRequest", "Referer": LIST_URL})
+
+
+def article_link(article):
+    return "https://www.stcn.com{}".format(article["url"])
 
-def run():
-    data = util.history_posts(filename)
-    _articles = data["articles"]
-    _links = data["links"]
-    insert = False
-    with sync_playwright() as p:
-        try:
-            # 启动浏览器，添加更多安全选项
-            browser = p.firefox.launch(
-                headless=util.get_crawler_headless(),
-                slow_mo=300,
-            )
 
-            context = browser.new_context()
+def fetch_list_api():
+    # 直接请求快讯列表接口，失败时返回 None，改用浏览器获取
+    try:
+        json_data = api.get_json(LIST_URL, conditional=True)
+        if json_data is None:
+            util.info("快讯列表没有变化")
+            return []
+        articles = json_data.get("data", [])
+        util.info(f"通过接口获取 stcn 内容，共 {len(articles)} 条")
+        return articles
+    except Exception as e:
+        util.info(f"接口获取 stcn 内容失败，改用浏览器: {str(e)}")
+        return None
+
+
+def fetch_list_browser():
+    # 打开快讯页面，捕获页面发出的列表 XHR 响应
+    with util.launch_browser() as browser:
+        context = util.new_context(browser)
+        try:
             page = context.new_page()
-           
+
             # 使用 expect_response 等待 XHR 响应
             with page.expect_response(
-                lambda response: "article/list.html?type=kx" in response.url 
+                lambda response: "article/list.html?type=kx" in response.url
                 and response.status == 200
                 and "application/json" in response.headers.get("content-type", "")
             ) as response_info:
                 # 访问目标网页
                 util.info("开始访问网页...")
-                page.goto("https://www.stcn.com/article/list.html?type=kx", timeout=10000)
+                util.goto(page, LIST_URL, timeout=10000)
                 page.wait_for_load_state("networkidle")
 
             # 获取响应对象
             response = response_info.value
             json_data = response.json()
-            util.info(
-                f"成功获取 stcn 内容，共 {len(json_data.get('data', []))} 条"
-            )
+            util.info(f"成功获取 stcn 内容，共 {len(json_data.get('data', []))} 条")
+            return json_data.get("data", [])
+        finally:
+            # 完成后关闭上下文
+            util.close_context(context)
 
-            # 处理获取到的数据
-            articles = json_data.get("data", [])
-            if len(articles) == 0:
-                util.info("没有获取到数据")
-                return
-            for article in articles[:10]:  # 只处理前10条
-                link = "https://www.stcn.com{}".format(article["url"])
-                # 检查链接是否已存在
-                if link in _links:
-                    util.info(f"链接已存在: {link}")
-                    continue
 
-                id = article["id"]
-                title = article["title"]
-                pub_date = util.convert_utc_to_local(
-                    article["show_time"], tz=timezone(timedelta(hours=8))
-                )
-                description = article["content"]
-                if description != "":
-                    insert = True
-                    _articles.insert(
-                        0,
-                        {
-                            "title": title,
-                            "id": id,
-                            "description": description,
-                            "link": link,
-                            "pub_date": pub_date,
-                            "source": "stcn",
-                            "kind": 2,
-                            "language": "zh-CN",
-                        },
-                    )
-            # 保存数据
-            if len(_articles) > 0 and insert:
-                if len(_articles) > 20:
-                    _articles = _articles[:20]
-                util.write_json_to_file(_articles, filename)
+def run():
+    data = util.history_posts(filename)
+    _articles = data["articles"]
+    _links = data["links"]
+    insert = False
+    try:
+        # 快讯正文就在列表接口中，接口可用时无需启动浏览器
+        articles = fetch_list_api() if util.get_crawler_api() else None
+        if articles is None:
+            articles = fetch_list_browser()
+
+        # 处理获取到的数据
+        if len(articles) == 0:
+            util.info("没有获取到数据")
+            return
+        # 前10条与上次成功运行时相同，没有新的快讯
+        if util.fingerprint_unchanged(
+            [article["url"] for article in articles[:LIST_DEPTH]]
+        ):
+            return
+        depth = util.listing_depth(LIST_DEPTH, MAX_DEPTH)
+        for article in util.select_new_items(
+            articles[:depth], _links, article_link
+        ):
+            link = article_link(article)
+            # 检查链接是否已存在
+            if link in _links:
+                util.info(f"链接已存在: {link}")
+                continue
 
-            # 完成后关闭浏览器
-            context.close()
-            browser.close()
-        except Exception as e:
-            context.close()
-            browser.close()
-            util.error(f"执行脚本时出错: {str(e)}")
+            id = article["id"]
+            title = article["title"]
+            pub_date = util.convert_utc_to_local(
+                article["show_time"], tz=timezone(timedelta(hours=8))
+            )
+            description = article["content"]
+            if description != "":
+                insert = True
+                _articles.insert(
+                    0,
+                    {
+                        "title": title,
+                        "id": id,
+                        "description": description,
+                        "link": link,
+                        "pub_date": pub_date,
+                        "source": "stcn",
+                        "kind": 2,
+                        "language": "zh-CN",
+                    },
+                )
+                _links.add(link)
+        # 保存数据
+        if len(_articles) > 0 and insert:
+            if len(_articles) > 20:
+                _articles = _articles[:20]
+            util.write_json_to_file(_articles, filename)
+    except Exception as e:
+        util.error(f"执行脚本时出错: {str(e)}")
+        util.mark_incomplete("执行脚本时出错")
 
 
 # 使用 SpiderUtil 的 execute_with_timeout 方法执行 run 函数
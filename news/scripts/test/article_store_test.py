@@ -0,0 +1,75 @@
+import os
+import sqlite3
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.article_store import SCHEMA, export_articles, prune_articles, upsert_articles
+
+LIST_FILE = "./news/data/example/list.json"
+
+
+def article(link, title="title"):
+    return {"link": link, "title": title, "source": "example", "pub_date": "2024-01-01"}
+
+
+class ArticleStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.executescript(SCHEMA)
+        self.cursor = self.conn.cursor()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def links(self, limit=20):
+        return [a["link"] for a in export_articles(self.cursor, LIST_FILE, limit)]
+
+    def test_insert_keeps_list_order(self):
+        articles = [article("c"), article("b"), article("a")]
+        inserted = upsert_articles(self.cursor, articles, LIST_FILE)
+        self.assertEqual(inserted, 3)
+        self.assertEqual(self.links(), ["c", "b", "a"])
+
+    def test_new_articles_go_first(self):
+        upsert_articles(self.cursor, [article("b"), article("a")], LIST_FILE)
+        articles = [article("d"), article("c"), article("b")]
+        inserted = upsert_articles(self.cursor, articles, LIST_FILE)
+        self.assertEqual(inserted, 2)
+        self.assertEqual(self.links(), ["d", "c", "b", "a"])
+
+    def test_existing_article_updated_in_place(self):
+        upsert_articles(self.cursor, [article("b"), article("a")], LIST_FILE)
+        inserted = upsert_articles(self.cursor, [article("a", title="new")], LIST_FILE)
+        self.assertEqual(inserted, 0)
+        exported = export_articles(self.cursor, LIST_FILE, 20)
+        self.assertEqual([a["link"] for a in exported], ["b", "a"])
+        self.assertEqual(exported[1]["title"], "new")
+
+    def test_unchanged_article_not_rewritten(self):
+        upsert_articles(self.cursor, [article("a")], LIST_FILE)
+        self.cursor.execute("SELECT updated_at FROM articles")
+        before = self.cursor.fetchone()[0]
+        self.cursor.execute("UPDATE articles SET updated_at = 0")
+        upsert_articles(self.cursor, [article("a")], LIST_FILE)
+        self.cursor.execute("SELECT updated_at FROM articles")
+        self.assertEqual(self.cursor.fetchone()[0], 0)
+        self.assertGreater(before, 0)
+
+    def test_prune_keeps_newest(self):
+        articles = [article(link) for link in "edcba"]
+        upsert_articles(self.cursor, articles, LIST_FILE)
+        self.assertEqual(prune_articles(self.cursor, LIST_FILE, keep=3), 2)
+        self.assertEqual(self.links(), ["e", "d", "c"])
+        self.assertEqual(prune_articles(self.cursor, LIST_FILE, keep=3), 0)
+
+    def test_export_limit_and_list_file(self):
+        articles = [article("c"), article("b"), article("a")]
+        upsert_articles(self.cursor, articles, LIST_FILE)
+        upsert_articles(self.cursor, [article("x")], "./news/data/other/list.json")
+        self.assertEqual(self.links(limit=2), ["c", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
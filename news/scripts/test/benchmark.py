@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+离线基准测试：使用 fixtures 下各来源的详情页和列表页，多次执行各来源的详情清理和列表解析，
+输出吞吐量和内存峰值，并与基线比较，变慢或内存增加超过容差时返回失败。
+
+fixture 分为两组，分别比较各自的基线，不会混用：
+- recorded: fixtures/recorded/<来源>/，--record 从线上录制的页面，基线为 benchmark_baseline_recorded.json。
+  有录制的页面时默认使用这一组，只有它的结果能反映线上页面的清理和解析开销
+- synthetic: fixtures/synthetic/<来源>/，按各站点的页面结构手工生成的小页面，只用于检查清理规则和列表字段
+  能否正常工作，以及作为没有网络时的粗略参考，基线为 benchmark_baseline_synthetic.json
+
+耗时按校准任务（固定的 lxml 解析和序列化）换算成相对值后再比较，不同机器上的基线可以通用。
+
+用法（在仓库根目录执行）:
+python3 ./news/scripts/test/benchmark.py [--fixtures recorded|synthetic] [--iterations 200]
+    [--update-baseline] [来源名称 ...]
+python3 ./news/scripts/test/benchmark.py --record [来源名称 ...]
+
+--fixtures 选择 fixture 分组，默认有录制的页面时使用 recorded，否则使用 synthetic
+--update-baseline 用本次结果覆盖所选分组的基线，录制新的页面后需要执行
+--record 从线上录制列表页和第一篇文章的详情页到 fixtures/recorded，只支持可以直接通过 HTTP 获取的来源
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from urllib.parse import urljoin
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+import lxml.html
+
+from util.listing import extract_list_html, listing_links
+
+FIXTURES_DIR = os.path.join(TEST_DIR, "fixtures")
+# fixture 分组：从线上录制的页面和手工生成的合成页面
+FIXTURE_SETS = ("recorded", "synthetic")
+RECORDED_DIR = os.path.join(FIXTURES_DIR, "recorded")
+DEFAULT_ITERATIONS = 200
+# 相对耗时或内存峰值超过基线的比例，超过即视为退化，可以通过 BENCH_TOLERANCE 修改
+DEFAULT_TOLERANCE = 0.5
+# 在容差之外额外允许的绝对误差，避免耗时很短或内存很小的任务因为抖动误报
+SLACK = {"relative": 0.05, "peak_kb": 8}
+# 统计内存峰值时执行的次数
+MEMORY_ITERATIONS = 3
+
+# 没有 DETAIL_SELECTOR 常量的来源在 extract_html 中使用的正文选择器
+DETAIL_SELECTORS = {
+    "dollarsandsense": "#mvp-content-main",
+    "seekingalpha_transcript": "div[data-test-id='content-container']",
+    "xueqiu": ".article__bd__detail",
+}
+# 带作者规则的来源，使用有规则的作者清理
+DETAIL_AUTHORS = {"xueqiu": "8680038754"}
+# 没有 LIST_ITEM_SELECTOR 常量的来源在 extract_list 中使用的条目选择器
+LIST_SELECTORS = {"dollarsandsense": ".mvp-side-tab-story h2 > a"}
+# 列表来自接口的来源：(条目所在的字段, 生成链接的函数名)
+LIST_APIS = {
+    "stcn_live": ("data", "article_link"),
+    "xueqiu": ("home_timeline", "timeline_link"),
+    "seekingalpha_transcript": ("data", "article_link"),
+}
+
+
+def baseline_path(fixture_set):
+    return os.path.join(TEST_DIR, f"benchmark_baseline_{fixture_set}.json")
+
+
+def fixture_sources(fixture_set):
+    directory = os.path.join(FIXTURES_DIR, fixture_set)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name
+        for name in os.listdir(directory)
+        if os.path.isdir(os.path.join(directory, name))
+    )
+
+
+def default_fixture_set():
+    # 有录制的页面时使用录制的页面，否则退回合成页面
+    return "recorded" if fixture_sources("recorded") else "synthetic"
+
+
+def read_fixture(fixture_set, source, name):
+    path = os.path.join(FIXTURES_DIR, fixture_set, source, name)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def detail_task(fixture_set, source, module):
+    """
+    生成清理详情页的任务：与 fetch_detail_http 相同，先找到正文根节点再按站点规则清理
+
+    参数:
+    fixture_set (str): fixture 分组
+    source (str): 来源名称
+    module (module): 来源的爬虫模块
+
+    返回:
+    callable: 执行一次清理并返回结果，没有详情页 fixture 时返回 None
+    """
+    html = read_fixture(fixture_set, source, "detail.html")
+    if html is None:
+        return None
+    cleaner = module.cleaner
+    selector = getattr(module, "DETAIL_SELECTOR", None) or DETAIL_SELECTORS.get(source)
+    author = DETAIL_AUTHORS.get(source)
+    if selector is None:
+        return lambda: cleaner.clean(html, author=author)
+
+    def task():
+        root = cleaner.find_root(html, selector)
+        return cleaner.clean(None, author=author, root=root)
+
+    return task
+
+
+def list_task(fixture_set, source, module):
+    """
+    生成解析列表的任务：HTML 列表按字段表解析，接口列表解析 JSON 后生成链接
+
+    参数:
+    fixture_set (str): fixture 分组
+    source (str): 来源名称
+    module (module): 来源的爬虫模块
+
+    返回:
+    callable: 执行一次解析并返回链接列表，没有列表 fixture 时返回 None
+    """
+    if source in LIST_APIS:
+        text = read_fixture(fixture_set, source, "list.json")
+        if text is None:
+            return None
+        key, link_func = LIST_APIS[source]
+        link_of = getattr(module, link_func)
+        return lambda: [link_of(article) for article in json.loads(text)[key]]
+
+    html = read_fixture(fixture_set, source, "list.html")
+    if html is None:
+        return None
+    selector = getattr(module, "LIST_ITEM_SELECTOR", None) or LIST_SELECTORS[source]
+    limit = getattr(module, "MAX_DEPTH", None)
+    return lambda: listing_links(
+        extract_list_html(html, selector, module.LIST_FIELDS, limit=limit)
+    )
+
+
+def calibrate(iterations=150):
+    """
+    执行固定的 lxml 解析和序列化任务，作为换算相对耗时的单位
+
+    返回:
+    float: 单次校准任务的耗时（秒）
+    """
+    html = "<div>" + "<p>calibration <a href='#'>link</a> <b>text</b></p>" * 400 + "</div>"
+
+    def task():
+        lxml.html.tostring(lxml.html.fromstring(html))
+
+    return measure(task, iterations)
+
+
+def measure(task, iterations):
+    """
+    多次执行任务，取最快的一轮，减少其他进程干扰
+
+    返回:
+    float: 单次执行的耗时（秒）
+    """
+    task()
+    rounds = 3
+    per_round = max(1, iterations // rounds)
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(per_round):
+            task()
+        elapsed = (time.perf_counter() - start) / per_round
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(task):
+    """
+    统计执行任务时 Python 分配的内存峰值
+
+    返回:
+    int: 内存峰值，单位为 KB
+    """
+    tracemalloc.start()
+    try:
+        for _ in range(MEMORY_ITERATIONS):
+            task()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(fixture_set, sources=None, iterations=DEFAULT_ITERATIONS):
+    """
+    对各来源的详情清理和列表解析执行基准测试
+
+    参数:
+    fixture_set (str): fixture 分组
+    sources (list): 来源名称，默认该分组中所有有 fixture 的来源
+    iterations (int): 每个任务的执行次数
+
+    返回:
+    dict: {"fixtures": 分组, "calibration": 校准耗时, "results": {来源: {阶段: 结果}}}，
+    结果包含 ops（每秒次数）、ms（单次毫秒数）、relative（相对耗时）和 peak_kb（内存峰值）
+    """
+    unit = calibrate()
+    results = {}
+    timings = []
+    for source in sources or fixture_sources(fixture_set):
+        module = importlib.import_module(source)
+        stages = {
+            "detail": detail_task(fixture_set, source, module),
+            "list": list_task(fixture_set, source, module),
+        }
+        for stage, task in stages.items():
+            if task is None:
+                continue
+            seconds = measure(task, iterations)
+            result = {
+                "ops": round(1 / seconds, 1),
+                "ms": round(seconds * 1000, 3),
+                "peak_kb": peak_memory(task),
+            }
+            results.setdefault(source, {})[stage] = result
+            timings.append((result, seconds))
+    # 测试前后各校准一次取较快的一次，避免单次校准受干扰后所有相对值一起偏移
+    unit = min(unit, calibrate())
+    for result, seconds in timings:
+        result["relative"] = round(seconds / unit, 3)
+    return {"fixtures": fixture_set, "calibration": unit, "results": results}
+
+
+def load_baseline(fixture_set):
+    try:
+        with open(baseline_path(fixture_set)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(report):
+    baseline = {
+        source: {
+            stage: {"relative": result["relative"], "peak_kb": result["peak_kb"]}
+            for stage, result in stages.items()
+        }
+        for source, stages in report["results"].items()
+    }
+    with open(baseline_path(report["fixtures"]), "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(report, baseline, tolerance=None):
+    """
+    与基线比较，找出相对耗时或内存峰值超过容差的阶段
+
+    参数:
+    report (dict): run_benchmarks 的返回值
+    baseline (dict): 基线
+    tolerance (float): 容差，默认读取 BENCH_TOLERANCE 环境变量
+
+    返回:
+    list: 退化的说明，没有退化时为空
+    """
+    if tolerance is None:
+        tolerance = float(os.getenv("BENCH_TOLERANCE", DEFAULT_TOLERANCE))
+    regressions = []
+    for source, stages in report["results"].items():
+        for stage, result in stages.items():
+            expected = baseline.get(source, {}).get(stage)
+            if expected is None:
+                continue
+            for key, slack in SLACK.items():
+                limit = expected[key] * (1 + tolerance) + slack
+                if result[key] > limit:
+                    regressions.append(
+                        f"{source}.{stage} {key}: {result[key]} > 基线 {expected[key]}"
+                        f"（容差 {tolerance:.0%}）"
+                    )
+    return regressions
+
+
+def print_report(report, baseline):
+    print(f"fixture 分组: {report['fixtures']}")
+    if report["fixtures"] == "synthetic":
+        print("注意: 合成页面远小于线上页面，结果不能代表线上页面的清理和解析开销")
+    print(f"校准任务单次耗时 {report['calibration'] * 1000:.3f} ms")
+    print(
+        f"{'source':<26}{'stage':<8}{'ops/s':>10}{'ms':>10}"
+        f"{'relative':>10}{'baseline':>10}{'peak KB':>10}"
+    )
+    for source, stages in sorted(report["results"].items()):
+        for stage, result in stages.items():
+            expected = baseline.get(source, {}).get(stage, {}).get("relative", "-")
+            print(
+                f"{source:<26}{stage:<8}{result['ops']:>10.1f}{result['ms']:>10.3f}"
+                f"{result['relative']:>10.3f}{expected:>10}{result['peak_kb']:>10}"
+            )
+
+
+def record(sources):
+    """
+    从线上录制列表页和第一篇文章的详情页，保存到 fixtures/recorded，之后默认使用录制的分组
+
+    参数:
+    sources (list): 来源名称
+    """
+    for source in sources:
+        module = importlib.import_module(source)
+        list_url = getattr(module, "LIST_URL", None)
+        selector = getattr(module, "LIST_ITEM_SELECTOR", None)
+        if not list_url or not selector or source in LIST_APIS:
+            print(f"{source}: 列表需要浏览器或登录状态，跳过录制")
+            continue
+        util = module.util
+        response = util.http_get(list_url)
+        if response.status_code != 200:
+            print(f"{source}: 列表页请求失败 {response.status_code}")
+            continue
+        directory = os.path.join(RECORDED_DIR, source)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "list.html"), "w", encoding="utf-8") as f:
+            f.write(response.text)
+        links = listing_links(
+            extract_list_html(response.text, selector, module.LIST_FIELDS, limit=1)
+        )
+        if not links or not links[0]:
+            print(f"{source}: 列表页中没有条目，只录制了列表页")
+            continue
+        # 列表中的链接可能是相对路径
+        link = urljoin(list_url, links[0])
+        detail = util.http_get(link)
+        if detail.status_code == 200:
+            with open(os.path.join(directory, "detail.html"), "w", encoding="utf-8") as f:
+                f.write(detail.text)
+            print(f"{source}: 已录制 {list_url} 和 {link}")
+        else:
+            print(f"{source}: 详情页请求失败 {detail.status_code}: {link}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="详情清理和列表解析的离线基准测试")
+    parser.add_argument("sources", nargs="*", help="只测试指定的来源")
+    parser.add_argument(
+        "--fixtures",
+        choices=FIXTURE_SETS,
+        help="fixture 分组，默认有录制的页面时使用 recorded，否则使用 synthetic",
+    )
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--record", action="store_true", help="从线上录制 fixture")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.sources or fixture_sources("synthetic"))
+        return
+
+    fixture_set = args.fixtures or default_fixture_set()
+    if not fixture_sources(fixture_set):
+        print(f"fixtures/{fixture_set} 中没有 fixture，先用 --record 录制")
+        sys.exit(1)
+    report = run_benchmarks(fixture_set, args.sources, args.iterations)
+    baseline = load_baseline(fixture_set)
+    print_report(report, baseline)
+    if args.update_baseline:
+        save_baseline(report)
+        print(f"基线已更新: {baseline_path(fixture_set)}")
+        return
+    regressions = find_regressions(report, baseline)
+    for regression in regressions:
+        print(f"退化: {regression}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import importlib
+import json
+import os
+import unittest
+
+from benchmark import (
+    FIXTURE_SETS,
+    LIST_APIS,
+    baseline_path,
+    default_fixture_set,
+    detail_task,
+    find_regressions,
+    fixture_sources,
+    list_task,
+    load_baseline,
+    run_benchmarks,
+)
+
+
+def fixture_modules():
+    # 录制的和合成的 fixture 都需要能解析
+    for fixture_set in FIXTURE_SETS:
+        for source in fixture_sources(fixture_set):
+            yield fixture_set, source, importlib.import_module(source)
+
+
+class FixtureParsingTest(unittest.TestCase):
+    """
+    fixture 中的详情页和列表页都能解析出内容，清理规则或列表字段改坏时可以及时发现
+    """
+
+    def test_detail_fixtures(self):
+        for fixture_set, source, module in fixture_modules():
+            task = detail_task(fixture_set, source, module)
+            if task is None:
+                continue
+            with self.subTest(fixtures=fixture_set, source=source):
+                description = task()
+                self.assertTrue(description)
+                self.assertNotIn("<script", description)
+                self.assertNotIn("<style", description)
+
+    def test_list_fixtures(self):
+        for fixture_set, source, module in fixture_modules():
+            task = list_task(fixture_set, source, module)
+            self.assertIsNotNone(task, f"{fixture_set}/{source} 缺少列表 fixture")
+            with self.subTest(fixtures=fixture_set, source=source):
+                links = task()
+                self.assertTrue(links)
+                self.assertTrue(all(links), f"{source} 的列表中有空链接")
+                if source not in LIST_APIS:
+                    self.assertLessEqual(len(links), module.MAX_DEPTH)
+
+
+@unittest.skipUnless(os.getenv("BENCH_REGRESSION"), "设置 BENCH_REGRESSION=1 时执行")
+class BenchmarkRegressionTest(unittest.TestCase):
+    """
+    与默认 fixture 分组的基线比较，详情清理或列表解析变慢、内存增加超过容差时失败。
+    结果受机器负载影响，make test 中默认跳过，由 make bench 执行
+    """
+
+    def test_no_regression(self):
+        fixture_set = default_fixture_set()
+        baseline = load_baseline(fixture_set)
+        if not baseline:
+            self.skipTest(f"没有基线文件: {baseline_path(fixture_set)}")
+        iterations = int(os.getenv("BENCH_ITERATIONS", 60))
+        report = run_benchmarks(fixture_set, iterations=iterations)
+        self.assertEqual(
+            set(report["results"]), set(baseline), "fixture 与基线的来源不一致"
+        )
+        regressions = find_regressions(report, baseline)
+        self.assertFalse(
+            regressions, "\n" + json.dumps(regressions, ensure_ascii=False, indent=2)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
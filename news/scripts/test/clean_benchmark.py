@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+对比详情页清理的吞吐量：基于 lxml 的 HtmlCleaner 与原来基于 BeautifulSoup html.parser 的实现
+
+用法（在仓库根目录执行）:
+python3 ./news/scripts/test/clean_benchmark.py [--iterations 200] [--file detail.html]
+"""
+import argparse
+import importlib
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from util.html_cleaner import HtmlCleaner
+
+HIDDEN_STYLE = re.compile(r"display:\s*none")
+
+# 各站点的正文外层结构，用于生成测试页面
+WRAPPERS = {
+    "ainvest": "<html><body><div class='news-content'>{}</div></body></html>",
+    "idc": "<div class='big-box'>metadata</div><div class='big-box'>{}</div>",
+    "theedgemalaysia": "<div class='news-detail_newsTextDataWrap__x1'>{}</div>",
+    "xueqiu": "<p><b>添加⭐️标 不再错过推送</b></p>{}<p><b>关注⭐️红与绿⭐️</b></p><p>end</p>",
+}
+SOURCES = [
+    "ainvest",
+    "dollarsandsense",
+    "idc",
+    "seekingalpha_transcript",
+    "theedgemalaysia",
+    "theindependent",
+    "thesmartinvestor",
+    "xueqiu",
+]
+
+
+def sample_body(paragraphs=150):
+    parts = []
+    for i in range(paragraphs):
+        parts.append(
+            f"<p>Paragraph {i} with <a href='/link/{i}'>a link</a> and <strong>bold</strong> text.</p>"
+        )
+        if i % 10 == 0:
+            parts.append("<script>window.ads = window.ads || [];</script>")
+            parts.append("<style>.x{color:red}</style>")
+            parts.append("<iframe src='https://ads.example.com'></iframe>")
+            parts.append("<div class='insert_ads adsbygoogle'>ad</div>")
+            parts.append("<p style='display: none'>hidden</p>")
+    parts.append("<p>Read Also Read also <a href='/next'>next</a></p><p>related</p>")
+    return "".join(parts)
+
+
+def sample_html(source, body):
+    return WRAPPERS.get(source, "{}").format(body)
+
+
+def clean_with_html_parser(html, rules, author=None):
+    """
+    按同样的规则，用原来的 BeautifulSoup html.parser 方式清理
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    if rules.get("container"):
+        containers = soup.select(rules["container"])
+        if len(containers) <= rules.get("container_index", 0):
+            return ""
+        soup = containers[rules.get("container_index", 0)]
+    if rules.get("remove"):
+        for element in soup.select(rules["remove"]):
+            element.decompose()
+    if rules.get("strip_hidden"):
+        for element in soup.select(rules["strip_hidden"]):
+            if HIDDEN_STYLE.search(element.get("style", "")):
+                element.decompose()
+    for marker in rules.get("truncate_after", []):
+        for paragraph in soup.find_all("p"):
+            if marker in paragraph.get_text():
+                for sibling in list(paragraph.next_siblings):
+                    sibling.extract()
+                paragraph.decompose()
+                break
+    rule = rules.get("author_rules", {}).get(str(author))
+    if rule:
+        for b_tag in soup.find_all("b"):
+            if rule["remove_through"] in b_tag.text:
+                start_p = b_tag.find_parent("p")
+                for sibling in list(start_p.previous_siblings):
+                    if sibling.name == "p":
+                        sibling.decompose()
+                start_p.decompose()
+                break
+        for b_tag in soup.find_all("b"):
+            if rule["remove_from"] in b_tag.text:
+                end_p = b_tag.find_parent("p")
+                for sibling in list(end_p.next_siblings):
+                    if sibling.name == "p":
+                        sibling.decompose()
+                end_p.decompose()
+                break
+    return str(soup).strip()
+
+
+def measure(func, iterations):
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="详情页清理吞吐量对比")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--file", help="使用指定的 HTML 文件作为正文，默认生成测试内容")
+    args = parser.parse_args()
+
+    body = sample_body()
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            body = f.read()
+
+    print(f"{'source':<26}{'html.parser/s':>15}{'lxml/s':>12}{'speedup':>10}")
+    for source in SOURCES:
+        rules = importlib.import_module(source).CLEAN_RULES
+        cleaner = HtmlCleaner(rules)
+        html = sample_html(source, body)
+        author = "8680038754" if source == "xueqiu" else None
+
+        baseline = measure(
+            lambda: clean_with_html_parser(html, rules, author), args.iterations
+        )
+        current = measure(lambda: cleaner.clean(html, author=author), args.iterations)
+        print(
+            f"{source:<26}{baseline:>15.1f}{current:>12.1f}{current / baseline:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.link_index import SeenLinks, canonical_url, link_key
+
+
+class CanonicalUrlTest(unittest.TestCase):
+    def test_host_and_trailing_slash(self):
+        self.assertEqual(
+            canonical_url("HTTPS://WWW.Example.com/news/a/#top"),
+            "https://example.com/news/a",
+        )
+
+    def test_tracking_params_removed_and_sorted(self):
+        self.assertEqual(
+            canonical_url("https://example.com/a?utm_source=x&b=2&fbclid=y&a=1"),
+            "https://example.com/a?a=1&b=2",
+        )
+
+    def test_prefix_url_not_merged(self):
+        # 前缀相同的链接不能被视为同一篇文章
+        self.assertNotEqual(
+            canonical_url("https://example.com/news/1"),
+            canonical_url("https://example.com/news/12"),
+        )
+
+
+class LinkKeyTest(unittest.TestCase):
+    def test_idc_hosts_share_key(self):
+        my = "https://my.idc.com/getdoc.jsp?containerId=prAP51234524"
+        www = "https://www.idc.com/getdoc.jsp?containerId=prAP51234524&utm_medium=rss"
+        self.assertEqual(link_key(my), "idc:prAP51234524")
+        self.assertEqual(link_key(my), link_key(www))
+
+    def test_source_id_ignores_slug(self):
+        first = "https://seekingalpha.com/article/4701234-some-slug"
+        second = "https://seekingalpha.com/article/4701234-other-slug?source=feed"
+        self.assertEqual(link_key(first), link_key(second))
+
+    def test_prefix_ids_differ(self):
+        self.assertNotEqual(
+            link_key("https://www.stcn.com/article/detail/123.html"),
+            link_key("https://www.stcn.com/article/detail/1234.html"),
+        )
+
+    def test_fallback_to_canonical_url(self):
+        self.assertEqual(
+            link_key("https://www.example.com/post/?utm_campaign=a"),
+            "https://example.com/post",
+        )
+
+
+class SeenLinksTest(unittest.TestCase):
+    def test_persisted_links_are_seen(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "links.txt")
+            links = SeenLinks(path, ["https://www.example.com/a"])
+            links.save()
+            reloaded = SeenLinks(path)
+            self.assertIn("https://example.com/a/?utm_source=x", reloaded)
+            self.assertNotIn("https://example.com/b", reloaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.listing import ListingFingerprint
+from util.spider_util import SpiderUtil
+
+ADAPTIVE_LINKS = [f"https://example.com/{i}" for i in range(10)]
+FIXED_LINKS = ADAPTIVE_LINKS[:3]
+
+
+class ListingFingerprintTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "example.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_after_save(self):
+        fingerprint = ListingFingerprint(self.path)
+        self.assertFalse(fingerprint.matches(ADAPTIVE_LINKS))
+        fingerprint.save()
+        self.assertTrue(ListingFingerprint(self.path).matches(ADAPTIVE_LINKS))
+
+    def test_modes_do_not_overwrite_each_other(self):
+        fingerprint = ListingFingerprint(self.path)
+        fingerprint.matches(ADAPTIVE_LINKS, "adaptive")
+        fingerprint.save()
+        # 缩减时按固定深度运行，只保存固定深度的指纹
+        self.assertFalse(fingerprint.matches(FIXED_LINKS, "fixed"))
+        fingerprint.save()
+        fingerprint = ListingFingerprint(self.path)
+        self.assertTrue(fingerprint.matches(ADAPTIVE_LINKS, "adaptive"))
+        self.assertTrue(fingerprint.matches(FIXED_LINKS, "fixed"))
+
+    def test_reads_legacy_file(self):
+        legacy = ListingFingerprint(self.path).compute(ADAPTIVE_LINKS)
+        with open(self.path, "w") as f:
+            json.dump({"fingerprint": legacy}, f)
+        self.assertTrue(ListingFingerprint(self.path).matches(ADAPTIVE_LINKS))
+
+    def test_unchanged_file_not_rewritten(self):
+        fingerprint = ListingFingerprint(self.path)
+        fingerprint.matches(ADAPTIVE_LINKS)
+        fingerprint.save()
+        mtime = os.stat(self.path).st_mtime_ns
+        self.assertTrue(fingerprint.matches(ADAPTIVE_LINKS))
+        fingerprint.save()
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+
+
+class FingerprintModeTest(unittest.TestCase):
+    """
+    调度器缩减时设置 CRAWLER_ADAPTIVE_DEPTH=0，之后的自适应运行仍然可以用原来的指纹跳过
+    """
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        self.util = SpiderUtil(notify=False)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def run_once(self, links, adaptive):
+        value = "1" if adaptive else "0"
+        with mock.patch.dict(os.environ, {"CRAWLER_ADAPTIVE_DEPTH": value}):
+            self.util.reset_run_state()
+            unchanged = self.util.fingerprint_unchanged(links)
+            self.util.save_run_state()
+        return unchanged
+
+    def test_trim_run_keeps_adaptive_fingerprint(self):
+        self.assertFalse(self.run_once(ADAPTIVE_LINKS, adaptive=True))
+        self.assertFalse(self.run_once(FIXED_LINKS, adaptive=False))
+        self.assertTrue(self.run_once(ADAPTIVE_LINKS, adaptive=True))
+        self.assertTrue(self.run_once(FIXED_LINKS, adaptive=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
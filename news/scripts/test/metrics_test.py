@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.file_util import RUNTIME_DIR
+from util.metrics import DEFAULT_METRICS_PATH, SpanRecorder, rotate_metrics
+
+
+class RotateMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "metrics.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_lines(self, count):
+        with open(self.path, "w") as f:
+            for i in range(count):
+                f.write(json.dumps({"span": "goto", "index": i}) + "\n")
+
+    def test_keeps_newest_complete_lines(self):
+        self.write_lines(1000)
+        rotate_metrics(self.path, max_bytes=4096)
+        with open(self.path) as f:
+            lines = f.readlines()
+        self.assertLessEqual(os.path.getsize(self.path), 2048)
+        # 每一行都是完整的记录，最后一条保留
+        indexes = [json.loads(line)["index"] for line in lines]
+        self.assertEqual(indexes[-1], 999)
+        self.assertEqual(indexes, list(range(indexes[0], 1000)))
+
+    def test_small_file_untouched(self):
+        self.write_lines(10)
+        mtime = os.stat(self.path).st_mtime_ns
+        rotate_metrics(self.path, max_bytes=4096)
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+
+    def test_missing_file(self):
+        rotate_metrics(self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+
+class SpanRecorderTest(unittest.TestCase):
+    def test_default_path_in_runtime_dir(self):
+        # 运行时目录通过工作流缓存保留，耗时记录可以跨多次运行统计
+        self.assertEqual(os.path.dirname(DEFAULT_METRICS_PATH), RUNTIME_DIR)
+
+    def test_record(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.jsonl")
+            recorder = SpanRecorder("example", path)
+            recorder.new_run()
+            with recorder.span("goto", "https://example.com"):
+                pass
+            with open(path) as f:
+                entry = json.loads(f.readline())
+        self.assertEqual(entry["source"], "example")
+        self.assertEqual(entry["span"], "goto")
+        self.assertEqual(entry["run"], recorder.run_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
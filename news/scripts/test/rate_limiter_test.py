@@ -0,0 +1,82 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.rate_limiter import (
+    MIN_RATE,
+    PENALTY_RATE,
+    TokenBucket,
+    classify_response,
+)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_unlimited_bucket_never_waits(self):
+        bucket = TokenBucket()
+        for _ in range(10):
+            self.assertEqual(bucket.reserve(0.0), 0.0)
+
+    def test_limited_bucket_waits_after_burst(self):
+        bucket = TokenBucket(rate=1.0, burst=2)
+        bucket.updated = 0.0
+        self.assertEqual(bucket.reserve(0.0), 0.0)
+        self.assertEqual(bucket.reserve(0.0), 0.0)
+        self.assertAlmostEqual(bucket.reserve(0.0), 1.0)
+
+    def test_penalize_unlimited_bucket(self):
+        bucket = TokenBucket()
+        bucket.penalize(100.0, retry_after=30)
+        self.assertEqual(bucket.rate, PENALTY_RATE)
+        self.assertEqual(bucket.reserve(100.0), 30)
+
+    def test_penalize_halves_rate_down_to_minimum(self):
+        bucket = TokenBucket(rate=1.0, burst=2)
+        bucket.penalize(0.0)
+        self.assertEqual(bucket.rate, 0.5)
+        for _ in range(10):
+            bucket.penalize(0.0)
+        self.assertEqual(bucket.rate, MIN_RATE)
+
+    def test_recover_back_to_base_rate(self):
+        bucket = TokenBucket(rate=1.0, burst=2)
+        bucket.penalize(0.0)
+        bucket.recover()
+        self.assertGreater(bucket.rate, 0.5)
+        self.assertLess(bucket.rate, 1.0)
+        for _ in range(10):
+            bucket.recover()
+        self.assertEqual(bucket.rate, 1.0)
+
+    def test_recover_lifts_limit_on_unlimited_bucket(self):
+        bucket = TokenBucket()
+        bucket.penalize(0.0)
+        for _ in range(20):
+            bucket.recover()
+        self.assertIsNone(bucket.rate)
+
+
+class ClassifyResponseTest(unittest.TestCase):
+    def test_status(self):
+        reason = classify_response("https://a.com/x", 429, None, "")
+        self.assertEqual(reason, "status 429")
+
+    def test_challenge_title(self):
+        reason = classify_response("https://a.com/x", 200, None, "Just a moment...")
+        self.assertEqual(reason, "challenge")
+
+    def test_login_redirect(self):
+        url = "https://a.com/x"
+        self.assertEqual(
+            classify_response(url, 200, "https://a.com/login?next=x", ""),
+            "login redirect",
+        )
+        self.assertIsNone(classify_response("https://a.com/login", 200, url, ""))
+
+    def test_normal_response(self):
+        self.assertIsNone(classify_response("https://a.com/x", 200, None, "News"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "runner"))
+
+from scheduler import (
+    BACKOFF_BASE,
+    HISTORY_SIZE,
+    MIN_BUDGET,
+    backoff_interval,
+    budget_for,
+    is_due,
+    plan_source,
+    record_outcome,
+)
+
+SOURCE = {"name": "example", "timeout": 120, "priority": 1, "max_interval": 3600}
+
+
+class PlanSourceTest(unittest.TestCase):
+    def test_no_history_uses_timeout(self):
+        self.assertEqual(plan_source(SOURCE, {}, 300), ("run", 120))
+
+    def test_budget_from_history(self):
+        stats = {"example": {"durations": [10, 30, 20]}}
+        self.assertEqual(budget_for(SOURCE, stats), 55)
+        self.assertEqual(plan_source(SOURCE, stats, 100), ("run", 55))
+
+    def test_trim_when_budget_does_not_fit(self):
+        stats = {"example": {"durations": [30]}}
+        self.assertEqual(plan_source(SOURCE, stats, 40), ("trim", 40))
+
+    def test_skip(self):
+        stats = {"example": {"durations": [60]}}
+        self.assertEqual(plan_source(SOURCE, stats, 50), ("skip", 0))
+        self.assertEqual(plan_source(SOURCE, {}, MIN_BUDGET - 1), ("skip", 0))
+
+
+class BackoffTest(unittest.TestCase):
+    def test_backoff_doubles_up_to_max_interval(self):
+        intervals = [
+            backoff_interval(SOURCE, {"example": {"empty_streak": streak}})
+            for streak in range(5)
+        ]
+        self.assertEqual(
+            intervals, [0, BACKOFF_BASE, BACKOFF_BASE * 2, BACKOFF_BASE * 4, 3600]
+        )
+
+    def test_is_due(self):
+        stats = {"example": {"empty_streak": 1, "last_run": 1000}}
+        self.assertFalse(is_due(SOURCE, stats, 1000 + BACKOFF_BASE - 1))
+        self.assertTrue(is_due(SOURCE, stats, 1000 + BACKOFF_BASE))
+        self.assertTrue(is_due(SOURCE, {}, 0))
+
+
+class RecordOutcomeTest(unittest.TestCase):
+    def test_empty_runs_extend_streak(self):
+        stats = {}
+        empty = {"status": "ok", "elapsed": 1, "inserted": 0}
+        for _ in range(2):
+            record_outcome(stats, "example", empty)
+        self.assertEqual(stats["example"]["empty_streak"], 2)
+        record_outcome(stats, "example", {"status": "ok", "elapsed": 1, "inserted": 3})
+        self.assertEqual(stats["example"]["empty_streak"], 0)
+        self.assertEqual(stats["example"]["yields"], [0, 0, 3])
+
+    def test_failures_do_not_change_streak(self):
+        stats = {"example": {"durations": [], "empty_streak": 2}}
+        record_outcome(stats, "example", {"status": "timeout", "elapsed": 120})
+        self.assertEqual(stats["example"]["empty_streak"], 2)
+        self.assertEqual(stats["example"]["durations"], [120])
+        self.assertEqual(stats["example"]["last_status"], "timeout")
+
+    def test_history_size(self):
+        stats = {}
+        for i in range(HISTORY_SIZE + 5):
+            outcome = {"status": "ok", "elapsed": i, "inserted": 1}
+            record_outcome(stats, "example", outcome)
+        self.assertEqual(len(stats["example"]["durations"]), HISTORY_SIZE)
+        self.assertEqual(stats["example"]["durations"][-1], HISTORY_SIZE + 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
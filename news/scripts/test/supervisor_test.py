@@ -0,0 +1,153 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from greenlet import greenlet
+
+from util.spider_util import SpiderUtil
+from util.supervisor import DeadlineExceeded, deadline, run_supervised
+
+
+def is_alive(pid):
+    # 已经结束但还没有被回收的进程同样视为已结束
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def spawn_and_hang(pid_path):
+    # 启动一个孙进程后一直等待，模拟卡住的浏览器
+    child = subprocess.Popen(["sleep", "60"])
+    with open(pid_path, "w") as f:
+        f.write(str(child.pid))
+    time.sleep(60)
+
+
+def fail():
+    raise ValueError("boom")
+
+
+def unpicklable():
+    return lambda: None
+
+
+@unittest.skipUnless(os.path.isdir("/proc"), "需要 /proc 判断进程是否存在")
+class RunSupervisedTest(unittest.TestCase):
+    def test_timeout_kills_child_tree(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pid_path = os.path.join(directory, "pid")
+            start = time.time()
+            outcome = run_supervised(spawn_and_hang, pid_path, timeout=1)
+            self.assertEqual(outcome["status"], "timeout")
+            self.assertLess(time.time() - start, 10)
+            with open(pid_path) as f:
+                grandchild = int(f.read())
+        deadline_at = time.time() + 5
+        while is_alive(grandchild) and time.time() < deadline_at:
+            time.sleep(0.1)
+        self.assertFalse(is_alive(grandchild))
+
+    def test_error_returns_repr(self):
+        outcome = run_supervised(fail, timeout=10)
+        self.assertEqual(outcome["status"], "error")
+        self.assertEqual(outcome["error"], repr(ValueError("boom")))
+        self.assertIsNone(outcome["state"])
+
+    def test_unpicklable_result(self):
+        outcome = run_supervised(
+            unpicklable, timeout=10, on_success=lambda: {"inserted": 2}
+        )
+        self.assertEqual(outcome["status"], "ok")
+        self.assertIsNone(outcome["result"])
+        self.assertEqual(outcome["state"], {"inserted": 2})
+
+    def test_result_and_state(self):
+        outcome = run_supervised(sum, [1, 2], timeout=10, on_success=lambda: "saved")
+        self.assertEqual(outcome["status"], "ok")
+        self.assertEqual(outcome["result"], 3)
+        self.assertEqual(outcome["state"], "saved")
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_raises_in_main_thread(self):
+        start = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(0.2):
+                time.sleep(5)
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual(signal.getitimer(signal.ITIMER_REAL), (0.0, 0.0))
+
+    def test_raises_from_non_root_greenlet(self):
+        # Playwright 同步 API 等待时在调度 greenlet 中运行，异常需要抛到主 greenlet
+        worker = greenlet(lambda: time.sleep(5))
+        start = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(0.2):
+                worker.switch()
+        self.assertLess(time.time() - start, 2)
+        # 调度 greenlet 只是挂起，之后仍然可以继续执行
+        self.assertFalse(worker.dead)
+
+    def test_not_caught_by_except_exception(self):
+        def run():
+            try:
+                time.sleep(5)
+            except Exception:
+                return "swallowed"
+
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(0.2):
+                run()
+
+    def test_finished_block_disarms_timer(self):
+        previous = signal.getsignal(signal.SIGALRM)
+        with deadline(5):
+            pass
+        self.assertEqual(signal.getitimer(signal.ITIMER_REAL), (0.0, 0.0))
+        self.assertIs(signal.getsignal(signal.SIGALRM), previous)
+
+
+class ExecuteWithTimeoutTest(unittest.TestCase):
+    def setUp(self):
+        # 日志、耗时记录和运行状态都写入相对路径，在临时目录中执行
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        self.util = SpiderUtil(notify=False)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_timeout(self):
+        outcome = self.util.execute_with_timeout(time.sleep, 30, timeout=1)
+        self.assertEqual(outcome["status"], "timeout")
+        self.assertEqual(outcome["inserted"], 0)
+
+    def test_inserted_from_child(self):
+        def run():
+            self.util.inserted = 3
+
+        outcome = self.util.execute_with_timeout(run, timeout=10)
+        self.assertEqual(outcome["status"], "ok")
+        self.assertEqual(outcome["inserted"], 3)
+
+    def test_async_function(self):
+        async def run():
+            return "done"
+
+        outcome = self.util.execute_with_timeout(run, timeout=10)
+        self.assertEqual(outcome["status"], "ok")
+        self.assertEqual(outcome["result"], "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,110 +1,79 @@
-from datetime import timedelta, timezone
-from playwright.sync_api import sync_playwright
 from util.spider_util import SpiderUtil
-from bs4 import BeautifulSoup
-import re
+from util.html_cleaner import HtmlCleaner
+from util.pipeline import ListingPipeline
 
 # 获取当前文件名，用于日志标识
 util = SpiderUtil()
+# 详情页清理规则
+CLEAN_RULES = {
+    "remove": "script, style, iframe, .sharethis-inline-share-buttons,.insert_ads,[class*=tisg-],.post-share,.instagram-media,.navigation",
+}
+cleaner = HtmlCleaner(CLEAN_RULES)
+# 详情页正文所在的节点
+DETAIL_SELECTOR = "article section"
+# 正文由服务端渲染，优先通过 HTTP 获取详情页，取不到时再使用浏览器
+HTTP_FIRST = True
+# 列表页条目的字段
+LIST_FIELDS = {
+    "href": ("", "href"),
+    "title": ("h2", "text"),
+}
+# 列表页及条目选择器
+LIST_URL = "https://theindependent.sg/news/sg-economy"
+LIST_ITEM_SELECTOR = ".space-y-4 a"
+# 列表深度：固定模式取前 LIST_DEPTH 条；自适应模式遇到第一个已抓取的链接即停止，
+# 最多 MAX_DEPTH 条，详情抓取最多用时 DEPTH_BUDGET 秒
+LIST_DEPTH = 2
+MAX_DEPTH = 10
+DEPTH_BUDGET = 60
 filename = "./news/data/theindependent/list.json"
 
 
-def get_detail(page):
-    # 获取文章详情内容
-    try:
-        # 直接获取 HTML 内容而不是先获取元素
-        html_content = page.inner_html("article section")
-        if html_content:
-            # 使用BeautifulSoup处理HTML
-            soup = BeautifulSoup(html_content, "html.parser")
-            # 移除脚本和样式元素
-            for element in soup.select(
-                "script, style, iframe, .sharethis-inline-share-buttons,.insert_ads,[class*=tisg-],.post-share,.instagram-media,.navigation"
-            ):
-                element.decompose()
-
-            return str(soup).strip()
-        else:
-            util.error("未找到文章详情内容")
-            return ""
-    except Exception as e:
-        util.error(f"获取文章详情时出错: {str(e)}")
-        return ""
+def item_link(item):
+    # 列表中的链接是相对路径
+    return "https://theindependent.sg" + item["href"] if item["href"] else None
+
+
+def build_article(item, description):
+    return {
+        "title": item["title"],
+        "description": description,
+        "link": item["link"],
+        "pub_date": util.current_time_string(),
+        "source": "theindependent",
+        "kind": 1,
+        "language": "en",
+    }
+
+
+# 列表、详情和写入的流程由同步和异步模式共用
+pipeline = ListingPipeline(
+    util,
+    filename,
+    build_article,
+    list_url=LIST_URL,
+    item_selector=LIST_ITEM_SELECTOR,
+    fields=LIST_FIELDS,
+    list_depth=LIST_DEPTH,
+    max_depth=MAX_DEPTH,
+    budget=DEPTH_BUDGET,
+    link_of=item_link,
+    detail_wait="article",
+    detail_selector=DETAIL_SELECTOR,
+    cleaner=cleaner,
+    http_first=HTTP_FIRST,
+)
 
 
 def run():
-    data = util.history_posts(filename)
-    _articles = data["articles"]
-    _links = data["links"]
-    insert = False
-    with sync_playwright() as p:
-        try:
-            # 启动浏览器，添加更多安全选项
-            browser = p.firefox.launch(headless=util.get_crawler_headless())
-
-            context = browser.new_context()
-            page = util.get_page(context)
-
-            # 访问目标网页
-            util.info("开始访问网页并等待文章加载...")
-            page.goto(
-                "https://theindependent.sg/news/sg-economy",
-                wait_until="domcontentloaded",
-                timeout=10000,
-            )
-            page.wait_for_selector(".space-y-4 a", timeout=10000)
-
-            news_items = page.query_selector_all(".space-y-4 a")[:2]
-
-            util.info(f"找到 {len(news_items)} 篇文章")
-
-            # 处理获取到的数据
-            for item in news_items:
-                link = "https://theindependent.sg" + item.get_attribute("href").strip()
-                if link in ",".join(_links):
-                    util.info(f"exists link: {link}")
-                    continue
-
-                title = item.query_selector("h2").inner_text().strip()
-                if not title:  # 如果标题为空，跳过这篇文章
-                    util.info("跳过空标题文章")
-                    continue
-
-                detail_page = util.get_page(context)
+    pipeline.run()
 
-                util.info(f"开始访问详情: {link}")
-                detail_page.goto(link, wait_until="domcontentloaded", timeout=10000)
-                detail_page.wait_for_selector("article", timeout=10000)
-                description = get_detail(detail_page)
-                if description != "":
-                    # 添加到文章列表
-                    insert = True
-                    _articles.insert(
-                        0,
-                        {
-                            "title": title,
-                            "description": description,
-                            "link": link,
-                            "pub_date": util.current_time_string(),
-                            "source": "theindependent",
-                            "kind": 1,
-                            "language": "en",
-                        },
-                    )
-            # 保存数据
-            if len(_articles) > 0 and insert:
-                if len(_articles) > 20:
-                    _articles = _articles[:20]
-                util.write_json_to_file(_articles, filename)
 
-            # 完成后关闭浏览器
-            context.close()
-            browser.close()
-        except Exception as e:
-            context.close()
-            browser.close()
-            util.error(f"执行脚本时出错: {str(e)}")
+async def run_async():
+    await pipeline.run_async()
 
 
 if __name__ == "__main__":
-    util.execute_with_timeout(run, timeout=120)
+    util.execute_with_timeout(
+        run_async if util.get_crawler_async() else run, timeout=120
+    )
@@ -0,0 +1,111 @@
+import json
+
+from requests.cookies import RequestsCookieJar
+
+# 表示登录失效或被人机验证拦截的状态码
+AUTH_STATUS = (401, 403)
+
+
+class AuthError(Exception):
+    """
+    接口返回登录失效或人机验证页面，需要通过浏览器刷新 cookie
+    """
+
+
+def load_cookie_jar(storage_state):
+    """
+    从 playwright 的 storage_state 中读取 cookie
+
+    参数:
+    storage_state (str|dict): storage_state 文件路径，或 get_storage_state 从环境变量读取的内容
+
+    返回:
+    RequestsCookieJar: 可以直接用于 requests 的 cookie
+    """
+    if isinstance(storage_state, str):
+        with open(storage_state) as f:
+            storage_state = json.load(f)
+    jar = RequestsCookieJar()
+    for cookie in storage_state.get("cookies", []):
+        jar.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+        )
+    return jar
+
+
+class ApiClient:
+    """
+    直接请求站点的 JSON 接口，使用浏览器保存的 cookie，并共用 SpiderUtil 的连接池和限速
+    """
+
+    def __init__(self, util, cookie_name=None, headers=None, auth_check=None):
+        """
+        参数:
+        util (SpiderUtil): 爬虫工具实例
+        cookie_name (str): get_storage_state 使用的 cookie 名称，不需要登录的接口不设置
+        headers (dict): 额外的请求头
+        auth_check (callable): auth_check(status, data)，接口用 JSON 内容表示登录失效时返回 True
+        """
+        self.util = util
+        self.cookie_name = cookie_name
+        self.headers = {"Accept": "application/json, text/plain, */*"}
+        self.headers.update(headers or {})
+        self.auth_check = auth_check
+        self.cookies = None
+
+    def reload_cookies(self):
+        """
+        从 get_storage_state 读取 cookie，第一次请求接口时调用
+        """
+        self.cookies = None
+        if self.cookie_name:
+            self.cookies = load_cookie_jar(self.util.get_storage_state(self.cookie_name))
+
+    def load_cookies(self, cookies):
+        """
+        使用浏览器上下文中的 cookie，浏览器刷新登录状态后调用。
+        不能重新读取 get_storage_state：工作流中它返回的是环境变量里的旧 cookie
+
+        参数:
+        cookies (list): context.cookies() 的返回值
+        """
+        self.cookies = load_cookie_jar({"cookies": cookies})
+
+    def get_json(self, url, params=None, conditional=False):
+        """
+        请求 JSON 接口
+
+        参数:
+        url (str): 接口地址
+        params (dict): 查询参数
+        conditional (bool): 是否发送条件请求，内容与上次相同时返回 None
+
+        返回:
+        dict: 接口返回的 JSON，条件请求且内容未变化时返回 None
+
+        异常:
+        AuthError: 登录失效、被人机验证拦截或返回的不是 JSON
+        """
+        if self.cookies is None:
+            self.reload_cookies()
+        response = self.util.http_get(
+            url,
+            conditional=conditional,
+            params=params,
+            headers=self.headers,
+            cookies=self.cookies,
+        )
+        if response.unchanged:
+            return None
+        if response.status_code in AUTH_STATUS:
+            raise AuthError(f"{url} 返回 {response.status_code}")
+        if "json" not in response.headers.get("content-type", ""):
+            raise AuthError(f"{url} 返回的不是 JSON")
+        data = response.json()
+        if self.auth_check and self.auth_check(response.status_code, data):
+            raise AuthError(f"{url} 登录状态失效")
+        response.raise_for_status()
+        return data
@@ -0,0 +1,163 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from util.file_util import RUNTIME_DIR
+
+# 文章数据库，list.json 由它导出。数据库不提交到仓库，工作流中随运行时目录通过 actions/cache 保留；
+# 缓存丢失时由各来源写入的 list.json 内容重新建立，导出结果不变
+DEFAULT_DB_PATH = os.path.join(RUNTIME_DIR, "articles.db")
+# 旧版本数据库的位置，第一次打开时移动到运行时目录
+LEGACY_DB_PATH = "./news/data/articles.db"
+# 每个 list.json 在数据库中保留的文章数量，超出后删除最早的文章
+MAX_ARTICLES_PER_LIST = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    list_file TEXT NOT NULL,
+    link TEXT NOT NULL,
+    source TEXT,
+    pub_date TEXT,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (list_file, link)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_link ON articles (link);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source);
+CREATE INDEX IF NOT EXISTS idx_articles_pub_date ON articles (pub_date);
+CREATE INDEX IF NOT EXISTS idx_articles_list_seq ON articles (list_file, seq);
+"""
+
+
+def db_path():
+    return os.getenv("ARTICLES_DB", DEFAULT_DB_PATH)
+
+
+@contextmanager
+def connect(path=None):
+    """
+    打开文章数据库（WAL 模式），退出时关闭连接
+
+    参数:
+    path (str): 数据库路径，默认读取 ARTICLES_DB 环境变量
+
+    返回:
+    sqlite3.Connection: 数据库连接
+    """
+    path = path or db_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path == DEFAULT_DB_PATH and not os.path.exists(path):
+        if os.path.exists(LEGACY_DB_PATH):
+            os.replace(LEGACY_DB_PATH, path)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.executescript(SCHEMA)
+        yield conn
+    finally:
+        conn.close()
+
+
+def upsert_articles(cursor, articles, list_file):
+    """
+    写入文章，已存在的链接在内容变化时更新并保持原有顺序，新文章排在最前。
+    内容没有变化的文章不会改写，数据库文件保持不变
+
+    参数:
+    cursor (sqlite3.Cursor): 数据库游标
+    articles (list): 文章列表，最新的在前
+    list_file (str): 文章所属的 list.json 路径
+
+    返回:
+    int: 新增的文章数量
+    """
+    now = time.time()
+    cursor.execute(
+        "SELECT COALESCE(MAX(seq), 0) FROM articles WHERE list_file = ?", (list_file,)
+    )
+    seq = cursor.fetchone()[0]
+    inserted = 0
+    # 倒序写入，保证列表中越靠前的文章 seq 越大
+    for article in reversed(articles):
+        cursor.execute(
+            "SELECT 1 FROM articles WHERE list_file = ? AND link = ?",
+            (list_file, article["link"]),
+        )
+        exists = cursor.fetchone() is not None
+        if not exists:
+            seq += 1
+            inserted += 1
+        cursor.execute(
+            """
+            INSERT INTO articles
+                (list_file, link, source, pub_date, seq, data, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (list_file, link) DO UPDATE SET
+                source = excluded.source,
+                pub_date = excluded.pub_date,
+                data = excluded.data,
+                updated_at = excluded.updated_at
+            WHERE articles.data IS NOT excluded.data
+            """,
+            (
+                list_file,
+                article["link"],
+                article.get("source"),
+                article.get("pub_date"),
+                seq,
+                json.dumps(article, ensure_ascii=False),
+                now,
+                now,
+            ),
+        )
+    return inserted
+
+
+def prune_articles(cursor, list_file, keep=MAX_ARTICLES_PER_LIST):
+    """
+    删除某个 list.json 中超出保留数量的最早的文章
+
+    参数:
+    cursor (sqlite3.Cursor): 数据库游标
+    list_file (str): list.json 路径
+    keep (int): 保留的文章数量
+
+    返回:
+    int: 删除的文章数量
+    """
+    cursor.execute(
+        """
+        DELETE FROM articles WHERE list_file = ? AND seq <= (
+            SELECT seq FROM articles WHERE list_file = ?
+            ORDER BY seq DESC LIMIT 1 OFFSET ?
+        )
+        """,
+        (list_file, list_file, keep),
+    )
+    return cursor.rowcount
+
+
+def export_articles(cursor, list_file, limit):
+    """
+    按顺序导出某个 list.json 的最新文章
+
+    参数:
+    cursor (sqlite3.Cursor): 数据库游标
+    list_file (str): list.json 路径
+    limit (int): 导出的文章数量
+
+    返回:
+    list: 文章列表，最新的在前
+    """
+    cursor.execute(
+        "SELECT data FROM articles WHERE list_file = ? ORDER BY seq DESC LIMIT ?",
+        (list_file, limit),
+    )
+    return [json.loads(row[0]) for row in cursor.fetchall()]
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import time
+from urllib.parse import urlparse
+
+# 每个域名同时打开的详情页数量上限，未配置的域名使用 DEFAULT_DOMAIN_CONCURRENCY
+DEFAULT_DOMAIN_CONCURRENCY = 3
+DOMAIN_CONCURRENCY = {
+    "xueqiu.com": 2,
+}
+
+
+class DomainLimiter:
+    """
+    按域名限制并发数量，每个域名对应一个 asyncio.Semaphore
+    """
+
+    def __init__(self, default_limit=None, limits=None):
+        if default_limit is None:
+            default_limit = int(
+                os.getenv("CRAWLER_DOMAIN_CONCURRENCY", DEFAULT_DOMAIN_CONCURRENCY)
+            )
+        self.default_limit = max(1, default_limit)
+        self.limits = DOMAIN_CONCURRENCY if limits is None else limits
+        self.semaphores = {}
+
+    def domain(self, link):
+        host = urlparse(link).netloc.lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def semaphore(self, link):
+        domain = self.domain(link)
+        if domain not in self.semaphores:
+            limit = self.limits.get(domain, self.default_limit)
+            self.semaphores[domain] = asyncio.Semaphore(limit)
+        return self.semaphores[domain]
+
+
+async def fetch_details(
+    util,
+    context,
+    items,
+    fetch_detail,
+    limiter=None,
+    fetch_http=None,
+    budget=None,
+    pool=None,
+):
+    """
+    并发抓取详情页，每个详情使用独立的标签页，同一域名的并发数受 limiter 限制
+
+    参数:
+    util (SpiderUtil): 爬虫工具实例
+    context (BrowserContext): playwright.async_api 的浏览器上下文
+    items (list): 列表页解析出的条目，每个条目至少包含 link
+    fetch_detail (callable): async fetch_detail(page, item)，返回清理后的详情 HTML
+    limiter (DomainLimiter): 域名并发限制，默认新建一个
+    fetch_http (callable): fetch_http(item)，先通过 HTTP 获取详情，返回 None 时再打开标签页
+    budget (int): 时间预算，单位为秒，超出后尚未开始的条目不再抓取
+    pool (AsyncPagePool): 页面池，传入时从池中取页面并复用，不再为每个详情新建标签页
+
+    返回:
+    list: 与 items 顺序一致的 (item, description) 列表，抓取失败的 description 为 ""
+    """
+    if limiter is None:
+        limiter = DomainLimiter()
+    start_time = time.time()
+
+    async def fetch_one(page, item):
+        try:
+            util.info(f"开始访问详情: {item['link']}")
+            return await fetch_detail(page, item)
+        except Exception as e:
+            util.error(f"获取详情 {item['link']} 时出错: {str(e)}")
+            return ""
+
+    async def worker(item):
+        async with limiter.semaphore(item["link"]):
+            if util.budget_exceeded(start_time, budget):
+                return item, ""
+            if fetch_http is not None:
+                description = await asyncio.to_thread(fetch_http, item)
+                if description is not None:
+                    return item, description
+            if pool is not None:
+                async with pool.page() as page:
+                    return item, await fetch_one(page, item)
+            page = await util.get_page_async(context)
+            try:
+                return item, await fetch_one(page, item)
+            finally:
+                await page.close()
+
+    return await asyncio.gather(*(worker(item) for item in items))
@@ -0,0 +1,110 @@
+import fcntl
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+# 浏览器服务监听的本地端口和路径，可以通过 CRAWLER_BROWSER_SERVER_PORT 修改端口
+DEFAULT_PORT = 9323
+WS_PATH = "/firefox"
+# 启动配置、日志、启动锁和服务进程 ID，位于 tmp 目录下，不随工作流提交
+CONFIG_PATH = "./tmp/browser_server.json"
+LOG_PATH = "./tmp/browser_server.log"
+LOCK_PATH = "./tmp/browser_server.lock"
+PID_PATH = "./tmp/browser_server.pid"
+# 等待浏览器服务开始监听的最长时间（秒）
+START_TIMEOUT = 20
+
+
+def server_port():
+    return int(os.getenv("CRAWLER_BROWSER_SERVER_PORT", DEFAULT_PORT))
+
+
+def ws_endpoint(port):
+    return f"ws://127.0.0.1:{port}{WS_PATH}"
+
+
+def is_listening(port):
+    """
+    判断本地端口上是否已经有浏览器服务在监听
+
+    参数:
+    port (int): 端口
+
+    返回:
+    bool: 可以建立连接返回 True
+    """
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def start_server(port, headless=True):
+    """
+    通过 playwright 命令行的 launch-server 在后台启动 Firefox 浏览器服务。
+    通过 sh 转入后台，服务进程不属于当前进程树，爬虫超时被结束时不会连带结束浏览器服务；
+    服务进程 ID 写入 PID_PATH，用于统计浏览器内存
+
+    参数:
+    port (int): 监听端口
+    headless (bool): 是否无头模式
+    """
+    os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
+    with open(CONFIG_PATH, "w") as f:
+        json.dump({"headless": headless, "port": port, "wsPath": WS_PATH}, f)
+    command = [sys.executable, "-m", "playwright", "launch-server"]
+    command += ["--browser", "firefox", "--config", CONFIG_PATH]
+    script = 'pid_path=$1; shift; "$@" >>"$0" 2>&1 & echo $! >"$pid_path"'
+    subprocess.run(
+        ["sh", "-c", script, LOG_PATH, PID_PATH] + command,
+        start_new_session=True,
+        check=True,
+    )
+
+
+def server_pid():
+    """
+    获取正在运行的浏览器服务的进程 ID，Firefox 是它的子孙进程
+
+    返回:
+    int: 进程 ID，没有记录或进程已经退出时返回 None
+    """
+    try:
+        with open(PID_PATH) as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+        return pid
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_server(headless=True):
+    """
+    获取浏览器服务的地址，没有服务在运行时启动一个。
+    启动过程持有文件锁，多个爬虫进程同时调用时只会启动一个服务
+
+    参数:
+    headless (bool): 是否无头模式，只在启动新服务时生效
+
+    返回:
+    str: websocket 地址
+    """
+    port = server_port()
+    if is_listening(port):
+        return ws_endpoint(port)
+    os.makedirs(os.path.dirname(LOCK_PATH), exist_ok=True)
+    with open(LOCK_PATH, "w") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        # 等锁期间其他进程可能已经启动了服务
+        if not is_listening(port):
+            start_server(port, headless)
+            deadline = time.time() + START_TIMEOUT
+            while not is_listening(port):
+                if time.time() > deadline:
+                    raise TimeoutError(f"浏览器服务没有启动，详见 {LOG_PATH}")
+                time.sleep(0.2)
+    return ws_endpoint(port)
@@ -0,0 +1,88 @@
+import fcntl
+import hashlib
+import os
+import tempfile
+
+# 运行时状态（调度历史、运行计数等每次运行都会变化的数据），不随工作流提交，
+# 工作流中通过 actions/cache 保留到下一次运行
+RUNTIME_DIR = "./news/cache/runtime"
+
+
+def file_md5(path):
+    """
+    计算文件内容的 MD5，文件不存在时返回 None
+
+    参数:
+    path (str): 文件路径
+
+    返回:
+    str: 文件内容的 MD5 哈希值
+    """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.md5(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def write_atomic(path, content):
+    """
+    原子写入文件：先写入同目录下的临时文件并 fsync，再重命名覆盖目标文件，
+    写入过程中崩溃或线程被放弃都不会留下被截断的文件。内容与磁盘上一致时跳过写入
+
+    参数:
+    path (str): 目标文件路径
+    content (str): 文件内容
+
+    返回:
+    bool: 实际写入返回 True，内容未变化跳过写入返回 False
+    """
+    data = content.encode("utf-8")
+    if file_md5(path) == hashlib.md5(data).hexdigest():
+        return False
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # 同步目录项，保证重命名本身也已落盘
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return True
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+    return True
+
+
+def append_locked(path, content):
+    """
+    持有排他锁追加写入文件，多个进程同时写入同一个文件时内容不会交错
+
+    参数:
+    path (str): 目标文件路径
+    content (str): 追加的内容
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            f.write(content)
+            f.flush()
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,207 @@
+import re
+
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+HIDDEN_STYLE = re.compile(r"display:\s*none")
+
+# 在页面内选取正文并移除元素，只把清理后的子树传回 Python
+# 参数: [根节点选择器, 容器选择器, 容器序号, 移除元素选择器]
+EXTRACT_JS = """
+([selector, container, index, remove]) => {
+    let root = document.querySelector(selector);
+    if (!root) {
+        return null;
+    }
+    if (container) {
+        root = root.matches(container) ? root : root.querySelectorAll(container)[index];
+        if (!root) {
+            return null;
+        }
+    }
+    const clone = root.cloneNode(true);
+    if (remove) {
+        clone.querySelectorAll(remove).forEach((element) => element.remove());
+    }
+    return container ? clone.outerHTML : clone.innerHTML;
+}
+"""
+
+
+class HtmlCleaner:
+    """
+    按站点规则清理文章详情 HTML，规则在创建时编译一次，清理基于 lxml
+
+    规则（均为可选项）:
+    container (str): 正文容器的 CSS 选择器，返回容器本身的 HTML；不设置时返回整段 HTML 的内容
+    container_index (int): 匹配到多个容器时取第几个，默认第一个
+    remove (str): 需要移除的元素的 CSS 选择器
+    strip_hidden (str): 检查 style 中 display:none 的元素的 CSS 选择器，如 "p"
+    truncate_after (list): 截断标记，移除第一个包含标记文字的段落及其后的所有同级内容
+    author_rules (dict): 按作者 ID 的规则，每条规则可包含
+        remove_through: 移除包含该标记的段落及其之前的所有段落
+        remove_from: 移除包含该标记的段落及其之后的所有段落
+        marker (str): 标记所在的标签，默认 "b"
+    """
+
+    def __init__(self, rules):
+        self.container = rules.get("container")
+        self.container_index = rules.get("container_index", 0)
+        self.container_selector = CSSSelector(self.container) if self.container else None
+        self.remove = rules.get("remove")
+        self.remove_selector = CSSSelector(self.remove) if self.remove else None
+        self.hidden_selector = (
+            CSSSelector(rules["strip_hidden"]) if rules.get("strip_hidden") else None
+        )
+        self.truncate_after = rules.get("truncate_after", [])
+        self.root_selectors = {}
+        self.author_rules = {
+            str(author): rule for author, rule in rules.get("author_rules", {}).items()
+        }
+
+    def parse(self, html):
+        stripped = html.lstrip()[:20].lower()
+        if stripped.startswith("<!doctype") or stripped.startswith("<html"):
+            return lxml.html.document_fromstring(html)
+        return lxml.html.fragment_fromstring(html, create_parent="div")
+
+    def extract_args(self, selector):
+        """
+        获取在页面内执行 EXTRACT_JS 的参数
+
+        参数:
+        selector (str): 页面中正文所在根节点的选择器
+
+        返回:
+        list: EXTRACT_JS 的参数
+        """
+        return [selector, self.container, self.container_index, self.remove]
+
+    def find_root(self, html, selector):
+        """
+        在完整页面中查找正文根节点，用于 HTTP 直接获取的页面
+
+        参数:
+        html (str): 完整页面 HTML
+        selector (str): 正文根节点的选择器
+
+        返回:
+        Element: 根节点，找不到时返回 None
+        """
+        if not html:
+            return None
+        if selector not in self.root_selectors:
+            self.root_selectors[selector] = CSSSelector(selector)
+        roots = self.root_selectors[selector](self.parse(html))
+        return roots[0] if roots else None
+
+    def has_container(self, root):
+        """
+        判断根节点中是否有正文容器，没有设置 container 时总是返回 True
+
+        参数:
+        root (Element): 通过 find_root 找到的根节点
+
+        返回:
+        bool: 是否能找到第 container_index 个容器
+        """
+        if self.container_selector is None:
+            return True
+        return len(self.container_selector(root)) > self.container_index
+
+    def clean(self, html, author=None, extracted=False, root=None):
+        """
+        清理 HTML
+
+        参数:
+        html (str): 原始 HTML
+        author (str): 作者 ID，用于匹配 author_rules
+        extracted (bool): html 是否已经在页面内通过 EXTRACT_JS 选取容器并移除了元素
+        root (Element): 已经通过 find_root 找到的正文根节点，传入时忽略 html
+
+        返回:
+        str: 清理后的 HTML，找不到正文容器时返回 ""
+        """
+        if root is None:
+            if not html:
+                return ""
+            root = self.parse(html)
+
+        if extracted:
+            # 页面内已经选取了容器，外层是 parse 创建的 div
+            if self.container_selector is not None:
+                if len(root) == 0:
+                    return ""
+                root = root[0]
+        elif self.container_selector is not None:
+            containers = self.container_selector(root)
+            if len(containers) <= self.container_index:
+                return ""
+            root = containers[self.container_index]
+
+        if self.remove_selector is not None and not extracted:
+            for element in self.remove_selector(root):
+                if element is not root:
+                    element.drop_tree()
+
+        if self.hidden_selector is not None:
+            for element in self.hidden_selector(root):
+                if HIDDEN_STYLE.search(element.get("style", "")):
+                    element.drop_tree()
+
+        for marker in self.truncate_after:
+            self.truncate(root, marker)
+
+        rule = self.author_rules.get(str(author)) if author is not None else None
+        if rule:
+            self.apply_author_rule(root, rule)
+
+        if self.container_selector is not None:
+            return lxml.html.tostring(root, encoding="unicode", with_tail=False).strip()
+        return self.inner_html(root).strip()
+
+    def inner_html(self, element):
+        return (element.text or "") + "".join(
+            lxml.html.tostring(child, encoding="unicode") for child in element
+        )
+
+    def truncate(self, root, marker):
+        # 移除第一个包含标记的段落，以及它之后的所有同级元素
+        for paragraph in root.iter("p"):
+            if marker in paragraph.text_content():
+                for sibling in list(paragraph.itersiblings()):
+                    sibling.drop_tree()
+                paragraph.tail = None
+                paragraph.drop_tree()
+                return
+
+    def apply_author_rule(self, root, rule):
+        tag = rule.get("marker", "b")
+        start = rule.get("remove_through")
+        end = rule.get("remove_from")
+        start_p = end_p = None
+        # 只遍历一次标记标签，同时查找开始和结束标记
+        for element in root.iter(tag):
+            text = element.text_content()
+            if start and start_p is None and start in text:
+                start_p = self.enclosing_paragraph(element)
+            if end and end_p is None and end in text:
+                end_p = self.enclosing_paragraph(element)
+            if (start_p is not None or not start) and (end_p is not None or not end):
+                break
+
+        if start_p is not None:
+            for sibling in list(start_p.itersiblings(preceding=True)):
+                if sibling.tag == "p":
+                    sibling.drop_tree()
+            start_p.drop_tree()
+        if end_p is not None and end_p is not start_p:
+            for sibling in list(end_p.itersiblings()):
+                if sibling.tag == "p":
+                    sibling.drop_tree()
+            end_p.drop_tree()
+
+    def enclosing_paragraph(self, element):
+        for ancestor in element.iterancestors("p"):
+            return ancestor
+        return None
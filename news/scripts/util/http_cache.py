@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+
+from util.file_util import write_atomic
+
+# 每个来源一个缓存文件，和 list.json 一样随工作流提交，下次运行时继续使用。
+# 只在校验信息变化时写入，不记录时间等每次都会变化的字段
+DEFAULT_CACHE_DIR = "./news/cache/http"
+# 每个来源最多保留的地址数量，超出后丢弃最早更新的记录
+MAX_ENTRIES = 500
+
+
+class HttpCache:
+    """
+    HTTP 校验缓存：按地址记录 ETag、Last-Modified 和响应内容的 MD5，
+    下次请求时带上 If-None-Match / If-Modified-Since，返回 304 或内容相同即视为未变化。
+    只保存校验信息，不保存响应内容
+    """
+
+    def __init__(self, path, key_func):
+        """
+        参数:
+        path (str): 缓存文件路径
+        key_func (callable): 由地址生成缓存键的函数，如 SpiderUtil.md5
+        """
+        self.path = path
+        self.key_func = key_func
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+        self.dirty = False
+        self.stats = {"not_modified": 0, "unchanged": 0, "changed": 0}
+
+    def get(self, url):
+        return self.entries.get(self.key_func(url))
+
+    def validators(self, url):
+        """
+        获取条件请求头
+
+        参数:
+        url (str): 请求地址
+
+        返回:
+        dict: If-None-Match / If-Modified-Since 请求头，没有缓存时为空
+        """
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url, response):
+        """
+        根据响应更新缓存并统计命中情况
+
+        参数:
+        url (str): 请求地址
+        response (requests.Response): 条件请求的响应
+
+        返回:
+        bool: 内容未变化（304 或 MD5 相同）返回 True
+        """
+        key = self.key_func(url)
+        entry = self.entries.get(key)
+        if response.status_code == 304 and entry:
+            self.stats["not_modified"] += 1
+            return True
+        if response.status_code != 200:
+            self.stats["changed"] += 1
+            return False
+
+        digest = hashlib.md5(response.content).hexdigest()
+        unchanged = entry is not None and entry.get("md5") == digest
+        self.stats["unchanged" if unchanged else "changed"] += 1
+        new_entry = {
+            "url": url,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "md5": digest,
+        }
+        if unchanged and "items" in entry:
+            new_entry["items"] = entry["items"]
+        if new_entry != entry:
+            # 更新的记录移到最后，超出数量上限时先丢弃最早更新的记录
+            self.entries.pop(key, None)
+            self.entries[key] = new_entry
+            self.dirty = True
+        return unchanged
+
+    def mark(self, url, **fields):
+        """
+        在已有的缓存记录上附加标记，如列表页是否解析到了条目
+
+        参数:
+        url (str): 请求地址
+        **fields: 要附加的字段
+        """
+        entry = self.get(url)
+        if entry is not None and any(entry.get(k) != v for k, v in fields.items()):
+            entry.update(fields)
+            self.dirty = True
+
+    def forget(self, url):
+        """
+        删除地址的缓存记录，下次请求不带校验头，重新获取完整内容
+
+        参数:
+        url (str): 请求地址
+        """
+        if self.entries.pop(self.key_func(url), None) is not None:
+            self.dirty = True
+
+    def save(self):
+        """
+        写入缓存文件，只保留最近更新的 MAX_ENTRIES 条（记录按更新顺序排列）
+        """
+        if not self.dirty:
+            return
+        if len(self.entries) > MAX_ENTRIES:
+            self.entries = dict(list(self.entries.items())[-MAX_ENTRIES:])
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        write_atomic(self.path, json.dumps(self.entries, ensure_ascii=False, indent=2))
+        self.dirty = False
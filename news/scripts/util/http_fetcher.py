@@ -0,0 +1,73 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:122.0) Gecko/20100101 Firefox/122.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9,zh-CN;q=0.8",
+}
+# (连接超时, 读取超时)，单位为秒
+DEFAULT_TIMEOUT = (5, 15)
+# 连接失败和 5xx 的重试次数，429 交给 rate_limiter 处理
+DEFAULT_RETRIES = 2
+# 每个域名保持的连接数
+POOL_SIZE = 10
+
+
+class HttpFetcher:
+    """
+    基于 requests.Session 的 HTTP 客户端：复用连接、设置超时并自动重试
+    """
+
+    def __init__(self, headers=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, **kwargs):
+        """
+        发送 GET 请求，未指定 timeout 时使用默认超时
+
+        参数:
+        url (str): 请求地址
+        **kwargs: 传递给 requests.Session.get 的参数
+
+        返回:
+        requests.Response: 响应对象
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """
+    获取进程内共享的 HttpFetcher，所有来源共用同一个连接池
+    """
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = HttpFetcher()
+        return _fetcher
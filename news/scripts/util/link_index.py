@@ -0,0 +1,125 @@
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from util.file_util import write_atomic
+
+# 索引文件最多保留的条目数量，超出后丢弃最早的记录
+MAX_ENTRIES = 5000
+
+# 统计、分享类参数，不影响文章内容
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "ref",
+    "ref_src",
+    "spm",
+    "share_source",
+    "share_token",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# 可以从链接中取出来源 ID 的站点，同一篇文章换了 slug 或参数也能识别
+ID_PATTERNS = [
+    ("xueqiu", re.compile(r"xueqiu\.com/\d+/(\d+)")),
+    ("stcn", re.compile(r"stcn\.com/article/detail/(\d+)")),
+    ("seekingalpha", re.compile(r"seekingalpha\.com/article/(\d+)")),
+    ("theedgemalaysia", re.compile(r"theedgemalaysia\.com/node/(\d+)")),
+    ("idc", re.compile(r"idc\.com/getdoc\.jsp\?.*containerId=(\w+)")),
+]
+
+
+def canonical_url(link):
+    """
+    规范化链接：域名小写、去掉 www、锚点、统计参数和末尾的斜杠，参数按名称排序
+
+    参数:
+    link (str): 原始链接
+
+    返回:
+    str: 规范化后的链接
+    """
+    parts = urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith(TRACKING_PREFIXES)
+    ]
+    path = parts.path.rstrip("/")
+    return urlunsplit(
+        (parts.scheme.lower() or "https", host, path, urlencode(sorted(query)), "")
+    )
+
+
+def link_key(link):
+    """
+    获取链接用于去重的键，能取到来源 ID 时使用 "来源:ID"，否则使用规范化后的链接
+
+    参数:
+    link (str): 原始链接
+
+    返回:
+    str: 去重键
+    """
+    for source, pattern in ID_PATTERNS:
+        match = pattern.search(link)
+        if match:
+            return f"{source}:{match.group(1)}"
+    return canonical_url(link)
+
+
+def link_hash(link):
+    return hashlib.md5(link_key(link).encode()).hexdigest()[:16]
+
+
+class SeenLinks:
+    """
+    已抓取链接的集合，按规范化后的链接哈希去重，并持久化到索引文件，
+    已经滑出 list.json 前 20 条的链接同样可以识别
+    """
+
+    def __init__(self, path, links=()):
+        self.path = path
+        self.links = list(links)
+        self.hashes = []
+        try:
+            with open(path) as f:
+                self.hashes = [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            pass
+        self.seen = set(self.hashes)
+        self.added = []
+        for link in self.links:
+            self.add(link)
+
+    def __contains__(self, link):
+        return link_hash(link) in self.seen
+
+    def __iter__(self):
+        return iter(self.links)
+
+    def __len__(self):
+        return len(self.links)
+
+    def add(self, link):
+        digest = link_hash(link)
+        if digest not in self.seen:
+            self.seen.add(digest)
+            self.added.append(digest)
+
+    def save(self):
+        """
+        将新增的链接哈希写入索引文件
+        """
+        if not self.added:
+            return
+        self.hashes = (self.hashes + self.added)[-MAX_ENTRIES:]
+        self.added = []
+        write_atomic(self.path, "\n".join(self.hashes) + "\n")
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+from util.file_util import RUNTIME_DIR, write_atomic
+
+# 每个来源一个指纹文件，随工作流提交，只在指纹变化时写入
+DEFAULT_FINGERPRINT_DIR = "./news/cache/listing"
+# 每个来源的运行和跳过次数，每次运行都会变化，不随工作流提交
+DEFAULT_FINGERPRINT_STATS_DIR = os.path.join(RUNTIME_DIR, "listing")
+# 自适应深度和固定深度取的条目数量不同，指纹分开保存，自适应模式沿用原来的字段名
+FINGERPRINT_KEYS = {"adaptive": "fingerprint", "fixed": "fixed_fingerprint"}
+
+# 一次 evaluate 取回列表页所有条目的字段，避免逐个元素多次往返
+# 参数: [条目选择器, 字段表, 最多取多少条]
+# 字段表: {"字段名": [相对条目的选择器, 属性名]}，选择器为空时取条目本身，属性名为 "text" 时取 innerText
+LIST_JS = """
+([itemSelector, fields, limit]) => {
+    let items = Array.from(document.querySelectorAll(itemSelector));
+    if (limit) {
+        items = items.slice(0, limit);
+    }
+    return items.map((item) => {
+        const result = {};
+        for (const [name, [selector, attr]] of Object.entries(fields)) {
+            const element = selector ? item.querySelector(selector) : item;
+            const value = !element
+                ? null
+                : attr === "text"
+                ? element.innerText
+                : element.getAttribute(attr);
+            result[name] = value === null ? null : value.trim();
+        }
+        return result;
+    });
+}
+"""
+
+
+def extract_list_html(html, item_selector, fields, limit=None):
+    """
+    按与 LIST_JS 相同的字段表，在 lxml 中解析通过 HTTP 获取的列表页
+
+    参数:
+    html (str): 列表页 HTML
+    item_selector (str): 条目选择器
+    fields (dict): 字段表
+    limit (int): 最多取多少条
+
+    返回:
+    list: 条目字段列表，字段不存在时为 None
+    """
+    if not html:
+        return []
+    items = CSSSelector(item_selector)(lxml.html.document_fromstring(html))
+    if limit:
+        items = items[:limit]
+    selectors = {
+        selector: CSSSelector(selector) for selector, _ in fields.values() if selector
+    }
+    results = []
+    for item in items:
+        result = {}
+        for name, (selector, attr) in fields.items():
+            if selector:
+                matches = selectors[selector](item)
+                element = matches[0] if matches else None
+            else:
+                element = item
+            if element is None:
+                value = None
+            elif attr == "text":
+                value = element.text_content()
+            else:
+                value = element.get(attr)
+            result[name] = value.strip() if value is not None else None
+        results.append(result)
+    return results
+
+
+def listing_links(items):
+    """
+    取出条目中的链接，字段名为 link 或 href
+    """
+    return [item.get("link") or item.get("href") for item in items]
+
+
+class ListingFingerprint:
+    """
+    列表前 N 条链接的指纹，与上次成功运行时相同说明没有新文章，可以跳过后续的抓取。
+    自适应深度和固定深度（调度器缩减时）各自保存指纹，两种模式交替运行时不会互相覆盖。
+    指纹文件只在指纹变化时写入；运行和跳过的次数另外保存在运行时目录，不会让提交的文件每次都变化
+    """
+
+    def __init__(self, path, stats_path=None):
+        """
+        参数:
+        path (str): 指纹文件路径
+        stats_path (str): 运行和跳过次数的文件路径，为空时不保存
+        """
+        self.path = path
+        self.stats_path = stats_path
+        self.fingerprints = {
+            key: value for key, value in self.load(path).items() if value
+        }
+        self.stats = {"runs": 0, "short_circuits": 0}
+        if stats_path:
+            self.stats.update(self.load(stats_path))
+        self.pending = None
+        self.skipped = False
+
+    def load(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def compute(self, links):
+        return hashlib.md5("\n".join(link or "" for link in links).encode()).hexdigest()
+
+    def matches(self, links, mode="adaptive"):
+        """
+        判断列表是否与同一模式上次成功运行时相同
+
+        参数:
+        links (list): 列表前 N 条的链接
+        mode (str): 深度模式，adaptive 或 fixed
+
+        返回:
+        bool: 指纹相同返回 True；不同时记下新指纹，save 时写入
+        """
+        key = FINGERPRINT_KEYS[mode]
+        fingerprint = self.compute(links)
+        if fingerprint == self.fingerprints.get(key):
+            return True
+        self.pending = (key, fingerprint)
+        return False
+
+    def record_skip(self):
+        if not self.skipped:
+            self.skipped = True
+            self.stats["short_circuits"] += 1
+
+    def save(self):
+        """
+        记录一次成功运行，指纹变化时写入新的指纹
+        """
+        self.stats["runs"] += 1
+        if self.pending:
+            key, fingerprint = self.pending
+            self.fingerprints[key] = fingerprint
+            self.pending = None
+            content = json.dumps(self.fingerprints, indent=2, sort_keys=True)
+            write_atomic(self.path, content)
+        self.skipped = False
+        if self.stats_path:
+            write_atomic(self.stats_path, json.dumps(self.stats, indent=2))
@@ -0,0 +1,140 @@
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from util.file_util import RUNTIME_DIR, append_locked
+
+# 耗时记录文件，每行一个 JSON，可以通过 CRAWLER_METRICS 修改路径，设置为 0 时不记录。
+# 放在运行时目录中，工作流通过 actions/cache 保留，metrics_report 可以跨多次运行统计
+DEFAULT_METRICS_PATH = os.path.join(RUNTIME_DIR, "metrics.jsonl")
+# 旧版本耗时记录的位置，第一次写入时移动到运行时目录
+LEGACY_METRICS_PATH = "./tmp/metrics.jsonl"
+# 耗时记录文件的大小上限，超过后只保留较新的一半
+MAX_METRICS_BYTES = 20 * 1024 * 1024
+
+
+def rotate_metrics(path, max_bytes=MAX_METRICS_BYTES):
+    """
+    耗时记录文件超过大小上限时删除较早的记录，只保留最后 max_bytes / 2 字节中的完整行。
+    持有与 append_locked 相同的排他锁，其他进程的追加写入不会丢失
+
+    参数:
+    path (str): 耗时记录文件路径
+    max_bytes (int): 大小上限
+    """
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return
+    with f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            size = os.fstat(f.fileno()).st_size
+            if size <= max_bytes:
+                return
+            f.seek(size - max_bytes // 2)
+            # 跳过被截断的第一行
+            f.readline()
+            rest = f.read()
+            f.seek(0)
+            f.write(rest)
+            f.truncate()
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class SpanRecorder:
+    """
+    记录爬虫各阶段的耗时（启动浏览器、创建上下文、打开页面、等待元素、抓取详情、清理、写入等），
+    每个阶段写入一行 JSON，带上来源、URL 和本次运行的 ID，便于跨多次运行统计各来源的耗时分布
+    """
+
+    def __init__(self, source, path=None):
+        self.source = source
+        if path is None:
+            path = os.getenv("CRAWLER_METRICS", DEFAULT_METRICS_PATH)
+        self.path = None if path in ("", "0", "false") else path
+        self.pid = None
+        self.run_id = None
+
+    def new_run(self):
+        """
+        开始新的一次运行，之后记录的阶段使用新的运行 ID，并在记录文件过大时删除较早的记录
+        """
+        self.pid = os.getpid()
+        self.run_id = f"{self.source}-{self.pid}-{int(time.time() * 1000)}"
+        if self.path is None:
+            return
+        try:
+            if self.path == DEFAULT_METRICS_PATH and not os.path.exists(self.path):
+                if os.path.exists(LEGACY_METRICS_PATH):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    os.replace(LEGACY_METRICS_PATH, self.path)
+            rotate_metrics(self.path)
+        except Exception as e:
+            print(f"整理耗时记录失败: {e}")
+
+    def current_run(self):
+        # 子进程继承了父进程的记录器，进程变化时视为新的一次运行
+        if self.pid != os.getpid():
+            self.new_run()
+        return self.run_id
+
+    @contextmanager
+    def span(self, name, url=None, **tags):
+        """
+        记录代码块的耗时，代码块抛出异常时状态记为 error
+
+        参数:
+        name (str): 阶段名称
+        url (str): 相关的地址
+        **tags: 其他标签
+        """
+        start_time = time.time()
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self.record(
+                name, time.perf_counter() - start, status, url, start_time, **tags
+            )
+
+    def record(self, name, duration, status="ok", url=None, start_time=None, **tags):
+        """
+        写入一条阶段记录
+
+        参数:
+        name (str): 阶段名称
+        duration (float): 耗时（秒）
+        status (str): 状态
+        url (str): 相关的地址
+        start_time (float): 开始时间戳，默认按当前时间减去耗时计算
+        **tags: 其他标签
+        """
+        if self.path is None:
+            return
+        if start_time is None:
+            start_time = time.time() - duration
+        entry = {
+            "ts": datetime.fromtimestamp(start_time).isoformat(timespec="milliseconds"),
+            "run": self.current_run(),
+            "source": self.source,
+            "span": name,
+            "duration": round(duration, 4),
+            "status": status,
+        }
+        if url:
+            entry["url"] = url
+        entry.update(tags)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            append_locked(self.path, json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"写入耗时记录失败: {e}")
@@ -0,0 +1,225 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from util.supervisor import tree_rss
+
+# 同时打开的详情页数量上限
+DEFAULT_MAX_PAGES = 2
+# 上下文累计使用多少次页面后重建，释放站点脚本积累的内存
+DEFAULT_RECYCLE_AFTER = 20
+# 统计浏览器内存的最短间隔（秒），每次统计都要执行 ps，不在每次取页面时执行
+MEMORY_SAMPLE_INTERVAL = 5
+
+
+class PagePool:
+    """
+    详情页的页面池：页面由 SpiderUtil.get_page 创建，已经注入脚本并设置好请求拦截，
+    用完后回到池中重复使用。池在自己的上下文中打开页面，累计使用 recycle_after 次后
+    关闭整个上下文重新创建。同时统计打开的标签页数量峰值和浏览器内存峰值
+    """
+
+    def __init__(self, util, browser, max_pages=None, recycle_after=None, **kwargs):
+        self.util = util
+        self.browser = browser
+        self.max_pages = max_pages or DEFAULT_MAX_PAGES
+        self.recycle_after = recycle_after or DEFAULT_RECYCLE_AFTER
+        # 传递给 browser.new_context 的参数
+        self.context_kwargs = kwargs
+        # 浏览器所属的进程，连接浏览器服务或使用共享浏览器时不是当前进程
+        self.browser_pid = util.browser_pid(browser)
+        self.sampled_at = None
+        self.context = None
+        self.idle = []
+        self.in_use = 0
+        self.uses = 0
+        self.stats = {
+            "created": 0,
+            "reused": 0,
+            "recycled": 0,
+            "peak_pages": 0,
+            "peak_memory_kb": 0,
+        }
+
+    def open_pages(self):
+        return len(self.idle) + self.in_use
+
+    def memory_due(self, force=False):
+        # 距离上次统计内存已经超过间隔
+        now = time.monotonic()
+        if not force and self.sampled_at is not None:
+            if now - self.sampled_at < MEMORY_SAMPLE_INTERVAL:
+                return False
+        self.sampled_at = now
+        return True
+
+    def sample(self, force=False):
+        # 记录打开的标签页数量和浏览器内存的峰值，内存按间隔统计
+        self.stats["peak_pages"] = max(self.stats["peak_pages"], self.open_pages())
+        if self.memory_due(force):
+            self.stats["peak_memory_kb"] = max(
+                self.stats["peak_memory_kb"], tree_rss(self.browser_pid)
+            )
+
+    def acquire(self):
+        """
+        取出一个页面，有空闲页面时直接复用，否则新建
+
+        返回:
+        Page: 配置好的 Playwright Page 实例
+        """
+        if self.idle:
+            self.stats["reused"] += 1
+            page = self.idle.pop()
+        else:
+            if self.open_pages() >= self.max_pages:
+                raise RuntimeError(f"同时打开的页面已达到上限 {self.max_pages}")
+            if self.context is None:
+                self.context = self.util.new_context(
+                    self.browser, **self.context_kwargs
+                )
+            page = self.util.get_page(self.context)
+            self.stats["created"] += 1
+        self.in_use += 1
+        self.sample()
+        return page
+
+    def release(self, page):
+        """
+        归还页面，页面先回到空白页释放站点内容；上下文使用次数达到上限时重建
+
+        参数:
+        page (Page): acquire 取出的页面
+        """
+        self.in_use -= 1
+        self.uses += 1
+        try:
+            page.goto("about:blank")
+            self.idle.append(page)
+        except Exception:
+            # 页面已经崩溃或被关闭，不再放回池中
+            pass
+        if self.uses >= self.recycle_after and self.in_use == 0:
+            self.recycle()
+
+    @contextmanager
+    def page(self):
+        page = self.acquire()
+        try:
+            yield page
+        finally:
+            self.release(page)
+
+    def recycle(self):
+        self.close_context()
+        self.uses = 0
+        self.stats["recycled"] += 1
+
+    def close_context(self):
+        if self.context is not None:
+            try:
+                self.util.close_context(self.context)
+            except Exception:
+                pass
+        self.context = None
+        self.idle = []
+
+    def close(self):
+        """
+        关闭池中的页面和上下文，并打印统计
+        """
+        if self.stats["created"]:
+            # 关闭前再统计一次，抓取期间未到间隔的内存增长同样计入
+            self.sample(force=True)
+        self.close_context()
+        self.log_stats()
+
+    def log_stats(self):
+        stats = self.stats
+        if stats["created"] == 0:
+            return
+        self.util.info(
+            f"页面池: 新建 {stats['created']} 个页面，复用 {stats['reused']} 次，"
+            f"重建上下文 {stats['recycled']} 次，最多同时打开 {stats['peak_pages']} 个标签页，"
+            f"浏览器内存峰值 {stats['peak_memory_kb'] / 1024:.0f} MB"
+        )
+
+
+class AsyncPagePool(PagePool):
+    """
+    PagePool 的异步版本，页面由 SpiderUtil.get_page_async 创建，
+    同时取出的页面超过上限时等待其他页面归还
+    """
+
+    def __init__(self, util, browser, max_pages=None, recycle_after=None, **kwargs):
+        super().__init__(util, browser, max_pages, recycle_after, **kwargs)
+        self.semaphore = asyncio.Semaphore(self.max_pages)
+
+    async def sample_async(self, force=False):
+        self.stats["peak_pages"] = max(self.stats["peak_pages"], self.open_pages())
+        if self.memory_due(force):
+            memory = await asyncio.to_thread(tree_rss, self.browser_pid)
+            self.stats["peak_memory_kb"] = max(self.stats["peak_memory_kb"], memory)
+
+    async def acquire_async(self):
+        await self.semaphore.acquire()
+        # 先计入使用中，创建页面期间其他任务归还页面时不会重建上下文
+        self.in_use += 1
+        try:
+            if self.idle:
+                self.stats["reused"] += 1
+                page = self.idle.pop()
+            else:
+                if self.context is None:
+                    self.context = await self.util.new_context_async(
+                        self.browser, **self.context_kwargs
+                    )
+                page = await self.util.get_page_async(self.context)
+                self.stats["created"] += 1
+        except BaseException:
+            self.in_use -= 1
+            self.semaphore.release()
+            raise
+        await self.sample_async()
+        return page
+
+    async def release_async(self, page):
+        self.uses += 1
+        try:
+            await page.goto("about:blank")
+            self.idle.append(page)
+        except Exception:
+            pass
+        self.in_use -= 1
+        if self.uses >= self.recycle_after and self.in_use == 0:
+            await self.recycle_async()
+        self.semaphore.release()
+
+    @asynccontextmanager
+    async def page(self):
+        page = await self.acquire_async()
+        try:
+            yield page
+        finally:
+            await self.release_async(page)
+
+    async def recycle_async(self):
+        await self.close_context_async()
+        self.uses = 0
+        self.stats["recycled"] += 1
+
+    async def close_context_async(self):
+        # 先摘下上下文，关闭期间其他任务取页面时会新建上下文
+        context, self.context = self.context, None
+        self.idle = []
+        if context is not None:
+            try:
+                await self.util.close_context_async(context)
+            except Exception:
+                pass
+
+    async def close_async(self):
+        if self.stats["created"]:
+            await self.sample_async(force=True)
+        await self.close_context_async()
+        self.log_stats()
@@ -0,0 +1,356 @@
+import asyncio
+import time
+
+from util.async_engine import fetch_details
+from util.listing import listing_links
+
+# list.json 中保留的文章数量
+MAX_ARTICLES = 20
+# 打开列表页和详情页的参数
+GOTO_KWARGS = {"wait_until": "domcontentloaded", "timeout": 10000}
+
+
+def fetch_details_sync(
+    util, context, items, fetch_detail, fetch_http=None, budget=None, pool=None
+):
+    """
+    fetch_details 的同步版本，按顺序逐个抓取详情
+
+    参数:
+    util (SpiderUtil): 爬虫工具实例
+    context (BrowserContext): 浏览器上下文，不使用页面池时在其中打开一个页面依次访问
+    items (list): 需要抓取详情的条目，每个条目至少包含 link
+    fetch_detail (callable): fetch_detail(page, item)，返回清理后的详情 HTML
+    fetch_http (callable): fetch_http(item)，先通过 HTTP 获取详情，返回 None 时再使用浏览器
+    budget (int): 时间预算，单位为秒，超出后剩余的条目不再抓取
+    pool (PagePool): 页面池，传入时从池中取页面
+
+    返回:
+    list: 与 items 顺序一致的 (item, description) 列表，抓取失败的 description 为 ""
+    """
+    start_time = time.time()
+    page = None
+    results = []
+    for item in items:
+        if util.budget_exceeded(start_time, budget):
+            results.append((item, ""))
+            continue
+        util.info(f"开始访问详情: {item['link']}")
+        description = fetch_http(item) if fetch_http is not None else None
+        if description is None:
+            try:
+                if pool is not None:
+                    with pool.page() as detail_page:
+                        description = fetch_detail(detail_page, item)
+                else:
+                    if page is None:
+                        page = util.get_page(context)
+                    description = fetch_detail(page, item)
+            except Exception as e:
+                util.error(f"获取详情 {item['link']} 时出错: {str(e)}")
+                description = ""
+        results.append((item, description))
+    return results
+
+
+class ListingPipeline:
+    """
+    列表型来源的抓取流程，同步和异步模式共用：读取历史、启动浏览器前检查列表、解析列表、
+    挑选新条目、抓取详情（优先 HTTP，取不到时使用浏览器）并写入 list.json。
+    两种模式只在打开浏览器、取列表和抓取详情时分别调用同步或异步的回调，其余步骤共用同一份代码
+    """
+
+    def __init__(
+        self,
+        util,
+        filename,
+        build_article,
+        list_url=None,
+        item_selector=None,
+        fields=None,
+        list_depth=2,
+        max_depth=10,
+        budget=None,
+        link_of=None,
+        require_title=True,
+        detail_selector=None,
+        detail_wait=None,
+        cleaner=None,
+        author_of=None,
+        http_first=False,
+        storage_name=None,
+        use_pool=True,
+        list_api=None,
+        fingerprint_of=None,
+        load_list=None,
+        load_list_async=None,
+    ):
+        """
+        参数:
+        util (SpiderUtil): 来源的爬虫工具实例
+        filename (str): list.json 路径
+        build_article (callable): build_article(item, description)，生成写入的文章
+        list_url (str): 列表页地址，同时用于启动浏览器前的条件请求
+        item_selector (str): 列表条目选择器，浏览器中等待该元素出现后解析
+        fields (dict): 列表条目的字段表
+        list_depth (int): 固定模式下的列表深度
+        max_depth (int): 自适应模式下的最大列表深度
+        budget (int): 详情抓取的时间预算（秒）
+        link_of (callable): 由条目得到完整链接，默认取 link 字段
+        require_title (bool): 是否跳过没有标题的条目
+        detail_selector (str): 详情页正文根节点的选择器
+        detail_wait (str): 浏览器打开详情页后等待出现的元素
+        cleaner (HtmlCleaner): 详情页清理规则
+        author_of (callable): 由条目得到作者 ID，用于 cleaner 的作者规则
+        http_first (bool): 是否先通过 HTTP 获取详情
+        storage_name (str): 登录状态的名称，详情页与列表页在同一个已登录的上下文中打开，不使用页面池
+        use_pool (bool): 是否从页面池中取详情页
+        list_api (callable): 启动浏览器前通过接口获取列表，返回 None 表示接口不可用，改用浏览器
+        fingerprint_of (callable): 由列表条目得到参与指纹计算的链接，默认与 listing_unchanged 相同
+        load_list (callable): load_list(page, context)，替代默认的打开列表页并解析
+        load_list_async (callable): load_list 的异步版本
+        """
+        self.util = util
+        self.filename = filename
+        self.build_article = build_article
+        self.list_url = list_url
+        self.item_selector = item_selector
+        self.fields = fields
+        self.list_depth = list_depth
+        self.max_depth = max_depth
+        self.budget = budget
+        self.link_of = link_of or (lambda item: item["link"])
+        self.require_title = require_title
+        self.detail_selector = detail_selector
+        self.detail_wait = detail_wait
+        self.cleaner = cleaner
+        self.author_of = author_of or (lambda item: None)
+        self.http_first = http_first
+        self.storage_name = storage_name
+        self.use_pool = use_pool and storage_name is None
+        self.list_api = list_api
+        self.fingerprint_of = fingerprint_of or listing_links
+        self.custom_load_list = load_list
+        self.custom_load_list_async = load_list_async
+
+    def depth(self):
+        return self.util.listing_depth(self.list_depth, self.max_depth)
+
+    def prepare(self):
+        """
+        读取历史文章，并在启动浏览器前检查列表：列表页没有变化，或接口返回的列表中没有新条目时无需启动浏览器
+
+        返回:
+        dict: 本次运行的状态，articles 和 links 为历史文章和链接，
+        selected 为已经通过接口得到的新条目（为 None 时需要在浏览器中获取列表）；
+        无需启动浏览器时返回 None
+        """
+        data = self.util.history_posts(self.filename)
+        run = {"articles": data["articles"], "links": data["links"], "selected": None}
+        if self.list_api is not None and self.util.get_crawler_api():
+            items = self.list_api()
+            if items is not None:
+                run["selected"] = self.select(run, items)
+                return run if run["selected"] else None
+        if self.list_url and self.item_selector:
+            if self.util.listing_unchanged(
+                self.list_url, self.item_selector, self.fields, limit=self.depth()
+            ):
+                return None
+        return run
+
+    def select(self, run, items):
+        """
+        挑选需要抓取详情的条目：列表指纹没有变化时不再处理，自适应模式遇到已抓取的链接即停止，
+        并跳过没有链接、已经抓取过或没有标题的条目
+
+        参数:
+        run (dict): prepare 返回的运行状态
+        items (list): 列表条目，最新的在前
+
+        返回:
+        list: 需要抓取详情的条目，带有完整的 link
+        """
+        util = self.util
+        # 前几条链接与上次成功运行时相同，无需再检查详情
+        if util.fingerprint_unchanged(self.fingerprint_of(items)):
+            return []
+        links = run["links"]
+        selected = []
+        for item in util.select_new_items(items[: self.depth()], links, self.link_of):
+            link = self.link_of(item)
+            if not link or link in links:
+                util.info(f"exists link: {link}")
+                continue
+            if self.require_title and not item.get("title"):
+                util.info("跳过空标题文章")
+                continue
+            selected.append({**item, "link": link})
+        util.info(f"找到 {len(selected)} 篇文章")
+        return selected
+
+    def save(self, run, results):
+        """
+        把抓取到详情的条目加入文章列表，有新文章时写入 list.json。
+        有条目没有得到详情时标记本次运行不完整，不保存列表指纹，下次运行重新抓取
+
+        参数:
+        run (dict): prepare 返回的运行状态
+        results (list): (item, description) 列表
+        """
+        articles = run["articles"]
+        insert = False
+        missing = 0
+        for item, description in results:
+            if description:
+                insert = True
+                articles.insert(0, self.build_article(item, description))
+                run["links"].add(item["link"])
+            else:
+                missing += 1
+        if missing:
+            self.util.mark_incomplete(f"{missing} 篇文章没有得到详情")
+        if insert:
+            self.util.write_json_to_file(articles[:MAX_ARTICLES], self.filename)
+
+    def clean_detail(self, html_content, item):
+        description = self.util.clean_html(
+            self.cleaner,
+            html_content,
+            url=item["link"],
+            author=self.author_of(item),
+            extracted=True,
+        )
+        if not description:
+            self.util.error("未找到文章详情内容")
+        return description
+
+    def fetch_http(self, item):
+        # 先通过 HTTP 获取详情，返回 None 时使用浏览器
+        return self.util.fetch_detail_http(
+            item["link"], self.detail_selector, self.cleaner, author=self.author_of(item)
+        )
+
+    def load_list(self, page, context):
+        if self.custom_load_list is not None:
+            return self.custom_load_list(page, context)
+        util = self.util
+        util.info("开始访问网页并等待文章加载...")
+        util.goto(page, self.list_url, **GOTO_KWARGS)
+        util.wait_for_selector(page, self.item_selector, timeout=10000)
+        return util.extract_list(page, self.item_selector, self.fields, limit=self.depth())
+
+    async def load_list_async(self, page, context):
+        if self.custom_load_list_async is not None:
+            return await self.custom_load_list_async(page, context)
+        util = self.util
+        util.info("开始访问网页并等待文章加载...")
+        await util.goto_async(page, self.list_url, **GOTO_KWARGS)
+        await util.wait_for_selector_async(page, self.item_selector, timeout=10000)
+        return await util.extract_list_async(
+            page, self.item_selector, self.fields, limit=self.depth()
+        )
+
+    def fetch_detail(self, page, item):
+        util = self.util
+        util.goto(page, item["link"], **GOTO_KWARGS)
+        if self.detail_wait:
+            util.wait_for_selector(page, self.detail_wait, timeout=10000)
+        # 在页面内选取正文并移除无用元素，只取回清理后的 HTML
+        html_content = util.extract_html(page, self.detail_selector, self.cleaner)
+        return self.clean_detail(html_content, item)
+
+    async def fetch_detail_async(self, page, item):
+        util = self.util
+        await util.goto_async(page, item["link"], **GOTO_KWARGS)
+        if self.detail_wait:
+            await util.wait_for_selector_async(page, self.detail_wait, timeout=10000)
+        html_content = await util.extract_html_async(
+            page, self.detail_selector, self.cleaner
+        )
+        return self.clean_detail(html_content, item)
+
+    def new_context(self, browser):
+        try:
+            return self.util.new_context(browser, self.storage_name)
+        except Exception as e:
+            if self.storage_name is None:
+                raise
+            self.util.error(f"创建浏览器上下文失败: {e}")
+            # 创建一个没有存储状态的上下文作为备选
+            return self.util.new_context(browser)
+
+    async def new_context_async(self, browser):
+        try:
+            return await self.util.new_context_async(browser, self.storage_name)
+        except Exception as e:
+            if self.storage_name is None:
+                raise
+            self.util.error(f"创建浏览器上下文失败: {e}")
+            return await self.util.new_context_async(browser)
+
+    def run(self):
+        util = self.util
+        run = self.prepare()
+        if run is None:
+            return
+        with util.launch_browser() as browser:
+            context = self.new_context(browser)
+            # 详情页从页面池中取用，用完放回复用
+            pool = util.page_pool(browser) if self.use_pool else None
+            try:
+                if run["selected"] is None:
+                    page = util.get_page(context)
+                    run["selected"] = self.select(run, self.load_list(page, context))
+                if run["selected"]:
+                    results = fetch_details_sync(
+                        util,
+                        context,
+                        run["selected"],
+                        self.fetch_detail,
+                        fetch_http=self.fetch_http if self.http_first else None,
+                        budget=self.budget,
+                        pool=pool,
+                    )
+                    self.save(run, results)
+            except Exception as e:
+                util.error(f"执行脚本时出错: {str(e)}")
+                util.mark_incomplete("执行脚本时出错")
+            finally:
+                if pool is not None:
+                    pool.close()
+                util.close_context(context)
+
+    async def run_async(self):
+        util = self.util
+        # prepare 中的条件请求和接口请求是同步的，放到线程中执行
+        run = await asyncio.to_thread(self.prepare)
+        if run is None:
+            return
+        async with util.launch_browser_async() as browser:
+            context = await self.new_context_async(browser)
+            pool = util.page_pool_async(browser) if self.use_pool else None
+            try:
+                if run["selected"] is None:
+                    page = await util.get_page_async(context)
+                    items = await self.load_list_async(page, context)
+                    run["selected"] = self.select(run, items)
+                if run["selected"]:
+                    # 并发抓取详情页
+                    results = await fetch_details(
+                        util,
+                        context,
+                        run["selected"],
+                        self.fetch_detail_async,
+                        fetch_http=self.fetch_http if self.http_first else None,
+                        budget=self.budget,
+                        pool=pool,
+                    )
+                    self.save(run, results)
+            except Exception as e:
+                util.error(f"执行脚本时出错: {str(e)}")
+                util.mark_incomplete("执行脚本时出错")
+            finally:
+                if pool is not None:
+                    await pool.close_async()
+                await util.close_context_async(context)
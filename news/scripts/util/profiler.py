@@ -0,0 +1,108 @@
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import time
+import tracemalloc
+
+# 性能分析结果的目录，每个来源一个子目录
+PROFILE_DIR = "./tmp/profile"
+# 文本报告中列出的函数和内存分配位置数量
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+# 同一进程内 trace 文件的序号
+_trace_counter = itertools.count(1)
+
+
+def profile_path(source, suffix):
+    """
+    生成来源的性能分析文件路径，文件名带有时间和进程 ID，多次运行互不覆盖
+
+    参数:
+    source (str): 来源名称
+    suffix (str): 文件名后缀，如 ".prof"、"-trace-1.zip"
+
+    返回:
+    str: 文件路径
+    """
+    directory = os.path.join(PROFILE_DIR, source)
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"{stamp}-{os.getpid()}{suffix}")
+
+
+def trace_path(source):
+    # 一次运行可能关闭多个上下文，按序号区分 trace 文件
+    return profile_path(source, f"-trace-{next(_trace_counter)}.zip")
+
+
+class RunProfiler:
+    """
+    在一次运行期间开启 cProfile 和 tracemalloc，结束后写入 tmp/profile/<来源>/：
+    .prof 为 cProfile 原始数据（可用 snakeviz 等工具查看），-cpu.txt 为按累计耗时排序的函数，
+    -memory.txt 为内存峰值和分配最多的代码位置
+    """
+
+    def __init__(self, source, cpu=False, memory=False):
+        self.source = source
+        self.cpu = cpu
+        self.memory = memory
+        self.profiler = None
+        self.paths = []
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cpu:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop(self):
+        """
+        停止分析并写入结果
+
+        返回:
+        list: 写入的文件路径
+        """
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.write_cpu()
+        if self.memory and tracemalloc.is_tracing():
+            self.write_memory()
+        return self.paths
+
+    def write_cpu(self):
+        path = profile_path(self.source, ".prof")
+        self.profiler.dump_stats(path)
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=stream)
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        text_path = path[: -len(".prof")] + "-cpu.txt"
+        with open(text_path, "w") as f:
+            f.write(stream.getvalue())
+        self.paths += [path, text_path]
+
+    def write_memory(self):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                # 同时开启 cProfile 时排除它自身的分配
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, pstats.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ]
+        )
+        lines = [
+            f"当前 {current / 1024 / 1024:.1f} MB，峰值 {peak / 1024 / 1024:.1f} MB",
+            "",
+        ]
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+            lines.append(str(stat))
+        path = profile_path(self.source, "-memory.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        self.paths.append(path)
@@ -0,0 +1,167 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+# 需要限速的域名：rate 为每秒补充的令牌数，burst 为桶容量
+# 未配置的域名默认不限速，只有在触发 429、人机验证或登录跳转后才开始限速
+DOMAIN_RATES = {
+    "xueqiu.com": {"rate": 1.0, "burst": 2},
+    "seekingalpha.com": {"rate": 0.5, "burst": 1},
+    "dollarsandsense.sg": {"rate": 1.0, "burst": 2},
+}
+
+# 不限速的域名第一次被限流时使用的速率
+PENALTY_RATE = 1.0
+# 最低速率，每 20 秒一个请求
+MIN_RATE = 0.05
+# 每次正常响应后速率的恢复倍数
+RECOVERY_FACTOR = 1.2
+# 原本不限速的域名恢复到这个速率后取消限速
+UNLIMITED_RATE = 5.0
+
+# 被限流时页面标题中常见的文字
+CHALLENGE_TITLES = [
+    "just a moment",
+    "attention required",
+    "before we continue",
+    "verify you are human",
+    "确认您是真人",
+    "access denied",
+]
+# 被重定向到登录页时 URL 中常见的路径
+LOGIN_PATHS = ["/login", "/signin", "/sign_in", "/passport"]
+
+
+def domain_of(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class TokenBucket:
+    def __init__(self, rate=None, burst=1):
+        # rate 为 None 表示不限速
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self, now):
+        """
+        预留一个令牌，返回需要等待的秒数
+        """
+        wait = max(0.0, self.blocked_until - now)
+        if self.rate is None:
+            return wait
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens < 0:
+            wait = max(wait, -self.tokens / self.rate)
+        return wait
+
+    def penalize(self, now, retry_after=None):
+        if self.rate is None:
+            self.rate = PENALTY_RATE
+        else:
+            self.rate = max(MIN_RATE, self.rate / 2)
+        self.tokens = 0.0
+        self.updated = now
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def recover(self):
+        if self.rate is None or self.rate == self.base_rate:
+            return
+        self.rate *= RECOVERY_FACTOR
+        if self.base_rate is None and self.rate >= UNLIMITED_RATE:
+            self.rate = None
+        elif self.base_rate is not None and self.rate >= self.base_rate:
+            self.rate = self.base_rate
+
+
+class RateLimiter:
+    """
+    按域名的令牌桶限速器，根据响应自动放慢或恢复
+    """
+
+    def __init__(self, rates=None):
+        self.rates = DOMAIN_RATES if rates is None else rates
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, domain):
+        if domain not in self.buckets:
+            config = self.rates.get(domain, {})
+            self.buckets[domain] = TokenBucket(config.get("rate"), config.get("burst", 1))
+        return self.buckets[domain]
+
+    def reserve(self, url):
+        """
+        为请求预留令牌
+
+        参数:
+        url (str): 请求地址
+
+        返回:
+        float: 发起请求前需要等待的秒数
+        """
+        with self.lock:
+            return self.bucket(domain_of(url)).reserve(time.monotonic())
+
+    def wait(self, url):
+        # 同步等待，直到可以请求该域名
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def penalize(self, url, retry_after=None):
+        with self.lock:
+            self.bucket(domain_of(url)).penalize(time.monotonic(), retry_after)
+
+    def recover(self, url):
+        with self.lock:
+            self.bucket(domain_of(url)).recover()
+
+    def current_rate(self, url):
+        with self.lock:
+            return self.bucket(domain_of(url)).rate
+
+
+def parse_retry_after(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_response(url, status, final_url, title):
+    """
+    判断一次导航是否被目标站点限流
+
+    参数:
+    url (str): 请求的地址
+    status (int): 响应状态码，没有响应时为 None
+    final_url (str): 导航结束后页面的地址
+    title (str): 页面标题
+
+    返回:
+    str: 限流原因，未被限流时返回 None
+    """
+    if status in (429, 503):
+        return f"status {status}"
+    lowered = (title or "").lower()
+    if any(marker in lowered for marker in CHALLENGE_TITLES):
+        return "challenge"
+    final_path = urlparse(final_url or "").path.lower()
+    requested_path = urlparse(url).path.lower()
+    for path in LOGIN_PATHS:
+        if path in final_path and path not in requested_path:
+            return "login redirect"
+    return None
+
+
+# 进程内共享的限速器，所有 SpiderUtil 实例共用
+rate_limiter = RateLimiter()
@@ -0,0 +1,127 @@
+from urllib.parse import urlparse
+
+# 默认拦截的资源类型，详情内容最终都会被 BeautifulSoup 清理掉，无需下载
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# 默认拦截的广告、统计和追踪域名（同时匹配其子域名）
+BLOCKED_HOSTS = [
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "google-analytics.com",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "pubmatic.com",
+    "rubiconproject.com",
+    "taboola.com",
+    "outbrain.com",
+    "facebook.net",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "chartbeat.com",
+    "hotjar.com",
+    "sharethis.com",
+    "onesignal.com",
+    "hm.baidu.com",
+    "cnzz.com",
+]
+
+# 各站点渲染或验证时确实需要的资源，按脚本名配置，优先于上面的拦截规则
+SITE_ALLOWLIST = {
+    # cloudflare 人机验证
+    "dollarsandsense": {"hosts": ["challenges.cloudflare.com"]},
+    # 登录时的滑块验证码需要加载图片
+    "xueqiu": {"hosts": ["geetest.com"]},
+    # PerimeterX 人机验证
+    "seekingalpha_transcript": {"hosts": ["perimeterx.net", "px-cdn.net", "px-cloud.net"]},
+}
+
+# 被拦截请求的估算大小（字节），请求在下载前就被中止，无法得到真实大小
+ESTIMATED_BYTES = {
+    "image": 60 * 1024,
+    "media": 500 * 1024,
+    "font": 40 * 1024,
+    "script": 30 * 1024,
+}
+DEFAULT_ESTIMATED_BYTES = 5 * 1024
+
+
+def match_host(host, patterns):
+    return any(host == pattern or host.endswith("." + pattern) for pattern in patterns)
+
+
+class ResourceBlocker:
+    """
+    通过 page.route 拦截不需要的请求，并统计拦截数量和节省的流量
+    """
+
+    def __init__(self, source, resource_types=None, hosts=None, allowlist=None):
+        self.source = source
+        self.resource_types = (
+            BLOCKED_RESOURCE_TYPES if resource_types is None else set(resource_types)
+        )
+        self.hosts = BLOCKED_HOSTS if hosts is None else hosts
+        site = SITE_ALLOWLIST.get(source, {}) if allowlist is None else allowlist
+        self.allow_hosts = site.get("hosts", [])
+        self.allow_resource_types = set(site.get("resource_types", []))
+        self.blocked = 0
+        self.bytes_saved = 0
+        self.blocked_by_type = {}
+
+    def should_block(self, request):
+        """
+        判断请求是否需要拦截
+
+        参数:
+        request (Request): Playwright 请求对象
+
+        返回:
+        bool: 需要拦截返回 True
+        """
+        host = urlparse(request.url).netloc.lower()
+        resource_type = request.resource_type
+        if match_host(host, self.allow_hosts):
+            return False
+        if resource_type in self.allow_resource_types:
+            return False
+        return resource_type in self.resource_types or match_host(host, self.hosts)
+
+    def record(self, request):
+        resource_type = request.resource_type
+        self.blocked += 1
+        self.bytes_saved += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        self.blocked_by_type[resource_type] = (
+            self.blocked_by_type.get(resource_type, 0) + 1
+        )
+
+    def handle(self, route):
+        # page.route 的同步处理函数
+        if self.should_block(route.request):
+            self.record(route.request)
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    async def handle_async(self, route):
+        # page.route 的异步处理函数
+        if self.should_block(route.request):
+            self.record(route.request)
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def stats(self):
+        """
+        获取拦截统计
+
+        返回:
+        dict: 拦截数量、估算节省的字节数以及按资源类型的拦截数量
+        """
+        return {
+            "blocked": self.blocked,
+            "bytes_saved": self.bytes_saved,
+            "by_type": dict(self.blocked_by_type),
+        }
@@ -1,18 +1,51 @@
 from datetime import datetime, timedelta, timezone
+import asyncio
+import functools
 import hashlib
+import inspect
 import json
 import os
-import threading
 import time
 import traceback
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 import random
 from typing import Dict, Optional
+import requests
 import random
 import time
+from playwright.async_api import async_playwright
+from playwright.sync_api import sync_playwright
+from util import article_store
+from util import browser_server
+from util.file_util import append_locked, write_atomic
+from util.html_cleaner import EXTRACT_JS
+from util.http_cache import DEFAULT_CACHE_DIR, HttpCache
+from util.http_fetcher import get_fetcher
+from util.link_index import SeenLinks
+from util.metrics import SpanRecorder
+from util.page_pool import AsyncPagePool, PagePool
+from util.profiler import RunProfiler, trace_path
+from util.listing import (
+    DEFAULT_FINGERPRINT_DIR,
+    DEFAULT_FINGERPRINT_STATS_DIR,
+    LIST_JS,
+    ListingFingerprint,
+    extract_list_html,
+    listing_links,
+)
+from util.rate_limiter import classify_response, domain_of, parse_retry_after, rate_limiter
+from util.resource_blocker import ResourceBlocker
+from util.supervisor import run_supervised
 
 
 class SpiderUtil:
+    # 由 runner/orchestrator.py 注入的共享浏览器，所有爬虫共用同一个 Firefox 实例
+    shared_browser = None
+    # 由 runner/daemon.py 启用：按 storage state 名称缓存已登录的上下文，跨轮次复用，None 表示不缓存
+    warm_contexts = None
+    # launch_browser 得到的浏览器所属的进程：浏览器服务的进程，或启动浏览器的进程，用于统计浏览器内存
+    browser_pids = {}
+
     def __init__(self, notify=True):
         # 打印调用栈信息
         stack = traceback.extract_stack()
@@ -23,6 +56,25 @@ class SpiderUtil:
         self.path = "./news/scripts/util/urls.json"
         # 添加 notify 属性
         self.notify = notify
+        # 页面请求拦截策略，按脚本名读取站点白名单
+        self.resource_blocker = ResourceBlocker(self.current_file)
+        # history_posts 读取的已抓取链接集合，写入文件时同步更新索引
+        self.seen_links = {}
+        # 条件请求的校验缓存，每个来源一个文件
+        self.http_cache = HttpCache(
+            os.path.join(DEFAULT_CACHE_DIR, f"{self.current_file}.json"), self.md5
+        )
+        # 本次运行是否因为时间预算没有处理完列表
+        self.incomplete = False
+        # 本次运行新增的文章数量，调度器据此调整各来源的抓取频率
+        self.inserted = 0
+        # 列表前 N 条链接的指纹，没有变化时跳过本次运行
+        self.listing_fingerprint = ListingFingerprint(
+            os.path.join(DEFAULT_FINGERPRINT_DIR, f"{self.current_file}.json"),
+            os.path.join(DEFAULT_FINGERPRINT_STATS_DIR, f"{self.current_file}.json"),
+        )
+        # 各阶段的耗时记录
+        self.metrics = SpanRecorder(self.current_file)
 
     # 打印日志
     def info(self, message):
@@ -31,6 +83,17 @@ class SpiderUtil:
     def error(self, message):
         print(f"[\033[31m{self.current_file}\033[0m] {message}")
 
+    def span(self, name, url=None, **tags):
+        """
+        记录一个阶段的耗时，配合 with 使用，写入 news/cache/runtime/metrics.jsonl
+
+        参数:
+        name (str): 阶段名称，如 browser_launch、context、goto、wait、detail_http、clean、write
+        url (str): 相关的地址
+        **tags: 其他标签
+        """
+        return self.metrics.span(name, url, **tags)
+
     def get_storage_state(self, name):
         """
         获取指定名称的浏览器上下文
@@ -57,25 +120,111 @@ class SpiderUtil:
                     f.write('{"cookies": [], "origins": []}')
             return storage_state_path
 
+    def new_context(self, browser, storage_name=None, **kwargs):
+        """
+        创建浏览器上下文，传入 storage_name 时加载对应的登录状态。
+        常驻进程中同名的上下文只创建一次，之后直接复用，保持登录状态
+
+        参数:
+        browser (Browser): Playwright 浏览器实例
+        storage_name (str): 登录状态的名称，与 get_storage_state 相同
+        **kwargs: 传递给 browser.new_context 的参数
+
+        返回:
+        BrowserContext: 浏览器上下文
+        """
+        cache = SpiderUtil.warm_contexts
+        if cache is not None and storage_name in cache:
+            self.info(f"复用已登录的浏览器上下文: {storage_name}")
+            return cache[storage_name]
+        if storage_name:
+            kwargs["storage_state"] = self.get_storage_state(storage_name)
+        with self.span("context"):
+            context = browser.new_context(**kwargs)
+        if self.get_crawler_trace():
+            context.tracing.start(screenshots=True, snapshots=True)
+        if cache is not None and storage_name:
+            cache[storage_name] = context
+        return context
+
+    async def new_context_async(self, browser, storage_name=None, **kwargs):
+        """
+        new_context 的异步版本，异步模式不缓存上下文
+
+        参数:
+        browser (Browser): playwright.async_api 的浏览器实例
+        storage_name (str): 登录状态的名称
+        **kwargs: 传递给 browser.new_context 的参数
+
+        返回:
+        BrowserContext: 浏览器上下文
+        """
+        if storage_name:
+            kwargs["storage_state"] = self.get_storage_state(storage_name)
+        with self.span("context"):
+            context = await browser.new_context(**kwargs)
+        if self.get_crawler_trace():
+            await context.tracing.start(screenshots=True, snapshots=True)
+        return context
+
+    def close_context(self, context):
+        """
+        关闭浏览器上下文；常驻进程缓存的上下文只关闭页面，上下文留给下一轮复用
+
+        参数:
+        context (BrowserContext): 浏览器上下文
+        """
+        cache = SpiderUtil.warm_contexts
+        if cache is not None and context in cache.values():
+            for page in list(context.pages):
+                page.close()
+            return
+        if self.get_crawler_trace():
+            try:
+                path = trace_path(self.current_file)
+                context.tracing.stop(path=path)
+                self.info(f"Playwright trace 已写入 {path}")
+            except Exception as e:
+                # 上下文不是通过 new_context 创建的，没有开启 tracing
+                self.info(f"保存 Playwright trace 失败: {e}")
+        context.close()
+
+    async def close_context_async(self, context):
+        """
+        close_context 的异步版本
+
+        参数:
+        context (BrowserContext): playwright.async_api 的浏览器上下文
+        """
+        if self.get_crawler_trace():
+            try:
+                path = trace_path(self.current_file)
+                await context.tracing.stop(path=path)
+                self.info(f"Playwright trace 已写入 {path}")
+            except Exception as e:
+                self.info(f"保存 Playwright trace 失败: {e}")
+        await context.close()
+
     def history_posts(self, filepath):
         """
-        从指定文件中读取历史文章数据，并返回文章列表和链接列表。
+        从指定文件中读取历史文章数据，并返回文章列表和已抓取链接集合。
 
         参数:
         filepath (str): 包含历史文章数据的文件路径。
 
         返回:
-        dict: 包含文章列表和链接列表的字典。
+        dict: 包含文章列表和链接集合的字典。链接集合按规范化后的链接去重，
+        并由同目录下的 seen_links.txt 持久化，可以直接用 link in links 判断。
         """
         try:
             with open(filepath) as user_file:
                 articles = json.load(user_file)["data"]
-                links = []
-                for article in articles:
-                    links.append(article["link"])
-                return {"articles": articles, "links": links}
         except:
-            return {"articles": [], "links": []}
+            articles = []
+        index_path = os.path.join(os.path.dirname(filepath), "seen_links.txt")
+        links = SeenLinks(index_path, [article["link"] for article in articles])
+        self.seen_links[filepath] = links
+        return {"articles": articles, "links": links}
 
     def parse_time(self, time_str, format):
         """
@@ -155,13 +304,8 @@ class SpiderUtil:
 
     def append_to_temp_file(self, file_path, data):
         try:
-            # 检查文件是否存在，如果不存在则创建一个空文件
-            if not os.path.exists(file_path):
-                with open(file_path, "w") as file:
-                    pass
-            # 以追加模式打开文件并写入数据
-            with open(file_path, "a") as file:
-                file.write(data)
+            # 加锁追加写入，并行执行的多个爬虫进程可能同时记录错误
+            append_locked(file_path, data)
         except Exception as e:
             # 捕获异常并打印错误信息
             print(f"写入临时文件过程中发生错误: {str(e)}")
@@ -190,6 +334,137 @@ class SpiderUtil:
         """
         return not self.get_env_variable("CRAWLER_HEADLESS", False)
 
+    def get_crawler_block_resources(self):
+        """
+        获取 CRAWLER_BLOCK_RESOURCES 环境变量，默认开启请求拦截，设置为 0 或 false 时关闭
+
+        返回:
+        bool: 是否拦截图片、字体、广告等请求
+        """
+        value = str(self.get_env_variable("CRAWLER_BLOCK_RESOURCES", "1"))
+        return value.lower() not in ("0", "false")
+
+    def log_blocked_stats(self):
+        """
+        打印请求拦截统计
+        """
+        stats = self.resource_blocker.stats()
+        if stats["blocked"] > 0:
+            self.info(
+                f"已拦截 {stats['blocked']} 个请求，约节省 {stats['bytes_saved'] / 1024:.0f} KB，"
+                f"按类型: {stats['by_type']}"
+            )
+
+    def get_crawler_http_first(self):
+        """
+        获取 CRAWLER_HTTP_FIRST 环境变量，默认开启，设置为 0 或 false 时详情页一律使用浏览器
+
+        返回:
+        bool: 是否优先通过 HTTP 获取详情页
+        """
+        value = str(self.get_env_variable("CRAWLER_HTTP_FIRST", "1"))
+        return value.lower() not in ("0", "false")
+
+    def get_crawler_api(self):
+        """
+        获取 CRAWLER_API 环境变量，默认开启，设置为 0 或 false 时列表一律通过浏览器页面获取
+
+        返回:
+        bool: 是否优先直接请求列表接口
+        """
+        value = str(self.get_env_variable("CRAWLER_API", "1"))
+        return value.lower() not in ("0", "false")
+
+    def get_crawler_async(self):
+        """
+        获取 CRAWLER_ASYNC 环境变量，设置后爬虫使用 playwright.async_api 并发抓取详情页
+
+        返回:
+        bool: 是否使用异步模式
+        """
+        return bool(self.get_env_variable("CRAWLER_ASYNC", False))
+
+    def get_crawler_browser_server(self):
+        """
+        获取 CRAWLER_BROWSER_SERVER 环境变量，设置后连接本地常驻的浏览器服务，没有服务时启动一个，
+        多个爬虫进程共用同一个 Firefox，不再各自启动
+
+        返回:
+        bool: 是否使用浏览器服务
+        """
+        return bool(self.get_env_variable("CRAWLER_BROWSER_SERVER", False))
+
+    def get_crawler_profile(self):
+        """
+        获取 CRAWLER_PROFILE 环境变量，设置后用 cProfile 分析每次运行，结果写入 tmp/profile/<来源>/
+
+        返回:
+        bool: 是否开启 cProfile
+        """
+        return bool(self.get_env_variable("CRAWLER_PROFILE", False))
+
+    def get_crawler_tracemalloc(self):
+        """
+        获取 CRAWLER_TRACEMALLOC 环境变量，设置后用 tracemalloc 记录每次运行的内存峰值和分配位置
+
+        返回:
+        bool: 是否开启 tracemalloc
+        """
+        return bool(self.get_env_variable("CRAWLER_TRACEMALLOC", False))
+
+    def get_crawler_trace(self):
+        """
+        获取 CRAWLER_TRACE 环境变量，设置后为每个浏览器上下文开启 Playwright tracing，
+        上下文关闭时保存 trace zip，可用 playwright show-trace 查看
+
+        返回:
+        bool: 是否开启 Playwright tracing
+        """
+        return bool(self.get_env_variable("CRAWLER_TRACE", False))
+
+    def profiled(self, func):
+        """
+        按 CRAWLER_PROFILE 和 CRAWLER_TRACEMALLOC 包装来源的 run，都没有开启时原样返回
+
+        参数:
+        func (callable): 来源的 run，也可以是 async 函数
+
+        返回:
+        callable: 包装后的函数，与 func 同为同步或异步
+        """
+        cpu = self.get_crawler_profile()
+        memory = self.get_crawler_tracemalloc()
+        if not (cpu or memory):
+            return func
+
+        def finish(profiler):
+            for path in profiler.stop():
+                self.info(f"性能分析结果已写入 {path}")
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                profiler = RunProfiler(self.current_file, cpu, memory)
+                profiler.start()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    finish(profiler)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = RunProfiler(self.current_file, cpu, memory)
+            profiler.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finish(profiler)
+
+        return wrapper
+
     def get_env_variable(self, key, fallback):
         """
         获取环境变量的值，如果不存在则返回默认值
@@ -205,18 +480,19 @@ class SpiderUtil:
 
     def execute_with_timeout(self, func, *args, timeout=50, notify=None, **kwargs):
         """
-        接受一个函数，执行这个函数并设置超时时间，同时统计函数的执行时间
+        接受一个函数，在独立的子进程中执行并设置超时时间，同时统计函数的执行时间。
+        超时后会结束子进程以及它启动的浏览器进程树，不会和下一个脚本重叠
 
         参数:
-        func (callable): 要执行的函数
+        func (callable): 要执行的函数，也可以是 async 函数，会在子进程内通过 asyncio.run 执行
         *args: 传递给函数的位置参数
         timeout (int): 超时时间，单位为秒
         notify (bool): 是否发送通知，默认使用类的 notify 属性
         **kwargs: 传递给函数的关键字参数
 
         返回:
-        tuple: (执行结果, 执行时间) 如果在超时时间内完成
-        None: 如果函数执行超时
+        dict: status 为 "ok"、"error" 或 "timeout"，result 为函数返回值，
+        error 为异常信息，elapsed 为执行时间，inserted 为新增的文章数量
         """
 
         # 打印调用栈信息
@@ -225,76 +501,101 @@ class SpiderUtil:
         filename = os.path.basename(stack[-2].filename)
         lineno = stack[-2].lineno
 
-        class FuncThread(threading.Thread):
-            def __init__(self, func, *args, **kwargs):
-                threading.Thread.__init__(self)
-                self.func = func
-                self.args = args
-                self.kwargs = kwargs
-                self.result = None
-                self.execution_time = None
-
-            def run(self):
-                start_time = time.time()
-                try:
-                    self.func(*self.args, **self.kwargs)
-                except Exception as e:
-                    traceback.print_exc()
-                    # 使用外部的log_action_error方法，传递 notify 参数
-                    should_notify = self._outer.notify if notify is None else notify
-                    self._log_action_error(
-                        f"{filename}#{lineno} error: {repr(e)}\n", should_notify
-                    )
-                finally:
-                    end_time = time.time()
-                    self.execution_time = end_time - start_time
-
-            def _log_action_error(self, error_message, notify=True):
-                # 调用外部类的log_action_error方法
-                self._outer.log_action_error(error_message, notify)
-
-        # 将外部类的实例传递给线程类
-        thread = FuncThread(func, *args, **kwargs)
-        thread._outer = self
-        thread.start()
-        thread.join(timeout)
-        if thread.is_alive():
-            return None
-        if thread.execution_time > 2:
+        # 执行成功后在子进程中保存校验缓存和列表指纹
+        outcome = run_supervised(
+            self.profiled(func),
+            *args,
+            timeout=timeout,
+            on_success=self.save_run_state,
+            **kwargs,
+        )
+        outcome["inserted"] = (outcome.pop("state") or {}).get("inserted", 0)
+        self.metrics.record(
+            "run", outcome["elapsed"], outcome["status"], inserted=outcome["inserted"]
+        )
+        should_notify = self.notify if notify is None else notify
+        if outcome["status"] == "error":
+            self.log_action_error(
+                f"{filename}#{lineno} error: {outcome['error']}\n", should_notify
+            )
+        elif outcome["status"] == "timeout":
+            self.log_action_error(
+                f"{filename}#{lineno} timeout: {timeout} 秒内没有完成，已结束进程\n",
+                should_notify,
+            )
+        if outcome["elapsed"] > 2:
             print(
-                f"Function #{filename}#{lineno} executed in {thread.execution_time:.3f} seconds."
+                f"Function #{filename}#{lineno} executed in {outcome['elapsed']:.3f} seconds."
             )
-        return None
+        return outcome
+
+    def _get_db_connection(self):
+        """
+        获取文章数据库连接（SQLite，WAL 模式），配合 with 使用，退出时自动关闭
+
+        返回:
+        sqlite3.Connection: 数据库连接
+        """
+        return article_store.connect()
+
+    def _insert_articles(self, cursor, data, filename):
+        """
+        以 upsert 的方式写入文章，返回新增的文章数量
+
+        参数:
+        cursor (sqlite3.Cursor): 数据库游标
+        data (list): 文章列表，最新的在前
+        filename (str): 文章所属的 list.json 路径
+        """
+        return article_store.upsert_articles(cursor, data, os.path.normpath(filename))
 
     def write_json_to_file(self, data, filename):
         """
-        将 JSON 数据以格式化的形式写入传入的文件，并同时写入 SQLite 数据库
+        将文章写入 SQLite 数据库，再从数据库导出最新的 len(data) 篇文章，
+        以格式化的形式原子写入传入的 list.json。数据库为每个 list.json 保留最近的
+        article_store.MAX_ARTICLES_PER_LIST 篇文章
 
         参数:
-        data (dict): 要写入文件的 JSON 数据
+        data (list): 要写入的文章列表，最新的在前
         filename (str): 文件名
 
         返回:
         None
         """
         try:
-            # 确保目标文件夹存在
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with self.span("write", file=filename):
+                # 写入数据库
+                with self._get_db_connection() as conn:
+                    cursor = conn.cursor()
+                    inserted = self._insert_articles(cursor, data, filename)
+                    if inserted:
+                        article_store.prune_articles(cursor, os.path.normpath(filename))
+                    conn.commit()
+                    self.inserted += inserted
+                    print(
+                        f"{filename} inserted {inserted} articles to db successfully."
+                    )
+                    articles = article_store.export_articles(
+                        cursor, os.path.normpath(filename), len(data)
+                    )
 
-            # 写入 JSON 文件
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump({"data": data}, f, ensure_ascii=False, indent=4)
-                print(f"JSON data has been written to {filename} successfully.")
+                # 导出 JSON 文件，内容没有变化时跳过写入
+                content = json.dumps({"data": articles}, ensure_ascii=False, indent=4)
+                if write_atomic(filename, content):
+                    print(f"JSON data has been written to {filename} successfully.")
+                else:
+                    print(f"JSON data of {filename} is unchanged, skip writing.")
 
-            # # 写入数据库
-            # with self._get_db_connection() as conn:
-            #     cursor = conn.cursor()
-            #     self._insert_articles(cursor, data)
-            #     conn.commit()
-            #     print(f"{filename} inserted to db successfully.")
+                # 更新已抓取链接索引
+                links = self.seen_links.get(filename)
+                if links is not None:
+                    for article in articles:
+                        links.add(article["link"])
+                    links.save()
 
         except Exception as e:
             print(f"Error writing data: {e}")
+            self.mark_incomplete("写入文章失败")
             # 记录详细错误日志，使用类的 notify 属性
             self.log_action_error(f"Error in write_json_to_file: {str(e)}", self.notify)
 
@@ -342,6 +643,563 @@ class SpiderUtil:
             
         return False
 
+    @contextmanager
+    def launch_browser(self, **kwargs):
+        """
+        获取 Firefox 浏览器实例。如果编排器已经注入了共享浏览器则直接复用；
+        开启 CRAWLER_BROWSER_SERVER 时连接本地的浏览器服务；否则启动一个新的浏览器，并在退出时关闭
+
+        参数:
+        **kwargs: 传递给 firefox.launch 的参数（复用共享浏览器时忽略）
+
+        返回:
+        Browser: Playwright 浏览器实例
+        """
+        if SpiderUtil.shared_browser is not None:
+            try:
+                yield SpiderUtil.shared_browser
+            finally:
+                self.log_blocked_stats()
+            return
+
+        with sync_playwright() as p:
+            with self.span("browser_launch"):
+                browser = None
+                if self.get_crawler_browser_server():
+                    browser = self.connect_browser_server(p.firefox)
+                connected = browser is not None
+                if browser is None:
+                    browser = p.firefox.launch(
+                        headless=self.get_crawler_headless(), **kwargs
+                    )
+            self.track_browser(browser, connected)
+            try:
+                yield browser
+            finally:
+                SpiderUtil.browser_pids.pop(id(browser), None)
+                browser.close()
+                self.log_blocked_stats()
+
+    def track_browser(self, browser, connected):
+        """
+        记录浏览器所属的进程：连接的是浏览器服务时为服务进程，否则为当前进程。
+        共享浏览器可能在 fork 出的子进程中使用，子进程据此找到真正启动浏览器的进程
+
+        参数:
+        browser (Browser): launch_browser 得到的浏览器实例
+        connected (bool): 是否连接的是浏览器服务
+        """
+        pid = browser_server.server_pid() if connected else None
+        SpiderUtil.browser_pids[id(browser)] = pid or os.getpid()
+
+    def browser_pid(self, browser):
+        """
+        获取浏览器所属的进程 ID，Firefox 是该进程的子孙进程
+
+        参数:
+        browser (Browser): Playwright 浏览器实例
+
+        返回:
+        int: 进程 ID，不是 launch_browser 得到的浏览器时为当前进程
+        """
+        return SpiderUtil.browser_pids.get(id(browser), os.getpid())
+
+    def connect_browser_server(self, firefox):
+        """
+        连接本地的浏览器服务，没有服务在运行时先启动一个。
+        关闭连接得到的浏览器只会断开连接并关闭本次创建的上下文，浏览器服务继续运行
+
+        参数:
+        firefox (BrowserType): playwright 的 firefox
+
+        返回:
+        Browser: 浏览器实例，连接失败时返回 None
+        """
+        try:
+            start_time = time.time()
+            endpoint = browser_server.ensure_server(self.get_crawler_headless())
+            browser = firefox.connect(endpoint)
+            self.info(f"已连接浏览器服务，耗时 {time.time() - start_time:.3f} 秒")
+            return browser
+        except Exception as e:
+            self.error(f"连接浏览器服务失败，改为启动新的浏览器: {e}")
+            return None
+
+    async def connect_browser_server_async(self, firefox):
+        """
+        connect_browser_server 的异步版本
+
+        参数:
+        firefox (BrowserType): playwright.async_api 的 firefox
+
+        返回:
+        Browser: 浏览器实例，连接失败时返回 None
+        """
+        try:
+            start_time = time.time()
+            endpoint = await asyncio.to_thread(
+                browser_server.ensure_server, self.get_crawler_headless()
+            )
+            browser = await firefox.connect(endpoint)
+            self.info(f"已连接浏览器服务，耗时 {time.time() - start_time:.3f} 秒")
+            return browser
+        except Exception as e:
+            self.error(f"连接浏览器服务失败，改为启动新的浏览器: {e}")
+            return None
+
+    @asynccontextmanager
+    async def launch_browser_async(self, **kwargs):
+        """
+        launch_browser 的异步版本，基于 playwright.async_api 启动 Firefox
+
+        参数:
+        **kwargs: 传递给 firefox.launch 的参数
+
+        返回:
+        Browser: playwright.async_api 的浏览器实例
+        """
+        async with async_playwright() as p:
+            with self.span("browser_launch"):
+                browser = None
+                if self.get_crawler_browser_server():
+                    browser = await self.connect_browser_server_async(p.firefox)
+                connected = browser is not None
+                if browser is None:
+                    browser = await p.firefox.launch(
+                        headless=self.get_crawler_headless(), **kwargs
+                    )
+            self.track_browser(browser, connected)
+            try:
+                yield browser
+            finally:
+                SpiderUtil.browser_pids.pop(id(browser), None)
+                await browser.close()
+                self.log_blocked_stats()
+
+    def throttle(self, url):
+        """
+        按域名限速，需要限速的站点会等待到可以发起请求为止
+
+        参数:
+        url (str): 即将请求的地址
+        """
+        delay = rate_limiter.wait(url)
+        if delay > 0.5:
+            self.info(f"{domain_of(url)} 限速等待 {delay:.1f} 秒")
+
+    async def throttle_async(self, url):
+        # throttle 的异步版本
+        delay = rate_limiter.reserve(url)
+        if delay > 0:
+            if delay > 0.5:
+                self.info(f"{domain_of(url)} 限速等待 {delay:.1f} 秒")
+            await asyncio.sleep(delay)
+
+    def record_navigation(self, url, status, final_url, title, retry_after=None):
+        """
+        根据导航结果调整该域名的速率：被限流时放慢，正常时逐步恢复
+
+        参数:
+        url (str): 请求的地址
+        status (int): 响应状态码
+        final_url (str): 导航结束后页面的地址
+        title (str): 页面标题
+        retry_after (str): 响应头中的 Retry-After
+        """
+        reason = classify_response(url, status, final_url, title)
+        if reason:
+            rate_limiter.penalize(url, parse_retry_after(retry_after))
+            self.info(
+                f"{domain_of(url)} 疑似被限流（{reason}），速率调整为 {rate_limiter.current_rate(url)}/秒"
+            )
+        else:
+            rate_limiter.recover(url)
+
+    def goto(self, page, url, **kwargs):
+        """
+        限速后打开页面，并根据响应调整该域名的速率
+
+        参数:
+        page (Page): Playwright Page 实例
+        url (str): 目标地址
+        **kwargs: 传递给 page.goto 的参数
+
+        返回:
+        Response: page.goto 的返回值
+        """
+        self.throttle(url)
+        with self.span("goto", url):
+            response = page.goto(url, **kwargs)
+        self.record_navigation(
+            url,
+            response.status if response else None,
+            page.url,
+            page.title(),
+            response.headers.get("retry-after") if response else None,
+        )
+        return response
+
+    async def goto_async(self, page, url, **kwargs):
+        # goto 的异步版本
+        await self.throttle_async(url)
+        with self.span("goto", url):
+            response = await page.goto(url, **kwargs)
+        self.record_navigation(
+            url,
+            response.status if response else None,
+            page.url,
+            await page.title(),
+            response.headers.get("retry-after") if response else None,
+        )
+        return response
+
+    def wait_for_selector(self, page, selector, **kwargs):
+        """
+        等待页面中的元素，并记录等待的耗时
+
+        参数:
+        page (Page): Playwright Page 实例
+        selector (str): 选择器
+        **kwargs: 传递给 page.wait_for_selector 的参数
+
+        返回:
+        ElementHandle: page.wait_for_selector 的返回值
+        """
+        with self.span("wait", page.url, selector=selector):
+            return page.wait_for_selector(selector, **kwargs)
+
+    async def wait_for_selector_async(self, page, selector, **kwargs):
+        # wait_for_selector 的异步版本
+        with self.span("wait", page.url, selector=selector):
+            return await page.wait_for_selector(selector, **kwargs)
+
+    def clean_html(self, cleaner, html_content, url=None, **kwargs):
+        """
+        使用站点的清理规则清理详情 HTML，并记录清理的耗时
+
+        参数:
+        cleaner (HtmlCleaner): 站点的清理规则
+        html_content (str): 详情 HTML
+        url (str): 详情页地址
+        **kwargs: 传递给 cleaner.clean 的参数
+
+        返回:
+        str: 清理后的 HTML
+        """
+        with self.span("clean", url):
+            return cleaner.clean(html_content, **kwargs)
+
+    def on_response(self, response):
+        # 页面内的 XHR 等子请求返回 429 时同样放慢该域名，主文档由 goto 处理
+        if response.status == 429 and response.request.resource_type != "document":
+            rate_limiter.penalize(
+                response.url, parse_retry_after(response.headers.get("retry-after"))
+            )
+
+    def http_get(self, url, conditional=False, **kwargs):
+        """
+        通过共享连接池发送 GET 请求，请求前按域名限速，并根据响应调整速率
+
+        参数:
+        url (str): 请求地址
+        conditional (bool): 是否使用校验缓存发送条件请求，结果记录在 response.unchanged
+        **kwargs: 传递给 requests 的参数
+
+        返回:
+        requests.Response: 响应对象，unchanged 表示内容与上次相同（304 或 MD5 相同），
+        cache_url 为校验缓存使用的地址
+        """
+        cache_url = None
+        if conditional:
+            # 带查询参数的地址按完整 URL 缓存
+            cache_url = (
+                requests.Request("GET", url, params=kwargs.get("params")).prepare().url
+            )
+            headers = dict(kwargs.get("headers") or {})
+            headers.update(self.http_cache.validators(cache_url))
+            kwargs["headers"] = headers
+        self.throttle(url)
+        response = get_fetcher().get(url, **kwargs)
+        self.record_navigation(
+            url,
+            response.status_code,
+            response.url,
+            "",
+            response.headers.get("retry-after"),
+        )
+        response.cache_url = cache_url
+        response.unchanged = conditional and self.http_cache.update(cache_url, response)
+        return response
+
+    def listing_unchanged(
+        self, url, item_selector=None, fields=None, limit=None, **kwargs
+    ):
+        """
+        启动浏览器前，先通过 HTTP 检查列表页：返回 304 或内容与上次相同时跳过本次运行；
+        内容有变化但传入了条目选择器时，再比较前 N 条链接的指纹。
+        传入条目选择器时，只有页面中确实解析到条目才相信“没有变化”，
+        需要浏览器渲染的页面每次返回相同的外壳，不能据此跳过
+
+        参数:
+        url (str): 列表页地址
+        item_selector (str): 条目选择器，与 extract_list 相同
+        fields (dict): 字段表，与 extract_list 相同
+        limit (int): 参与指纹计算的条目数量
+        **kwargs: 传递给 requests 的参数
+
+        返回:
+        bool: 列表没有变化时返回 True，请求失败或页面中没有条目（需要浏览器渲染）时返回 False
+        """
+        try:
+            with self.span("listing_http", url):
+                response = self.http_get(url, conditional=True, **kwargs)
+            cache = self.http_cache
+            if item_selector and response.status_code == 200:
+                items = extract_list_html(response.text, item_selector, fields, limit)
+                if not items:
+                    # 不保留外壳页面的校验信息，否则之后一直是 304 或内容相同
+                    cache.forget(response.cache_url)
+                    return False
+                cache.mark(response.cache_url, items=True)
+                if not response.unchanged:
+                    return self.fingerprint_unchanged(listing_links(items))
+            elif item_selector and response.unchanged:
+                # 304 没有内容，只相信上次确认过有条目的记录
+                entry = cache.get(response.cache_url) or {}
+                if not entry.get("items"):
+                    cache.forget(response.cache_url)
+                    return False
+            if response.unchanged:
+                fingerprint = self.listing_fingerprint
+                fingerprint.record_skip()
+                self.info(
+                    f"列表页没有变化，跳过本次运行（累计跳过 {fingerprint.stats['short_circuits']} 次）"
+                )
+                return True
+        except Exception as e:
+            self.info(f"列表页条件请求出错: {url} {str(e)}")
+        return False
+
+    def fingerprint_unchanged(self, links):
+        """
+        比较列表前 N 条链接的指纹，与同一深度模式上次成功运行时相同说明没有新文章。
+        调度器缩减时按固定深度抓取，与自适应深度的指纹分开比较和保存
+
+        参数:
+        links (list): 列表前 N 条的链接，顺序与页面一致
+
+        返回:
+        bool: 指纹相同返回 True，调用方应直接结束本次运行
+        """
+        if not links:
+            return False
+        fingerprint = self.listing_fingerprint
+        mode = "adaptive" if self.get_crawler_adaptive_depth() else "fixed"
+        if fingerprint.matches(links, mode):
+            fingerprint.record_skip()
+            self.info(
+                f"列表指纹没有变化，跳过本次运行（累计跳过 {fingerprint.stats['short_circuits']} 次，"
+                f"共运行 {fingerprint.stats['runs'] + 1} 次）"
+            )
+            return True
+        return False
+
+    def get_crawler_adaptive_depth(self):
+        """
+        获取 CRAWLER_ADAPTIVE_DEPTH 环境变量，默认开启，设置为 0 或 false 时按各来源的固定深度抓取
+
+        返回:
+        bool: 是否使用自适应深度
+        """
+        value = str(self.get_env_variable("CRAWLER_ADAPTIVE_DEPTH", "1"))
+        return value.lower() not in ("0", "false")
+
+    def listing_depth(self, fixed_depth, max_depth):
+        """
+        获取本次从列表中取多少条
+
+        参数:
+        fixed_depth (int): 固定模式下的深度
+        max_depth (int): 自适应模式下的最大深度
+
+        返回:
+        int: 自适应模式返回 max_depth，再由 select_new_items 截断；否则返回 fixed_depth
+        """
+        return max_depth if self.get_crawler_adaptive_depth() else fixed_depth
+
+    def select_new_items(self, items, links, link_of):
+        """
+        自适应模式下按顺序取条目，遇到第一个已抓取的链接即停止，抓取量随新内容的数量增减
+
+        参数:
+        items (list): 列表条目，最新的在前
+        links (SeenLinks): 已抓取的链接
+        link_of (callable): 由条目得到完整链接的函数
+
+        返回:
+        list: 需要处理的条目；固定模式下原样返回
+        """
+        if not self.get_crawler_adaptive_depth():
+            return items
+        selected = []
+        for item in items:
+            link = link_of(item)
+            if link and link in links:
+                self.info(f"遇到已抓取的链接，不再向后查找: {link}")
+                break
+            selected.append(item)
+        self.info(f"列表前 {len(items)} 条中有 {len(selected)} 条新内容")
+        return selected
+
+    def budget_exceeded(self, start_time, budget):
+        """
+        判断详情抓取是否超出时间预算，超出时本次运行不保存列表指纹和校验缓存，剩余条目留到下次运行
+
+        参数:
+        start_time (float): 开始抓取详情的时间
+        budget (int): 时间预算，单位为秒，为空时不限制
+
+        返回:
+        bool: 是否超出时间预算
+        """
+        if budget and time.time() - start_time > budget:
+            if not self.incomplete:
+                self.info(f"详情抓取已超过 {budget} 秒，剩余条目留到下次运行")
+            self.incomplete = True
+            return True
+        return False
+
+    def mark_incomplete(self, reason):
+        """
+        标记本次运行没有完整处理列表（中途出错，或选中的条目没有得到详情），
+        运行结束时不保存校验缓存和列表指纹，下次运行重新处理这些条目
+
+        参数:
+        reason (str): 原因，只在第一次标记时打印
+        """
+        if not self.incomplete:
+            self.info(f"本次运行没有处理完整: {reason}")
+        self.incomplete = True
+
+    def reset_run_state(self):
+        """
+        清空上一次运行的统计和标记，常驻进程重复执行同一来源前调用
+        """
+        self.inserted = 0
+        self.incomplete = False
+        self.http_cache.stats = dict.fromkeys(self.http_cache.stats, 0)
+        self.listing_fingerprint.pending = None
+        self.listing_fingerprint.skipped = False
+        self.metrics.new_run()
+
+    def save_run_state(self):
+        """
+        保存校验缓存和列表指纹并打印命中统计，在来源执行成功后调用，
+        中途超时或出错时不保存，避免下次把没有处理完的内容当成未变化
+
+        返回:
+        dict: 本次运行的统计，inserted 为新增的文章数量
+        """
+        summary = {"inserted": self.inserted}
+        stats = self.http_cache.stats
+        total = sum(stats.values())
+        if total > 0:
+            self.info(
+                f"条件请求 {total} 次：304 {stats['not_modified']} 次，"
+                f"内容相同 {stats['unchanged']} 次，有变化 {stats['changed']} 次"
+            )
+        if self.incomplete:
+            self.info("列表没有处理完，不保存校验缓存和列表指纹")
+            return summary
+        self.http_cache.save()
+        self.listing_fingerprint.save()
+        return summary
+
+    def fetch_detail_http(self, link, selector, cleaner, author=None):
+        """
+        不启动浏览器，直接通过 HTTP 获取服务端渲染的详情页并清理。
+        只保留得到正文的详情页的校验信息，没有得到正文的页面下次重新完整获取
+
+        参数:
+        link (str): 详情页地址
+        selector (str): 正文根节点的选择器
+        cleaner (HtmlCleaner): 站点的清理规则
+        author (str): 作者 ID
+
+        返回:
+        str: 清理后的 HTML；请求失败、返回 304 或页面中没有正文（需要浏览器渲染）时返回 None
+        """
+        if not self.get_crawler_http_first():
+            return None
+        response = None
+        try:
+            with self.span("detail_http", link):
+                response = self.http_get(link, conditional=True)
+            if response.status_code == 304:
+                # 链接还不在 list.json 中，说明上次得到的正文没有写入，304 没有内容可用
+                self.info(f"详情页返回 304，改用浏览器: {link}")
+                self.http_cache.forget(response.cache_url)
+                return None
+            if response.status_code != 200:
+                self.info(f"HTTP 获取详情失败 {response.status_code}，改用浏览器: {link}")
+                return None
+            root = cleaner.find_root(response.text, selector)
+            # 根节点可能是 body 这类总能找到的节点，还要确认其中有清理规则的正文容器
+            if root is None or not cleaner.has_container(root):
+                self.info(f"HTTP 页面中没有正文，改用浏览器: {link}")
+                self.http_cache.forget(response.cache_url)
+                return None
+            self.info(f"已通过 HTTP 获取详情: {link}")
+            return self.clean_html(cleaner, None, url=link, author=author, root=root)
+        except Exception as e:
+            self.info(f"HTTP 获取详情出错，改用浏览器: {link} {str(e)}")
+            if response is not None:
+                self.http_cache.forget(response.cache_url)
+            return None
+
+    def extract_html(self, page, selector, cleaner):
+        """
+        在页面内选取正文容器并移除 cleaner 规则中的元素，只返回清理后的子树，
+        避免把整个页面传回 Python 再解析
+
+        参数:
+        page (Page): Playwright Page 实例
+        selector (str): 正文所在根节点的选择器
+        cleaner (HtmlCleaner): 站点的清理规则
+
+        返回:
+        str: 选取后的 HTML，找不到正文时返回 None
+        """
+        with self.span("extract", page.url):
+            return page.evaluate(EXTRACT_JS, cleaner.extract_args(selector))
+
+    async def extract_html_async(self, page, selector, cleaner):
+        # extract_html 的异步版本
+        with self.span("extract", page.url):
+            return await page.evaluate(EXTRACT_JS, cleaner.extract_args(selector))
+
+    def extract_list(self, page, item_selector, fields, limit=None):
+        """
+        通过一次 evaluate 取回列表页所有条目的字段
+
+        参数:
+        page (Page): Playwright Page 实例
+        item_selector (str): 列表条目的选择器
+        fields (dict): 字段表，如 {"link": ("a", "href"), "title": ("h3", "text")}，
+            选择器为空时取条目本身，属性名为 "text" 时取 innerText
+        limit (int): 最多取多少条，默认全部
+
+        返回:
+        list: 每个条目一个字典，取不到的字段为 None
+        """
+        with self.span("extract_list", page.url):
+            return page.evaluate(LIST_JS, [item_selector, fields, limit])
+
+    async def extract_list_async(self, page, item_selector, fields, limit=None):
+        # extract_list 的异步版本
+        with self.span("extract_list", page.url):
+            return await page.evaluate(LIST_JS, [item_selector, fields, limit])
+
     def get_page(self, context):
         """
         从浏览器上下文创建新页面并进行基本配置
@@ -364,12 +1222,83 @@ class SpiderUtil:
             # 禁用 webdriver 检测
             js = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
             page.add_init_script(js)
-            
+
+            # 拦截图片、字体、广告和追踪脚本等请求
+            if self.get_crawler_block_resources():
+                page.route("**/*", self.resource_blocker.handle)
+            page.on("response", self.on_response)
+
             return page
         except Exception as e:
             self.error(f"创建页面时出错: {str(e)}")
             raise
 
+    async def get_page_async(self, context):
+        """
+        get_page 的异步版本
+
+        参数:
+        context (BrowserContext): playwright.async_api 的浏览器上下文
+
+        返回:
+        Page: 配置好的 Playwright Page 实例
+        """
+        try:
+            page = await context.new_page()
+
+            # 禁用 webdriver 检测
+            js = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+            await page.add_init_script(js)
+
+            # 拦截图片、字体、广告和追踪脚本等请求
+            if self.get_crawler_block_resources():
+                await page.route("**/*", self.resource_blocker.handle_async)
+            page.on("response", self.on_response)
+
+            return page
+        except Exception as e:
+            self.error(f"创建页面时出错: {str(e)}")
+            raise
+
+    def page_pool(self, browser, **kwargs):
+        """
+        创建详情页的页面池，页面数量上限和上下文重建间隔分别读取
+        CRAWLER_MAX_PAGES 和 CRAWLER_RECYCLE_AFTER 环境变量
+
+        参数:
+        browser (Browser): Playwright 浏览器实例
+        **kwargs: 传递给 browser.new_context 的参数
+
+        返回:
+        PagePool: 页面池，用完后调用 close
+        """
+        return PagePool(
+            self,
+            browser,
+            max_pages=int(self.get_env_variable("CRAWLER_MAX_PAGES", 0)),
+            recycle_after=int(self.get_env_variable("CRAWLER_RECYCLE_AFTER", 0)),
+            **kwargs,
+        )
+
+    def page_pool_async(self, browser, **kwargs):
+        """
+        page_pool 的异步版本
+
+        参数:
+        browser (Browser): playwright.async_api 的浏览器实例
+        **kwargs: 传递给 browser.new_context 的参数
+
+        返回:
+        AsyncPagePool: 页面池，用完后调用 close_async
+        """
+        return AsyncPagePool(
+            self,
+            browser,
+            max_pages=int(self.get_env_variable("CRAWLER_MAX_PAGES", 0)),
+            recycle_after=int(self.get_env_variable("CRAWLER_RECYCLE_AFTER", 0)),
+            **kwargs,
+        )
+
     def contains_language(self, text, languages=None):
         """
         判断文本是否包含指定的语言字符。
@@ -0,0 +1,202 @@
+import asyncio
+import inspect
+import multiprocessing
+import os
+import signal
+import subprocess
+import time
+import traceback
+from contextlib import contextmanager
+
+from greenlet import getcurrent
+
+# 超时后先发送 SIGTERM，让 Playwright 有机会关闭浏览器，等待 GRACE_PERIOD 秒后强制结束
+GRACE_PERIOD = 5
+
+
+def descendants(pid):
+    """
+    查找进程的所有子孙进程，Playwright 会在独立的进程组中启动浏览器，只结束进程组不够
+
+    参数:
+    pid (int): 进程 ID
+
+    返回:
+    list: 子孙进程 ID，查询失败时为空
+    """
+    try:
+        output = subprocess.run(
+            ["ps", "-A", "-o", "pid=,ppid="],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout
+    except Exception:
+        return []
+    children = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            children.setdefault(int(parts[1]), []).append(int(parts[0]))
+    result = []
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def tree_rss(pid):
+    """
+    统计进程所有子孙进程占用的内存，用于估算 Playwright 启动的浏览器的内存
+
+    参数:
+    pid (int): 进程 ID
+
+    返回:
+    int: 子孙进程的 RSS 之和，单位为 KB，查询失败时为 0
+    """
+    try:
+        output = subprocess.run(
+            ["ps", "-A", "-o", "pid=,rss="],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout
+    except Exception:
+        return 0
+    rss = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            rss[int(parts[0])] = int(parts[1])
+    return sum(rss.get(child, 0) for child in descendants(pid))
+
+
+def kill_tree(pid, sig):
+    """
+    向进程所在的进程组及其所有子孙进程发送信号
+
+    参数:
+    pid (int): 进程 ID，同时也是子进程创建的进程组 ID
+    sig (int): 信号
+    """
+    pids = descendants(pid)
+    try:
+        os.killpg(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+    for child in [pid] + pids:
+        try:
+            os.kill(child, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def _run_child(conn, func, args, kwargs, on_success):
+    # 子进程创建自己的进程组，超时时连同浏览器一起结束
+    os.setsid()
+    try:
+        if inspect.iscoroutinefunction(func):
+            result = asyncio.run(func(*args, **kwargs))
+        else:
+            result = func(*args, **kwargs)
+        state = on_success() if on_success is not None else None
+        try:
+            conn.send(("ok", result, None, state))
+        except Exception:
+            # 返回值无法序列化时只返回状态
+            conn.send(("ok", None, None, state))
+    except Exception as e:
+        traceback.print_exc()
+        conn.send(("error", None, repr(e), None))
+    finally:
+        conn.close()
+
+
+def run_supervised(func, *args, timeout=50, on_success=None, **kwargs):
+    """
+    在独立的子进程中执行函数，超过截止时间后结束子进程及其浏览器进程树
+
+    参数:
+    func (callable): 要执行的函数，也可以是 async 函数
+    *args: 传递给函数的位置参数
+    timeout (int): 超时时间，单位为秒
+    on_success (callable): 函数正常返回后在子进程中调用，用于保存运行状态，返回值放在 state 中
+    **kwargs: 传递给函数的关键字参数
+
+    返回:
+    dict: status 为 "ok"、"error" 或 "timeout"，result 为函数返回值，
+    error 为异常信息，state 为 on_success 的返回值，elapsed 为执行时间
+    """
+    # 使用 fork，子进程直接继承已经导入的脚本模块和 SpiderUtil 实例
+    context = multiprocessing.get_context("fork")
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_child, args=(child_conn, func, args, kwargs, on_success)
+    )
+    start_time = time.time()
+    process.start()
+    child_conn.close()
+
+    outcome = {"status": "timeout", "result": None, "error": None, "state": None}
+    if parent_conn.poll(timeout):
+        try:
+            status, result, error, state = parent_conn.recv()
+            outcome.update(status=status, result=result, error=error, state=state)
+        except EOFError:
+            # 子进程没有返回结果就退出了，例如被信号结束
+            outcome["status"] = "error"
+            outcome["error"] = f"exit code {process.exitcode}"
+        process.join(GRACE_PERIOD)
+    outcome["elapsed"] = time.time() - start_time
+
+    if process.is_alive():
+        kill_tree(process.pid, signal.SIGTERM)
+        process.join(GRACE_PERIOD)
+        if process.is_alive():
+            kill_tree(process.pid, signal.SIGKILL)
+            process.join()
+    parent_conn.close()
+    return outcome
+
+
+class DeadlineExceeded(BaseException):
+    """
+    deadline 到期时在主线程中抛出。继承 BaseException，爬虫脚本中的 except Exception 不会吞掉它
+    """
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    在当前进程内限制代码块的执行时间，到期后通过 SIGALRM 抛出 DeadlineExceeded，只能在主线程中使用。
+    用于共享同步浏览器的编排器：同步 Playwright 不能 fork 到子进程，无法使用 run_supervised。
+    Playwright 同步 API 等待结果时在调度 greenlet 中运行事件循环，信号到达时如果位于调度 greenlet，
+    把异常抛给主 greenlet，调度 greenlet 保持挂起，之后的 Playwright 调用仍然可以继续使用。
+    抛出异常后每隔 GRACE_PERIOD 秒再次抛出，直到离开代码块，清理过程卡住时同样可以退出
+
+    参数:
+    seconds (float): 超时时间，单位为秒
+    """
+
+    def expire(signum, frame):
+        signal.setitimer(signal.ITIMER_REAL, GRACE_PERIOD)
+        error = DeadlineExceeded(f"超过 {seconds} 秒")
+        current = getcurrent()
+        root = current
+        while root.parent is not None:
+            root = root.parent
+        if root is not current:
+            root.throw(error)
+            return
+        raise error
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
@@ -1,224 +1,233 @@
 from datetime import timedelta, timezone
-from playwright.sync_api import sync_playwright
 from util.spider_util import SpiderUtil
-from bs4 import BeautifulSoup
-import re
+from util.api_client import ApiClient, AuthError
+from util.html_cleaner import HtmlCleaner
+from util.pipeline import ListingPipeline
 
 # 获取当前文件名，用于日志标识
 util = SpiderUtil()
+# 详情页清理规则
+CLEAN_RULES = {
+    "remove": "script, style",
+    # 移除隐藏的段落元素
+    "strip_hidden": "p",
+    "author_rules": {
+        # 红与绿：移除开头的推广段落和结尾的关注引导
+        "8680038754": {
+            "remove_through": "添加⭐️标 不再错过推送",
+            "remove_from": "关注⭐️红与绿⭐️",
+        },
+    },
+}
+cleaner = HtmlCleaner(CLEAN_RULES)
+# 详情页需要登录状态和滑块验证，只能通过浏览器获取
+HTTP_FIRST = False
 filename = "./news/data/xueqiu/list.json"
 storage_state_path = "./news/auth/xueqiu_cookie.json"
-
-
-def remove_ad_elements(soup, user_id):
-    if str(user_id) == "8680038754":
-        # 查找包含 "添加⭐️标 不再错过推送" 的元素
-        start_b_tags = []
-        for b_tag in soup.find_all("b"):
-            if "添加⭐️标 不再错过推送" in b_tag.text:
-                start_b_tags.append(b_tag)
-
-        # 如果找到了开始标记
-        if start_b_tags:
-            start_b = start_b_tags[0]
-            start_p = start_b.find_parent("p")
-            if start_p:
-                # 移除这个 <p> 标签之前的所有 <p> 标签
-                current = start_p.previous_sibling
-                while current:
-                    next_element = current.previous_sibling
-                    if current.name == "p":
-                        current.decompose()
-                    current = next_element
-                # 移除包含开始标记的 <p> 标签本身
-                start_p.decompose()
-
-        # 查找包含 "关注⭐️红与绿⭐️" 的元素
-        end_b_tags = []
-        for b_tag in soup.find_all("b"):
-            if "关注⭐️红与绿⭐️" in b_tag.text:
-                end_b_tags.append(b_tag)
-
-        # 如果找到了结束标记
-        if end_b_tags:
-            end_b = end_b_tags[0]
-            end_p = end_b.find_parent("p")
-            if end_p:
-                # 移除这个 <p> 标签及其之后的所有 <p> 标签
-                current = end_p
-                while current:
-                    next_element = current.next_sibling
-                    if current.name == "p":
-                        current.decompose()
-                    current = next_element
-
-
-def get_detail(page, user_id):
-    # 获取文章详情内容
+# 列表深度：固定模式取前 LIST_DEPTH 条；自适应模式遇到第一个已抓取的链接即停止，
+# 最多 MAX_DEPTH 条，详情抓取最多用时 DEPTH_BUDGET 秒
+LIST_DEPTH = 10
+MAX_DEPTH = 20
+DEPTH_BUDGET = 60
+# 首页"关注"标签页"只看原发"使用的接口
+TIMELINE_API = "https://xueqiu.com/v4/statuses/home_timeline.json"
+
+
+def build_article(article, description):
+    # 根据 home_timeline 中的条目和详情内容生成文章数据
+    author = ""
+    if "user" in article and "screen_name" in article.get("user", {}):
+        author = article.get("user", {}).get("screen_name", "")
+    return {
+        "id": article.get("id", ""),
+        "user_id": article.get("user_id", ""),
+        "author": author,
+        "title": article.get("title", ""),
+        "type": article.get("type", ""),
+        "description": description,
+        "link": f"https://xueqiu.com{article.get('target', '')}",
+        "pub_date": util.convert_utc_to_local(
+            article.get("created_at", "") / 1000, tz=timezone(timedelta(hours=8))
+        ),
+        "source": "xueqiu",
+        "image": article.get("cover_pic", ""),
+        "kind": 1,
+        "language": "zh-CN",
+    }
+
+
+def is_auth_failed(status, data):
+    # 雪球登录失效时返回 400 和 error_code，而不是 401
+    return status == 400 or bool(data.get("error_code"))
+
+
+api = ApiClient(
+    util,
+    cookie_name="xueqiu_cookie",
+    headers={"Referer": "https://xueqiu.com/", "X-Requested-With": "XMLHttpRequest"},
+    auth_check=is_auth_failed,
+)
+
+
+def fetch_timeline_api():
+    # 直接请求"只看原发"的 home_timeline 接口，cookie 失效时返回 None，由浏览器刷新
     try:
-        detail_element = page.query_selector(".article__bd__detail")
-        if detail_element:
-            html_content = detail_element.inner_html()
-            # 使用BeautifulSoup处理HTML
-            soup = BeautifulSoup(html_content, "html.parser")
-            # 移除脚本和样式元素
-            for element in soup.select("script, style"):
-                element.decompose()
-
-            # 移除隐藏的段落元素
-            for element in soup.find_all("p", style=re.compile(r"display:\s*none")):
-                element.decompose()
-
-            remove_ad_elements(soup, user_id)
-            # 获取清理后的HTML内容
-            return str(soup).strip()
-        else:
-            util.error("未找到文章详情内容")
-            return ""
+        json_data = api.get_json(
+            TIMELINE_API, params={"sub_type": "original"}, conditional=True
+        )
+        if json_data is None:
+            util.info("雪球 home_timeline 没有变化")
+            return []
+        articles = json_data.get("home_timeline", [])
+        util.info(f"通过接口获取雪球原创内容，共 {len(articles)} 条")
+        return articles
+    except AuthError as e:
+        util.info(f"雪球接口需要刷新登录状态: {str(e)}")
     except Exception as e:
-        util.error(f"获取文章详情时出错: {str(e)}")
-        return ""
+        util.error(f"请求雪球接口时出错: {str(e)}")
+    return None
+
+
+def timeline_link(article):
+    return f"https://xueqiu.com{article.get('target', '')}"
+
+
+def fetch_timeline_browser(page, context):
+    # 通过页面操作获取 home_timeline，同时检查并刷新登录状态
+    # 访问目标网页
+    util.goto(page, "https://xueqiu.com/", timeout=6000)
+    util.info("开始访问网页...")
+
+    # 检查是否存在登录按钮
+    login_button_exists = page.is_visible("a:has-text('登录')", timeout=3000)
+    if login_button_exists:
+        util.info("检测到需要登录, 请手动完成登录操作...")
+        util.log_action_error("检测到雪球需要登录")
+        # 等待登录按钮消失，表示用户已登录
+        util.wait_for_selector(page, "a:has-text('登录')", state="hidden", timeout=20000)
+        util.info("登录操作已完成")
+        storage = context.storage_state(path=storage_state_path)
+        print(storage)
+        api.load_cookies(context.cookies())
+    else:
+        util.info("已登录状态，无需重新登录")
+
+    # 点击 class="home-timeline-tabs" 下面的 <a href="" id="" class="active">关注</a>
+    # 使用更精确的选择器，避免点击到其他带有"关注"文本的元素
+    util.throttle(page.url)
+    page.click(".home-timeline-tabs a.active:has-text('关注')")
+
+    # 使用 expect_response 等待 XHR 响应
+    with page.expect_response(
+        lambda response: "v4/statuses/home_timeline.json" in response.url
+        and "sub_type=original" in response.url
+        and response.status == 200
+    ) as response_info:
+        # 点击触发 XHR 请求, 按钮被 modal 挡住
+        # 先检查并关闭可能出现的 modal
+        if page.is_visible(".modal", timeout=2000):
+            util.info("检测到弹窗，尝试关闭")
+            util.throttle(page.url)
+            page.click(".modal .close")
+            util.wait_for_selector(page, ".modal", state="hidden", timeout=5000)
+
+        # 点击"只看原发"按钮
+        util.throttle(page.url)
+        page.click("a:has-text('只看原发')")
+
+    # 获取响应对象
+    response = response_info.value
+    json_data = response.json()
+    util.info(f"成功获取雪球原创内容，共 {len(json_data.get('home_timeline', []))} 条")
+    return json_data.get("home_timeline", [])
+
+
+async def fetch_timeline_browser_async(page, context):
+    # 通过页面操作获取 home_timeline（异步模式）
+    # 访问目标网页
+    await util.goto_async(page, "https://xueqiu.com/", timeout=6000)
+    util.info("开始访问网页...")
+
+    # 检查是否存在登录按钮
+    if await page.is_visible("a:has-text('登录')", timeout=3000):
+        util.info("检测到需要登录, 请手动完成登录操作...")
+        util.log_action_error("检测到雪球需要登录")
+        # 等待登录按钮消失，表示用户已登录
+        await util.wait_for_selector_async(
+            page, "a:has-text('登录')", state="hidden", timeout=20000
+        )
+        util.info("登录操作已完成")
+        await context.storage_state(path=storage_state_path)
+        api.load_cookies(await context.cookies())
+    else:
+        util.info("已登录状态，无需重新登录")
+
+    await util.throttle_async(page.url)
+    await page.click(".home-timeline-tabs a.active:has-text('关注')")
+
+    # 使用 expect_response 等待 XHR 响应
+    async with page.expect_response(
+        lambda response: "v4/statuses/home_timeline.json" in response.url
+        and "sub_type=original" in response.url
+        and response.status == 200
+    ) as response_info:
+        # 先检查并关闭可能出现的 modal
+        if await page.is_visible(".modal", timeout=2000):
+            util.info("检测到弹窗，尝试关闭")
+            await util.throttle_async(page.url)
+            await page.click(".modal .close")
+            await util.wait_for_selector_async(
+                page, ".modal", state="hidden", timeout=5000
+            )
+
+        # 点击"只看原发"按钮
+        await util.throttle_async(page.url)
+        await page.click("a:has-text('只看原发')")
+
+    response = await response_info.value
+    json_data = await response.json()
+    articles = json_data.get("home_timeline", [])
+    util.info(f"成功获取雪球原创内容，共 {len(articles)} 条")
+    return articles
+
+
+# 列表、详情和写入的流程由同步和异步模式共用：优先通过接口获取列表，
+# 接口不可用时通过页面获取并刷新 cookie，详情页在已登录的上下文中打开
+pipeline = ListingPipeline(
+    util,
+    filename,
+    build_article,
+    list_depth=LIST_DEPTH,
+    max_depth=MAX_DEPTH,
+    budget=DEPTH_BUDGET,
+    link_of=timeline_link,
+    require_title=False,
+    detail_selector=".article__bd__detail",
+    detail_wait=".article__bd__detail",
+    cleaner=cleaner,
+    author_of=lambda article: article.get("user_id", ""),
+    http_first=HTTP_FIRST,
+    storage_name="xueqiu_cookie",
+    list_api=fetch_timeline_api,
+    fingerprint_of=lambda articles: [
+        article.get("target") for article in articles[:LIST_DEPTH]
+    ],
+    load_list=fetch_timeline_browser,
+    load_list_async=fetch_timeline_browser_async,
+)
 
 
 def run():
-    data = util.history_posts(filename)
-    _articles = data["articles"]
-    _links = data["links"]
-    insert = False
-    with sync_playwright() as p:
-        try:
-            # 启动浏览器，添加更多安全选项
-            browser = p.firefox.launch(
-                headless=util.get_crawler_headless(),
-                slow_mo=300,
-            )
+    pipeline.run()
 
-            # 创建新的浏览器上下文
-            try:
-                context = browser.new_context(
-                    storage_state=util.get_storage_state("xueqiu_cookie")
-                )
-            except Exception as e:
-                util.error(f"创建浏览器上下文失败: {e}")
-                # 创建一个没有存储状态的上下文作为备选
-                browser = p.firefox.launch(
-                    headless=False,
-                    slow_mo=300,
-                )
-                context = browser.new_context()
-                util.info("已创建无状态的浏览器上下文")
-            page = context.new_page()
-
-            # 访问目标网页
-            page.goto("https://xueqiu.com/", timeout=6000)
-            util.info("开始访问网页...")
-
-            # 检查是否存在登录按钮
-            login_button_exists = page.is_visible("a:has-text('登录')", timeout=3000)
-            if login_button_exists:
-                util.info("检测到需要登录, 请手动完成登录操作...")
-                util.log_action_error("检测到雪球需要登录")
-                # 等待登录按钮消失，表示用户已登录
-                page.wait_for_selector(
-                    "a:has-text('登录')", state="hidden", timeout=20000
-                )
-                util.info("登录操作已完成")
-                storage = context.storage_state(path=storage_state_path)
-                print(storage)
-            else:
-                util.info("已登录状态，无需重新登录")
-
-            # 点击 class="home-timeline-tabs" 下面的 <a href="" id="" class="active">关注</a>
-            # 使用更精确的选择器，避免点击到其他带有"关注"文本的元素
-            page.click(".home-timeline-tabs a.active:has-text('关注')")
-
-            # 使用 expect_response 等待 XHR 响应
-            with page.expect_response(
-                lambda response: "v4/statuses/home_timeline.json" in response.url
-                and "sub_type=original" in response.url
-                and response.status == 200
-            ) as response_info:
-                # 点击触发 XHR 请求, 按钮被 modal 挡住
-                # 先检查并关闭可能出现的 modal
-                if page.is_visible(".modal", timeout=2000):
-                    util.info("检测到弹窗，尝试关闭")
-                    page.click(".modal .close")
-                    page.wait_for_selector(".modal", state="hidden", timeout=5000)
-
-                # 点击"只看原发"按钮
-                page.click("a:has-text('只看原发')")
-
-            # 获取响应对象
-            response = response_info.value
-            json_data = response.json()
-            util.info(
-                f"成功获取雪球原创内容，共 {len(json_data.get('home_timeline', []))} 条"
-            )
 
-            # 处理获取到的数据
-            articles = json_data.get("home_timeline", [])
-            for article in articles[:10]:  # 只处理前10条
-                link = f"https://xueqiu.com{article.get('target', '')}"
-                # 检查链接是否已存在
-                if link in _links:
-                    util.info(f"链接已存在: {link}")
-                    continue
-
-                id = article.get("id", "")
-                user_id = article.get("user_id", "")
-                image = article.get("cover_pic", "")
-                type = article.get("type", "")
-                title = article.get("title", "")
-                created_at = article.get("created_at", "")
-                pub_date = util.convert_utc_to_local(
-                    created_at / 1000, tz=timezone(timedelta(hours=8))
-                )
-
-                util.info(f"开始访问网页: {link}")
-                page.goto(link)
-
-                # 等待文章详情内容加载
-                author = ""
-                page.wait_for_selector(".article__bd__detail", timeout=10000)
-                if "user" in article and "screen_name" in article.get("user", {}):
-                    author = article.get("user", {}).get("screen_name", "")
-                description = get_detail(page, user_id)
-                if description != "":
-                    # 添加到文章列表
-                    insert = True
-                    _articles.insert(
-                        0,
-                        {
-                            "id": id,
-                            "user_id": user_id,
-                            "author": author,
-                            "title": title,
-                            "type": type,
-                            "description": description,
-                            "link": link,
-                            "pub_date": pub_date,
-                            "source": "xueqiu",
-                            "image": image,
-                            "kind": 1,
-                            "language": "zh-CN",
-                        },
-                    )
-            # 保存数据
-            if len(_articles) > 0 and insert:
-                if len(_articles) > 20:
-                    _articles = _articles[:20]
-                util.write_json_to_file(_articles, filename)
-
-            # 完成后关闭浏览器
-            context.close()
-            browser.close()
-        except Exception as e:
-            context.close()
-            browser.close()
-            util.error(f"执行脚本时出错: {str(e)}")
+async def run_async():
+    await pipeline.run_async()
 
 
 # 使用 SpiderUtil 的 execute_with_timeout 方法执行 run 函数
 if __name__ == "__main__":
-    # util.execute_with_timeout(run, timeout=120)
+    # util.execute_with_timeout(
+    #     run_async if util.get_crawler_async() else run, timeout=120
+    # )
     util.info("stop")